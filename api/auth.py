@@ -0,0 +1,63 @@
+import datetime as dt
+from functools import wraps
+
+import jwt
+from django.conf import settings
+from django.http import JsonResponse
+
+from posts.entities import get_user
+
+JWT_ALGORITHM = 'HS256'
+
+
+def _secret():
+    return getattr(settings, 'JWT_SECRET_KEY', settings.SECRET_KEY)
+
+
+def create_token(user):
+    """
+    Выпускает JWT для пользователя со сроком жизни JWT_EXPIRATION_DELTA.
+    """
+    lifetime = getattr(settings, 'JWT_EXPIRATION_DELTA', dt.timedelta(days=1))
+    payload = {
+        'user_id': user.pk,
+        'username': user.username,
+        'exp': dt.datetime.utcnow() + lifetime,
+    }
+    token = jwt.encode(payload, _secret(), algorithm=JWT_ALGORITHM)
+    if isinstance(token, bytes):
+        token = token.decode()
+    return token
+
+
+def get_user_from_request(request):
+    """
+    Возвращает пользователя из заголовка `Authorization: Bearer <token>`
+    или None, если токена нет или он недействителен.
+    """
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    prefix, _, token = header.partition(' ')
+    if prefix != 'Bearer' or not token:
+        return None
+    try:
+        payload = jwt.decode(token, _secret(), algorithms=[JWT_ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+    user = get_user(payload.get('user_id'))
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+def jwt_required(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        user = get_user_from_request(request)
+        if user is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=401
+            )
+        request.user = user
+        return view(request, *args, **kwargs)
+    return wrapper
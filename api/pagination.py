@@ -0,0 +1,83 @@
+from django.db.models import Q
+
+from posts.paginators import decode_cursor, encode_cursor
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+
+def get_page_size(request):
+    try:
+        size = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+class CursorPaginator:
+    """
+    Keyset-пагинация по паре (field, id): в отличие от OFFSET стоимость
+    запроса не растёт с номером страницы.
+    """
+
+    def __init__(self, field, descending=True):
+        self.field = field
+        self.descending = descending
+
+    def order_by(self):
+        prefix = '-' if self.descending else ''
+        return (f'{prefix}{self.field}', f'{prefix}id')
+
+    def filter(self, queryset, cursor):
+        position, pk = cursor
+        op = 'lt' if self.descending else 'gt'
+        return queryset.filter(
+            Q(**{f'{self.field}__{op}': position})
+            | Q(**{self.field: position, f'id__{op}': pk})
+        )
+
+    def paginate(self, request, queryset):
+        """
+        Возвращает (rows, next_cursor); queryset должен быть результатом
+        values() и содержать поля id и self.field.
+        """
+        queryset = queryset.order_by(*self.order_by())
+        cursor = request.GET.get('cursor')
+        if cursor:
+            decoded = decode_cursor(cursor)
+            if decoded is not None:
+                queryset = self.filter(queryset, decoded)
+        size = get_page_size(request)
+        rows = list(queryset[:size + 1])
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last = rows[-1]
+            next_cursor = encode_cursor(last[self.field], last['id'])
+        return rows, next_cursor
+
+
+class KeyPaginator:
+    """
+    Keyset-пагинация по одному целочисленному полю, идущему вторым в
+    индексе после поля фильтра: курсор - последнее значение поля.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def paginate(self, request, queryset):
+        queryset = queryset.order_by(self.field)
+        try:
+            cursor = int(request.GET.get('cursor', ''))
+        except ValueError:
+            cursor = None
+        if cursor is not None:
+            queryset = queryset.filter(**{f'{self.field}__gt': cursor})
+        size = get_page_size(request)
+        rows = list(queryset[:size + 1])
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            next_cursor = str(rows[-1][self.field])
+        return rows, next_cursor
@@ -0,0 +1,71 @@
+from django.core.files.storage import default_storage
+from django.db.models import Count
+
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'views': 'views',
+    'comments_count': 'comments_count',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'text': 'text',
+    'author': 'author__username',
+    'created': 'created',
+}
+
+
+def get_fields(request, available):
+    """
+    Разбирает sparse fieldset из `?fields=id,text`; неизвестные поля
+    игнорируются, без параметра возвращаются все поля.
+    """
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(available)
+    fields = [
+        name for name in requested.split(',') if name.strip() in available
+    ]
+    return [name.strip() for name in fields] or list(available)
+
+
+def post_values(queryset, fields, extra=()):
+    """
+    Превращает queryset постов в values() с нужными колонками, не создавая
+    экземпляры моделей; join'ы на author/group строит сам values().
+    """
+    if 'comments_count' in fields:
+        queryset = queryset.annotate(comments_count=Count('comments'))
+    lookups = {POST_FIELDS[name] for name in fields}
+    lookups.update(extra)
+    return queryset.values(*lookups)
+
+
+def comment_values(queryset, fields, extra=()):
+    lookups = {COMMENT_FIELDS[name] for name in fields}
+    lookups.update(extra)
+    return queryset.values(*lookups)
+
+
+def _serialize(row, fields, mapping):
+    data = {}
+    for name in fields:
+        value = row[mapping[name]]
+        if name == 'image':
+            value = default_storage.url(value) if value else None
+        data[name] = value
+    return data
+
+
+def serialize_post(row, fields):
+    return _serialize(row, fields, POST_FIELDS)
+
+
+def serialize_comment(row, fields):
+    return _serialize(row, fields, COMMENT_FIELDS)
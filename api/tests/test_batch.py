@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, User
+
+
+class BatchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.user = User.objects.create_user(username='user')
+        cls.posts = [
+            Post.objects.create(text=f'Текст {i}', author=cls.author)
+            for i in range(3)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.user, text='Коммент'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_batch(self):
+        return self.guest_client.get(reverse('api_batch'), {
+            'posts': ','.join(str(post.id) for post in self.posts),
+            'users': 'author,user,missing',
+        })
+
+    def test_batch_returns_posts_users_and_counters(self):
+        """Пакетный запрос отдаёт посты, авторов и счётчики."""
+        data = self.get_batch().json()
+        self.assertEqual(
+            [row['id'] for row in data['posts']],
+            [post.id for post in self.posts]
+        )
+        self.assertEqual(data['posts'][0]['comments_count'], 1)
+        users = {row['username']: row for row in data['users']}
+        self.assertEqual(set(users), {'author', 'user'})
+        self.assertEqual(users['author']['followers'], 1)
+        self.assertEqual(users['author']['posts_count'], 3)
+        self.assertEqual(users['user']['follow'], 1)
+
+    def test_counters_are_cached_and_invalidated(self):
+        """Счётчики берутся из кэша и сбрасываются при изменениях."""
+        self.get_batch()
+        with self.assertNumQueries(2):
+            self.get_batch()
+        Follow.objects.filter(user=self.user).delete()
+        data = self.get_batch().json()
+        users = {row['username']: row for row in data['users']}
+        self.assertEqual(users['author']['followers'], 0)
+
+    @override_settings(API_BATCH_MAX_ITEMS=2)
+    def test_batch_limit(self):
+        """Число элементов в запросе ограничено."""
+        self.assertEqual(self.get_batch().status_code, 400)
@@ -0,0 +1,94 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from api.auth import create_token
+from posts.counters import get_user_counters
+from posts.models import Follow, User
+
+
+class FollowApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.auth_header = {
+            'HTTP_AUTHORIZATION': f'Bearer {create_token(self.user)}'
+        }
+
+    def bulk(self, data):
+        return self.client.post(
+            reverse('api_follow_bulk'), json.dumps(data),
+            content_type='application/json', **self.auth_header
+        )
+
+    def test_bulk_follow_and_unfollow(self):
+        """Подписка и отписка списками одним запросом каждая."""
+        Follow.objects.create(user=self.user, author=self.authors[0])
+        get_user_counters([self.authors[1].id])
+        # Пользователь токена, id по именам, существующие подписки и
+        # одна вставка.
+        with self.assertNumQueries(4):
+            response = self.bulk({
+                'follow': ['author0', 'author1', 'author2', 'user', 'nobody']
+            })
+        self.assertEqual(response.json()['not_found'], ['nobody'])
+        self.assertEqual(response.json()['followed'], 2)
+        self.assertEqual(
+            set(Follow.objects.filter(user=self.user).values_list(
+                'author__username', flat=True
+            )),
+            {'author0', 'author1', 'author2'}
+        )
+        self.assertEqual(
+            get_user_counters([self.authors[1].id])[self.authors[1].id][
+                'followers'
+            ],
+            1
+        )
+        response = self.bulk({'unfollow': ['author0', 'author1']})
+        self.assertEqual(response.json()['unfollowed'], 2)
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_requires_token(self):
+        """Без токена массовая подписка недоступна."""
+        response = self.client.post(
+            reverse('api_follow_bulk'), json.dumps({'follow': ['author0']}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_lists_with_keyset_pagination(self):
+        """Списки подписчиков, подписок и взаимных листаются курсором."""
+        for author in self.authors:
+            Follow.objects.create(user=self.user, author=author)
+        for author in self.authors[:3]:
+            Follow.objects.create(user=author, author=self.user)
+
+        def usernames(name, **params):
+            response = self.client.get(
+                reverse(name, kwargs={'username': 'user'}), params
+            )
+            data = response.json()
+            return [row['username'] for row in data['results']], data['next']
+
+        page, cursor = usernames('api_following', limit=3)
+        self.assertEqual(page, ['author0', 'author1', 'author2'])
+        page, cursor = usernames('api_following', limit=3, cursor=cursor)
+        self.assertEqual((page, cursor), (['author3', 'author4'], None))
+        self.assertEqual(
+            usernames('api_followers')[0], ['author0', 'author1', 'author2']
+        )
+        self.assertEqual(
+            usernames('api_mutual', limit=2),
+            (['author0', 'author1'], str(self.authors[1].id))
+        )
@@ -0,0 +1,151 @@
+import json
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from api.auth import create_token
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.user = User.objects.create_user(
+            username='user', password='pass-12345'
+        )
+        cls.group = Group.objects.create(
+            title='Котики',
+            description='О котиках',
+            slug='test-slug',
+        )
+        for i in range(15):
+            Post.objects.create(
+                text=f'Текст {i}',
+                author=cls.author,
+                group=cls.group if i % 2 else None,
+            )
+        cls.post = Post.objects.first()
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.auth_header = {
+            'HTTP_AUTHORIZATION': f'Bearer {create_token(ApiViewsTests.user)}'
+        }
+
+    def post_json(self, url, data, **extra):
+        return self.guest_client.post(
+            url, json.dumps(data), content_type='application/json', **extra
+        )
+
+    def test_obtain_token(self):
+        """По логину и паролю выдаётся рабочий JWT."""
+        response = self.post_json(
+            reverse('api_token'),
+            {'username': 'user', 'password': 'pass-12345'}
+        )
+        self.assertEqual(response.status_code, 200)
+        token = response.json()['token']
+        response = self.guest_client.get(
+            reverse('api_follow_index'), HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.post_json(
+            reverse('api_token'), {'username': 'user', 'password': 'wrong'}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_post_list_cursor_pagination(self):
+        """Лента отдаётся страницами по курсору без повторов."""
+        response = self.guest_client.get(reverse('api_posts'))
+        data = response.json()
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(data['results'][0]['text'], 'Текст 14')
+        response = self.guest_client.get(
+            reverse('api_posts'), {'cursor': data['next']}
+        )
+        second = response.json()
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next'])
+        ids = [row['id'] for row in data['results'] + second['results']]
+        self.assertEqual(len(set(ids)), 15)
+
+    def test_sparse_fieldsets(self):
+        """Параметр fields ограничивает набор полей в ответе."""
+        response = self.guest_client.get(
+            reverse('api_posts'), {'fields': 'id,author,comments_count'}
+        )
+        row = response.json()['results'][0]
+        self.assertEqual(set(row), {'id', 'author', 'comments_count'})
+        self.assertEqual(row['author'], 'author')
+
+    def test_group_and_profile_lists(self):
+        """Ленты группы и автора фильтруют посты."""
+        response = self.guest_client.get(
+            reverse('api_group_posts', kwargs={'slug': 'test-slug'}),
+            {'limit': 100}
+        )
+        self.assertEqual(len(response.json()['results']), 7)
+        response = self.guest_client.get(
+            reverse('api_profile_posts', kwargs={'username': 'user'})
+        )
+        self.assertEqual(response.json()['results'], [])
+        response = self.guest_client.get(
+            reverse('api_group_posts', kwargs={'slug': 'missing'})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_create_and_edit_post(self):
+        """Создавать пост может только авторизованный, править - автор."""
+        url = reverse('api_posts')
+        response = self.post_json(url, {'text': 'Новый'})
+        self.assertEqual(response.status_code, 401)
+        response = self.post_json(
+            url, {'text': 'Новый', 'group': self.group.id}, **self.auth_header
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['group'], 'test-slug')
+        post_id = response.json()['id']
+        response = self.guest_client.patch(
+            reverse('api_post', kwargs={'post_id': post_id}),
+            json.dumps({'text': 'Изменённый'}),
+            content_type='application/json',
+            **self.auth_header
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Post.objects.get(id=post_id).text, 'Изменённый')
+        self.assertEqual(Post.objects.get(id=post_id).group, self.group)
+        response = self.guest_client.patch(
+            reverse('api_post', kwargs={'post_id': self.post.id}),
+            json.dumps({'text': 'Чужой'}),
+            content_type='application/json',
+            **self.auth_header
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_comments(self):
+        """Комментарии создаются и отдаются списком."""
+        url = reverse('api_comments', kwargs={'post_id': self.post.id})
+        response = self.post_json(
+            url, {'text': 'Коммент'}, **self.auth_header
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 1)
+        response = self.guest_client.get(url)
+        self.assertEqual(response.json()['results'][0]['author'], 'user')
+
+    def test_follow_unfollow(self):
+        """Подписка и отписка через API."""
+        url = reverse('api_follow', kwargs={'username': 'author'})
+        response = self.post_json(url, {}, **self.auth_header)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=self.author).exists()
+        )
+        response = self.guest_client.get(reverse('api_follow_index'),
+                                         **self.auth_header)
+        self.assertEqual(len(response.json()['results']), 10)
+        response = self.guest_client.delete(url, **self.auth_header)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Follow.objects.exists())
@@ -0,0 +1,39 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('v1/token/', views.obtain_token, name='api_token'),
+    path('v1/batch/', views.batch, name='api_batch'),
+    path('v1/uploads/', views.upload, name='api_upload'),
+    path('v1/posts/', views.post_list, name='api_posts'),
+    path('v1/posts/<int:post_id>/', views.post_detail, name='api_post'),
+    path(
+        'v1/posts/<int:post_id>/comments/', views.comment_list,
+        name='api_comments'
+    ),
+    path('v1/follow/', views.follow_post_list, name='api_follow_index'),
+    path('v1/follow/bulk/', views.follow_bulk, name='api_follow_bulk'),
+    path(
+        'v1/groups/<slug:slug>/posts/', views.group_post_list,
+        name='api_group_posts'
+    ),
+    path(
+        'v1/users/<str:username>/posts/', views.profile_post_list,
+        name='api_profile_posts'
+    ),
+    path(
+        'v1/users/<str:username>/follow/', views.follow, name='api_follow'
+    ),
+    path(
+        'v1/users/<str:username>/followers/', views.followers,
+        name='api_followers'
+    ),
+    path(
+        'v1/users/<str:username>/following/', views.following,
+        name='api_following'
+    ),
+    path(
+        'v1/users/<str:username>/mutual/', views.mutual, name='api_mutual'
+    ),
+]
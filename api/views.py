@@ -0,0 +1,386 @@
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+
+from posts.counters import get_post_counters, get_user_counters
+from posts.entities import get_group_or_404, get_user_or_404
+from posts.follows import follow_many, resolve, unfollow_many
+from posts.forms import CommentForm, PostForm
+from posts.models import Comment, Follow, Post, User
+from posts.tasks import post_saved
+from posts.uploads import direct_upload_enabled, presign_upload
+
+from .auth import create_token, get_user_from_request, jwt_required
+from .pagination import CursorPaginator, KeyPaginator
+from .serializers import (COMMENT_FIELDS, POST_FIELDS, comment_values,
+                          get_fields, post_values, serialize_comment,
+                          serialize_post)
+
+posts_paginator = CursorPaginator('pub_date')
+comments_paginator = CursorPaginator('created', descending=False)
+followers_paginator = KeyPaginator('user_id')
+following_paginator = KeyPaginator('author_id')
+
+
+def api_view(methods):
+    """
+    Оборачивает view JSON API: проверяет метод, отключает CSRF (доступ
+    только по JWT) и превращает Http404 в JSON-ответ.
+    """
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse(
+                    {'detail': f'Method "{request.method}" not allowed.'},
+                    status=405
+                )
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                return JsonResponse({'detail': 'Not found.'}, status=404)
+        return wrapper
+    return decorator
+
+
+def get_data(request):
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+def bad_request(detail='Invalid JSON body.'):
+    return JsonResponse({'detail': detail}, status=400)
+
+
+def post_list_response(request, queryset):
+    fields = get_fields(request, POST_FIELDS)
+    rows, next_cursor = posts_paginator.paginate(
+        request, post_values(queryset, fields, extra=('id', 'pub_date'))
+    )
+    return JsonResponse({
+        'results': [serialize_post(row, fields) for row in rows],
+        'next': next_cursor,
+    })
+
+
+def post_detail_response(request, post_id, status=200):
+    fields = get_fields(request, POST_FIELDS)
+    row = post_values(Post.objects.filter(id=post_id), fields).order_by(
+        'id'
+    ).first()
+    if row is None:
+        raise Http404
+    return JsonResponse(serialize_post(row, fields), status=status)
+
+
+@api_view(['POST'])
+def obtain_token(request):
+    data = get_data(request)
+    if data is None:
+        return bad_request()
+    user = authenticate(
+        request,
+        username=data.get('username'),
+        password=data.get('password'),
+    )
+    if user is None:
+        return JsonResponse({'detail': 'Invalid credentials.'}, status=401)
+    return JsonResponse({'token': create_token(user)})
+
+
+@api_view(['GET', 'POST'])
+def post_list(request):
+    if request.method == 'GET':
+        return post_list_response(request, Post.objects.all())
+    return create_post(request)
+
+
+@jwt_required
+def create_post(request):
+    data = get_data(request)
+    if data is None:
+        return bad_request()
+    form = PostForm(data, files=request.FILES or None, user=request.user)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    post = form.save(commit=False)
+    post.author = request.user
+    post.save()
+    post_saved(post)
+    return post_detail_response(request, post.id, status=201)
+
+
+@api_view(['GET', 'PATCH', 'PUT'])
+def post_detail(request, post_id):
+    if request.method == 'GET':
+        return post_detail_response(request, post_id)
+    return edit_post(request, post_id)
+
+
+@jwt_required
+def edit_post(request, post_id):
+    post = get_object_or_404(Post, id=post_id)
+    if post.author_id != request.user.id:
+        return JsonResponse(
+            {'detail': 'You can edit only your own posts.'}, status=403
+        )
+    data = get_data(request)
+    if data is None:
+        return bad_request()
+    if request.method == 'PATCH':
+        data = {
+            'text': post.text,
+            'group': post.group_id,
+            **data,
+        }
+    form = PostForm(data, instance=post, user=request.user)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    form.save()
+    post_saved(post)
+    return post_detail_response(request, post.id)
+
+
+@api_view(['GET'])
+def group_post_list(request, slug):
+    group = get_group_or_404(slug)
+    return post_list_response(request, Post.objects.filter(group=group))
+
+
+@api_view(['GET'])
+def profile_post_list(request, username):
+    author = get_user_or_404(username)
+    return post_list_response(request, Post.objects.filter(author=author))
+
+
+@api_view(['GET'])
+@jwt_required
+def follow_post_list(request):
+    return post_list_response(
+        request, Post.objects.filter(author__following__user=request.user)
+    )
+
+
+@api_view(['GET', 'POST'])
+def comment_list(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    if request.method == 'POST':
+        return create_comment(request, post)
+    fields = get_fields(request, COMMENT_FIELDS)
+    rows, next_cursor = comments_paginator.paginate(
+        request,
+        comment_values(
+            Comment.objects.filter(post=post), fields,
+            extra=('id', 'created')
+        )
+    )
+    return JsonResponse({
+        'results': [serialize_comment(row, fields) for row in rows],
+        'next': next_cursor,
+    })
+
+
+@jwt_required
+def create_comment(request, post):
+    data = get_data(request)
+    if data is None:
+        return bad_request()
+    form = CommentForm(data)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post = post
+    comment.save()
+    fields = get_fields(request, COMMENT_FIELDS)
+    row = comment_values(Comment.objects.filter(id=comment.id), fields).get()
+    return JsonResponse(serialize_comment(row, fields), status=201)
+
+
+@api_view(['GET', 'POST', 'DELETE'])
+def follow(request, username):
+    author = get_user_or_404(username)
+    if request.method == 'GET':
+        user = get_user_from_request(request)
+        following = user is not None and Follow.objects.filter(
+            user=user, author=author
+        ).exists()
+        return JsonResponse({
+            'username': username,
+            'following': following,
+            'followers': author.following.count(),
+            'follow': author.follower.count(),
+        })
+    return change_follow(request, author)
+
+
+@jwt_required
+def change_follow(request, author):
+    if request.method == 'DELETE':
+        Follow.objects.filter(user=request.user, author=author).delete()
+        return HttpResponse(status=204)
+    if author == request.user:
+        return bad_request('You can not follow yourself.')
+    _, created = Follow.objects.get_or_create(user=request.user, author=author)
+    return JsonResponse(
+        {'username': author.username, 'following': True},
+        status=201 if created else 200
+    )
+
+
+@api_view(['POST'])
+@jwt_required
+def follow_bulk(request):
+    """
+    Подписывает и отписывает от списков авторов: {"follow": [...],
+    "unfollow": [...]} - одна вставка и один DELETE на весь запрос.
+    """
+    data = get_data(request)
+    if data is None:
+        return bad_request()
+    follow = _split_param(request, data, 'follow')
+    unfollow = _split_param(request, data, 'unfollow')
+    limit = getattr(settings, 'API_FOLLOW_MAX_ITEMS', 1000)
+    if len(follow) + len(unfollow) > limit:
+        return bad_request(f'No more than {limit} items per request.')
+    ids = resolve(follow + unfollow)
+    followed = follow_many(
+        request.user, [ids[name] for name in follow if name in ids]
+    )
+    unfollowed = unfollow_many(
+        request.user, [ids[name] for name in unfollow if name in ids]
+    )
+    return JsonResponse({
+        'followed': followed,
+        'unfollowed': unfollowed,
+        'not_found': sorted(set(follow + unfollow) - set(ids)),
+    })
+
+
+def follow_list_response(request, queryset, paginator, prefix):
+    rows, next_cursor = paginator.paginate(request, queryset.values(
+        paginator.field, f'{prefix}__username', f'{prefix}__first_name',
+        f'{prefix}__last_name'
+    ))
+    return JsonResponse({
+        'results': [
+            {
+                'username': row[f'{prefix}__username'],
+                'first_name': row[f'{prefix}__first_name'],
+                'last_name': row[f'{prefix}__last_name'],
+            }
+            for row in rows
+        ],
+        'next': next_cursor,
+    })
+
+
+@api_view(['GET'])
+def followers(request, username):
+    author = get_user_or_404(username)
+    return follow_list_response(
+        request, Follow.objects.filter(author=author), followers_paginator,
+        'user'
+    )
+
+
+@api_view(['GET'])
+def following(request, username):
+    user = get_user_or_404(username)
+    return follow_list_response(
+        request, Follow.objects.filter(user=user), following_paginator,
+        'author'
+    )
+
+
+@api_view(['GET'])
+def mutual(request, username):
+    """Взаимные подписки: авторы, которые подписаны на username в ответ."""
+    user = get_user_or_404(username)
+    return follow_list_response(
+        request,
+        Follow.objects.filter(user=user, author__follower__author=user),
+        following_paginator, 'author'
+    )
+
+
+def _split_param(request, data, name):
+    value = data.get(name) or request.GET.get(name) or []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+@api_view(['GET', 'POST'])
+def batch(request):
+    """
+    Отдаёт посты, карточки авторов и счётчики одним ответом: по одному
+    IN (...)-запросу на сущность плюс cache.get_many для счётчиков.
+    """
+    data = get_data(request) if request.method == 'POST' else {}
+    if data is None:
+        return bad_request()
+    post_ids = _split_param(request, data, 'posts')
+    usernames = _split_param(request, data, 'users')
+    limit = getattr(settings, 'API_BATCH_MAX_ITEMS', 100)
+    if len(post_ids) + len(usernames) > limit:
+        return bad_request(f'No more than {limit} items per request.')
+    try:
+        post_ids = [int(pk) for pk in post_ids]
+    except ValueError:
+        return bad_request('Post ids must be integers.')
+
+    fields = [name for name in get_fields(request, POST_FIELDS)
+              if name != 'comments_count']
+    posts = list(post_values(
+        Post.objects.filter(id__in=post_ids), fields, extra=('id',)
+    ))
+    position = {pk: index for index, pk in enumerate(post_ids)}
+    posts.sort(key=lambda row: position[row['id']])
+    post_counters = get_post_counters([row['id'] for row in posts])
+
+    users = list(User.objects.filter(username__in=usernames).values(
+        'id', 'username', 'first_name', 'last_name'
+    ))
+    user_counters = get_user_counters([row['id'] for row in users])
+
+    return JsonResponse({
+        'posts': [
+            {**serialize_post(row, fields), **post_counters[row['id']]}
+            for row in posts
+        ],
+        'users': [
+            {
+                'username': row['username'],
+                'first_name': row['first_name'],
+                'last_name': row['last_name'],
+                **user_counters[row['id']],
+            }
+            for row in users
+        ],
+    })
+
+
+@api_view(['POST'])
+@jwt_required
+def upload(request):
+    if not direct_upload_enabled():
+        raise Http404
+    data = get_data(request)
+    if data is None:
+        return bad_request()
+    upload = presign_upload(request.user, data.get('content_type'))
+    if upload is None:
+        return bad_request('Unsupported content type.')
+    return JsonResponse(upload, status=201)
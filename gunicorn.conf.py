@@ -0,0 +1,12 @@
+def post_worker_init(worker):
+    from posts.viewcounts import start_flusher
+    from yatube.warmup import warm_templates
+    count = warm_templates()
+    worker.log.info('Warmed up %s templates', count)
+    start_flusher()
+
+
+def worker_exit(server, worker):
+    from posts.viewcounts import flush, stop_flusher
+    stop_flusher()
+    flush()
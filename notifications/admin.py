@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import Notification
+
+
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("pk", "recipient", "kind", "post", "created", "sent_at")
+    list_filter = ("kind",)
+    raw_id_fields = ("recipient", "post", "comment")
+    empty_value_display = "-пусто-"
+
+
+admin.site.register(Notification, NotificationAdmin)
@@ -0,0 +1,78 @@
+import time
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.mail import get_connection, send_mass_mail
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Notification
+
+SUBJECT = 'Новые события на Yatube'
+
+
+def build_message(user, events, domain):
+    body = render_to_string('notifications/digest.txt', {
+        'user': user,
+        'events': events,
+        'domain': domain,
+        'protocol': 'https',
+    })
+    return (SUBJECT, body, settings.DEFAULT_FROM_EMAIL, [user.email])
+
+
+def send_digests(batch_size=None, connection=None):
+    """
+    Собирает неотправленные события в одно письмо на пользователя и
+    отправляет их пачками через одно соединение с почтовым сервером.
+    События, пришедшие во время рассылки, попадут в следующий дайджест.
+    """
+    batch_size = batch_size or getattr(
+        settings, 'NOTIFICATIONS_DIGEST_BATCH', 500
+    )
+    started = time.monotonic()
+    stats = {'users': 0, 'events': 0, 'messages': 0}
+    pending = Notification.objects.filter(sent_at__isnull=True)
+    max_id = pending.aggregate(max_id=Max('id'))['max_id']
+    if max_id is None:
+        stats['seconds'] = time.monotonic() - started
+        return stats
+    pending = pending.filter(id__lte=max_id)
+    domain = Site.objects.get_current().domain
+    connection = connection or get_connection()
+    last_recipient = 0
+    with connection:
+        while True:
+            recipients = list(
+                pending.filter(recipient_id__gt=last_recipient)
+                .order_by('recipient_id')
+                .values_list('recipient_id', flat=True)
+                .distinct()[:batch_size]
+            )
+            if not recipients:
+                break
+            last_recipient = recipients[-1]
+            events = pending.filter(
+                recipient_id__in=recipients
+            ).select_related(
+                'recipient', 'post__author', 'comment__author'
+            ).order_by('recipient_id', 'created')
+            grouped = {}
+            for event in events:
+                grouped.setdefault(event.recipient, []).append(event)
+            datatuple = [
+                build_message(user, user_events, domain)
+                for user, user_events in grouped.items() if user.email
+            ]
+            if datatuple:
+                stats['messages'] += send_mass_mail(
+                    datatuple, connection=connection
+                )
+            pending.filter(recipient_id__in=recipients).update(
+                sent_at=timezone.now()
+            )
+            stats['users'] += len(grouped)
+            stats['events'] += sum(map(len, grouped.values()))
+    stats['seconds'] = time.monotonic() - started
+    return stats
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from notifications.digest import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает накопленные уведомления одним письмом на пользователя'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Сколько пользователей обрабатывать за одну пачку',
+        )
+
+    def handle(self, *args, **options):
+        stats = send_digests(batch_size=options['batch_size'])
+        seconds = max(stats['seconds'], 1e-6)
+        self.stdout.write(
+            f'Пользователей: {stats["users"]}, событий: {stats["events"]}, '
+            f'писем: {stats["messages"]} за {stats["seconds"]:.2f} с '
+            f'({stats["messages"] / seconds:.1f} писем/с, '
+            f'{stats["events"] / seconds:.1f} событий/с)'
+        )
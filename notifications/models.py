@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class Notification(models.Model):
+    NEW_POST = 'post'
+    COMMENT = 'comment'
+    KIND_CHOICES = (
+        (NEW_POST, 'Новая запись'),
+        (COMMENT, 'Новый комментарий'),
+    )
+
+    recipient = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="notifications"
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="notifications"
+    )
+    comment = models.ForeignKey(
+        Comment, on_delete=models.CASCADE, related_name="notifications",
+        blank=True, null=True
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['sent_at', 'recipient'])]
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from posts.models import Comment, Post
+
+from .tasks import notify_comment, notify_followers
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        notify_followers.delay_on_commit(
+            instance.id, key=f'notify-post:{instance.id}'
+        )
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        notify_comment.delay_on_commit(
+            instance.id, key=f'notify-comment:{instance.id}'
+        )
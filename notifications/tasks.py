@@ -0,0 +1,57 @@
+from django.conf import settings
+
+from posts.models import Comment, Follow, Post
+from taskqueue.registry import task
+
+from .models import Notification
+
+
+def _bulk_notify(recipients, **fields):
+    size = getattr(settings, 'NOTIFICATIONS_BATCH_SIZE', 1000)
+    batch = []
+    for recipient_id in recipients:
+        batch.append(Notification(recipient_id=recipient_id, **fields))
+        if len(batch) >= size:
+            Notification.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Notification.objects.bulk_create(batch)
+
+
+@task(name='notifications.notify_followers')
+def notify_followers(post_id):
+    """
+    Записывает событие о новом посте для каждого подписчика автора; письма
+    уходят позже одним дайджестом.
+    """
+    post = Post.objects.filter(id=post_id).only('author_id').first()
+    if post is None:
+        return
+    followers = Follow.objects.filter(author=post.author_id).values_list(
+        'user_id', flat=True
+    ).order_by().iterator()
+    _bulk_notify(followers, kind=Notification.NEW_POST, post_id=post.id)
+
+
+@task(name='notifications.notify_comment')
+def notify_comment(comment_id):
+    """
+    Событие о комментарии получают автор поста и прошлые участники
+    обсуждения, кроме самого комментатора.
+    """
+    comment = Comment.objects.filter(id=comment_id).select_related(
+        'post'
+    ).first()
+    if comment is None:
+        return
+    recipients = set(
+        Comment.objects.filter(post=comment.post_id).exclude(
+            id=comment.id
+        ).values_list('author_id', flat=True)
+    )
+    recipients.add(comment.post.author_id)
+    recipients.discard(comment.author_id)
+    _bulk_notify(
+        sorted(recipients), kind=Notification.COMMENT,
+        post_id=comment.post_id, comment_id=comment.id
+    )
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+
+from notifications.digest import send_digests
+from notifications.models import Notification
+from notifications.tasks import notify_comment, notify_followers
+from posts.models import Comment, Follow, Post, User
+
+
+class DigestTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', email='author@yatube.ru'
+        )
+        cls.readers = [
+            User.objects.create_user(
+                username=f'reader{i}', email=f'reader{i}@yatube.ru'
+            )
+            for i in range(3)
+        ]
+        cls.silent = User.objects.create_user(username='silent')
+        for reader in cls.readers + [cls.silent]:
+            Follow.objects.create(user=reader, author=cls.author)
+        cls.posts = [
+            Post.objects.create(text=f'Пост {i}', author=cls.author)
+            for i in range(2)
+        ]
+
+    def test_followers_get_one_digest(self):
+        """Подписчик получает одно письмо на все новые посты."""
+        for post in self.posts:
+            notify_followers(post.id)
+        self.assertEqual(Notification.objects.count(), 8)
+        stats = send_digests(batch_size=2)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(stats['users'], 4)
+        self.assertEqual(stats['events'], 8)
+        self.assertEqual(stats['messages'], 3)
+        self.assertIn('Пост 0', mail.outbox[0].body)
+        self.assertIn('Пост 1', mail.outbox[0].body)
+        self.assertFalse(
+            Notification.objects.filter(sent_at__isnull=True).exists()
+        )
+        send_digests()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_comment_notifies_author_and_participants(self):
+        """О комментарии узнают автор поста и участники обсуждения."""
+        post = self.posts[0]
+        Comment.objects.create(post=post, author=self.readers[0], text='1')
+        comment = Comment.objects.create(
+            post=post, author=self.readers[1], text='2'
+        )
+        notify_comment(comment.id)
+        recipients = set(Notification.objects.values_list(
+            'recipient__username', flat=True
+        ))
+        self.assertEqual(recipients, {'author', 'reader0'})
+
+    def test_command_reports_throughput(self):
+        """Команда send_digests печатает статистику рассылки."""
+        notify_followers(self.posts[0].id)
+        out = StringIO()
+        call_command('send_digests', stdout=out)
+        self.assertIn('писем: 3', out.getvalue())
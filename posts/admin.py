@@ -1,35 +1,62 @@
 from django.contrib import admin
 
 from .models import Comment, Follow, Group, Post
-
-
-class PostAdmin(admin.ModelAdmin):
+from .paginators import EstimatedCountPaginator
+from .search import full_text_search, is_postgres
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Список для таблиц с миллионами строк: оценка числа строк вместо
+    COUNT(*) и полнотекстовый поиск по GIN-индексу на Postgres.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    full_text_field = "text"
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not is_postgres(queryset.db):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return full_text_search(
+            queryset, self.full_text_field, search_term
+        ), False
+
+
+class PostAdmin(LargeTableAdmin):
     list_display = ("pk", "text", "pub_date", "author", "group")
+    list_select_related = ("author", "group")
     search_fields = ("text",)
-    list_filter = ("pub_date",)
+    date_hierarchy = "pub_date"
+    raw_id_fields = ("author",)
+    autocomplete_fields = ("group",)
     empty_value_display = "-пусто-"
 
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ("pk", "title", "description")
     search_fields = ("title",)
-    list_filter = ("title",)
     empty_value_display = "-пусто-"
     prepopulated_fields = {"slug": ("title",)}
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ("post", "text", "author", "created")
+    list_select_related = ("post", "author")
     search_fields = ("text",)
-    list_filter = ("created",)
+    date_hierarchy = "created"
+    raw_id_fields = ("post", "author")
     empty_value_display = "-пусто-"
 
 
 class FollowAdmin(admin.ModelAdmin):
     list_display = ("user", "author")
+    list_select_related = ("user", "author")
+    raw_id_fields = ("user", "author")
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
-admin.site.register(Follow, FollowAdmin)
\ No newline at end of file
+admin.site.register(Follow, FollowAdmin)
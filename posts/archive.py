@@ -0,0 +1,57 @@
+import datetime as dt
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'author_id', 'group_id', 'image', 'views',
+    'text_html', 'html_version'
+)
+COMMENT_FIELDS = (
+    'id', 'post_id', 'author_id', 'text', 'created',
+    'text_html', 'html_version'
+)
+
+
+def archive_batch(ids):
+    """
+    Переносит посты с комментариями в холодные таблицы в одной
+    транзакции: вставка пачкой, затем удаление из горячих таблиц.
+    """
+    with transaction.atomic():
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**row)
+            for row in Post.objects.filter(id__in=ids).values(*POST_FIELDS)
+        )
+        comments = Comment.objects.filter(post_id__in=ids)
+        ArchivedComment.objects.bulk_create(
+            (
+                ArchivedComment(**row)
+                for row in comments.values(*COMMENT_FIELDS).iterator()
+            ),
+            batch_size=1000
+        )
+        comments.delete()
+        Post.objects.filter(id__in=ids).delete()
+
+
+def archive_posts(older_than_days=None, batch_size=500):
+    """
+    Архивирует посты старше older_than_days пачками по batch_size,
+    чтобы не держать длинных транзакций и блокировок.
+    """
+    days = older_than_days or getattr(settings, 'ARCHIVE_AFTER_DAYS', 365)
+    cutoff = timezone.now() - dt.timedelta(days=days)
+    total = 0
+    while True:
+        ids = list(
+            Post.objects.filter(pub_date__lt=cutoff).order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        archive_batch(ids)
+        total += len(ids)
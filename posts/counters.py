@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Comment, Follow, Post
+
+COUNTERS_TIMEOUT = 60 * 60
+
+USER_KEY = 'counters:user:{}'
+POST_KEY = 'counters:post:{}'
+
+
+def _grouped_count(queryset, field, ids):
+    rows = queryset.filter(**{f'{field}__in': ids}).values(field).annotate(
+        total=Count('id')
+    ).order_by()
+    return {row[field]: row['total'] for row in rows}
+
+
+def _get_many(key_template, ids, compute):
+    keys = {key_template.format(pk): pk for pk in ids}
+    cached = cache.get_many(keys)
+    result = {keys[key]: value for key, value in cached.items()}
+    missing = [pk for pk in ids if pk not in result]
+    if missing:
+        computed = compute(missing)
+        cache.set_many(
+            {key_template.format(pk): value for pk, value in computed.items()},
+            COUNTERS_TIMEOUT
+        )
+        result.update(computed)
+    return result
+
+
+def _compute_user_counters(ids):
+    followers = _grouped_count(Follow.objects, 'author', ids)
+    follow = _grouped_count(Follow.objects, 'user', ids)
+    posts = _grouped_count(Post.objects, 'author', ids)
+    return {
+        pk: {
+            'followers': followers.get(pk, 0),
+            'follow': follow.get(pk, 0),
+            'posts_count': posts.get(pk, 0),
+        }
+        for pk in ids
+    }
+
+
+def _compute_post_counters(ids):
+    comments = _grouped_count(Comment.objects, 'post', ids)
+    return {pk: {'comments_count': comments.get(pk, 0)} for pk in ids}
+
+
+def get_user_counters(ids):
+    """
+    Счётчики подписчиков, подписок и постов для списка id пользователей:
+    один cache.get_many и по одному GROUP BY на каждый счётчик для промахов.
+    """
+    return _get_many(USER_KEY, ids, _compute_user_counters)
+
+
+def get_post_counters(ids):
+    return _get_many(POST_KEY, ids, _compute_post_counters)
+
+
+def invalidate_users(*ids):
+    cache.delete_many([USER_KEY.format(pk) for pk in ids])
+
+
+def invalidate_posts(*ids):
+    cache.delete_many([POST_KEY.format(pk) for pk in ids])
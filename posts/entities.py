@@ -0,0 +1,119 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import router
+from django.http import Http404
+
+from .models import Group, User
+
+ENTITIES_TIMEOUT = 60 * 60
+
+USER_KEY = 'entities:user:{}'
+USERNAME_KEY = 'entities:username:{}'
+GROUP_KEY = 'entities:group:{}'
+SLUG_KEY = 'entities:slug:{}'
+
+# Хэш пароля в общий кэш не попадает: пользователь хранится полями без
+# password (из кэша он приходит отложенным и читается из БД только при
+# обращении), а для проверки сессии - готовый get_session_auth_hash().
+USER_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname != 'password'
+)
+
+
+def _pack(obj):
+    if not isinstance(obj, User):
+        return obj
+    return {
+        'fields': [getattr(obj, name) for name in USER_FIELDS],
+        'session_hash': obj.get_session_auth_hash(),
+    }
+
+
+def _unpack(model, value):
+    if model is not User:
+        return value
+    user = User.from_db(
+        router.db_for_read(User), USER_FIELDS, value['fields']
+    )
+    user.cached_session_hash = value['session_hash']
+    return user
+
+
+def _get_by_id(model, key_template, pk):
+    key = key_template.format(pk)
+    value = cache.get(key)
+    if value is not None:
+        return _unpack(model, value)
+    obj = model.objects.filter(pk=pk).first()
+    if obj is not None:
+        cache.set(key, _pack(obj), ENTITIES_TIMEOUT)
+    return obj
+
+
+def _natural_key(key_template, value):
+    # В URL может прийти что угодно, а memcached не принимает пробелы и
+    # длинные ключи.
+    return key_template.format(hashlib.md5(value.encode()).hexdigest())
+
+
+def _get_by_natural_key(model, id_template, key_template, field, value):
+    """
+    Объект по уникальному полю: кэш хранит value -> id, а сам объект
+    берётся из кэша по id. После переименования старая запись перестаёт
+    совпадать и считается промахом.
+    """
+    pk = cache.get(_natural_key(key_template, value))
+    if pk is not None:
+        obj = _get_by_id(model, id_template, pk)
+        if obj is not None and getattr(obj, field) == value:
+            return obj
+    obj = model.objects.filter(**{field: value}).first()
+    if obj is not None:
+        cache.set_many({
+            _natural_key(key_template, value): obj.pk,
+            id_template.format(obj.pk): _pack(obj),
+        }, ENTITIES_TIMEOUT)
+    return obj
+
+
+def get_user(pk):
+    """Пользователь по id из кэша или из БД; None, если его нет."""
+    return _get_by_id(User, USER_KEY, pk)
+
+
+def get_user_by_username(username):
+    return _get_by_natural_key(
+        User, USER_KEY, USERNAME_KEY, 'username', username
+    )
+
+
+def get_group(slug):
+    return _get_by_natural_key(Group, GROUP_KEY, SLUG_KEY, 'slug', slug)
+
+
+def get_user_or_404(username):
+    user = get_user_by_username(username)
+    if user is None:
+        raise Http404('Пользователь не найден')
+    return user
+
+
+def get_group_or_404(slug):
+    group = get_group(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
+
+
+def invalidate_user(user):
+    cache.delete_many([
+        USER_KEY.format(user.pk), _natural_key(USERNAME_KEY, user.username)
+    ])
+
+
+def invalidate_group(group):
+    cache.delete_many([
+        GROUP_KEY.format(group.pk), _natural_key(SLUG_KEY, group.slug)
+    ])
@@ -0,0 +1,176 @@
+import hashlib
+import uuid
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from .entities import get_group_or_404, get_user_or_404
+from .models import Post
+
+FEED_SIZE = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+# Состояние без изменений живёт сутки: потом просто начнётся новая
+# версия, а ключи удалённых групп и авторов не копятся в кэше.
+FEED_STATE_TIMEOUT = 24 * 60 * 60
+STATE_KEY = 'feeds:state:{}'
+CONTENT_KEY = 'feeds:content:{}:{}'
+
+INDEX_SCOPE = 'index'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def touch(*scopes):
+    """
+    Сбрасывает кэш лент и дату их последнего изменения; вызывается при
+    сохранении и удалении постов.
+    """
+    state = {'version': uuid.uuid4().hex, 'modified': timezone.now()}
+    cache.set_many(
+        {STATE_KEY.format(scope): state for scope in scopes},
+        FEED_STATE_TIMEOUT
+    )
+
+
+def get_state(scope):
+    key = STATE_KEY.format(scope)
+    state = cache.get(key)
+    if state is None:
+        state = {'version': uuid.uuid4().hex, 'modified': timezone.now()}
+        cache.add(key, state, FEED_STATE_TIMEOUT)
+        state = cache.get(key, state)
+    return state
+
+
+class PostsFeed(Feed):
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.posts(obj).values(
+            'id', 'text', 'pub_date', 'author__username'
+        ).order_by('-pub_date')[:FEED_SIZE]
+
+    def item_title(self, item):
+        return item['text'][:50]
+
+    def item_description(self, item):
+        return item['text']
+
+    def item_link(self, item):
+        return reverse('post', args=(item['author__username'], item['id']))
+
+    def item_pubdate(self, item):
+        return item['pub_date']
+
+    def item_author_name(self, item):
+        return item['author__username']
+
+    def scope(self, obj):
+        """Область ленты, см. touch."""
+        return INDEX_SCOPE
+
+
+class IndexFeed(PostsFeed):
+    title = 'Yatube: последние обновления'
+    description = 'Новые записи всех авторов'
+
+    def link(self):
+        return reverse('index')
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return get_group_or_404(slug)
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('group', args=(obj.slug,))
+
+    def scope(self, obj):
+        return group_scope(obj.id)
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_user_or_404(username)
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+    def title(self, obj):
+        return f'Yatube: @{obj.username}'
+
+    def description(self, obj):
+        return f'Записи пользователя {obj.get_full_name() or obj.username}'
+
+    def link(self, obj):
+        return reverse('profile', args=(obj.username,))
+
+    def scope(self, obj):
+        return author_scope(obj.id)
+
+
+def atom(feed_class):
+    return type(
+        f'Atom{feed_class.__name__}', (feed_class,),
+        {'feed_type': Atom1Feed, 'subtitle': feed_class.description}
+    )
+
+
+def cached_feed(feed):
+    """
+    Отдаёт ленту из кэша и отвечает 304 на условные запросы, не обращаясь
+    к БД, пока в области ленты не появилось изменений.
+    """
+    feed = feed()
+
+    def etag(request, state, **kwargs):
+        return hashlib.md5(
+            f'{request.path}:{state["version"]}'.encode()
+        ).hexdigest()
+
+    def last_modified(request, state, **kwargs):
+        return state['modified']
+
+    @condition(etag_func=etag, last_modified_func=last_modified)
+    def cached(request, state, **kwargs):
+        key = CONTENT_KEY.format(request.path, state['version'])
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        response = feed(request, **kwargs)
+        # Last-Modified выставит condition по состоянию ленты в кэше.
+        del response['Last-Modified']
+        cache.set(
+            key, (response.content, response['Content-Type']),
+            FEED_CACHE_TIMEOUT
+        )
+        return response
+
+    def view(request, **kwargs):
+        # Сначала объект: несуществующая группа или автор - это 404, а
+        # не новое состояние ленты в кэше.
+        obj = feed.get_object(request, **kwargs)
+        return cached(request, get_state(feed.scope(obj)), **kwargs)
+    return view
@@ -0,0 +1,145 @@
+"""
+Статические страницы (flatpages), заранее отрендеренные в HTML.
+
+Гостям nginx отдаёт файлы из FLATPAGES_ROOT, не обращаясь к Django;
+файл страницы пересобирается при её сохранении и командой
+build_flatpages. Авторизованным пользователям страница рендерится в
+Django (в шапке их имя), но FlatPage берётся из кэша, а не из БД.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.flatpages.models import FlatPage
+from django.contrib.flatpages.views import DEFAULT_TEMPLATE, render_flatpage
+from django.core.cache import cache
+from django.http import Http404, HttpRequest
+from django.template import loader
+from django.utils.safestring import mark_safe
+
+FLATPAGES_TIMEOUT = 60 * 60
+PAGE_KEY = 'flatpages:{}:{}'
+INDEX = 'index.html'
+
+
+def _key(url):
+    return PAGE_KEY.format(
+        settings.SITE_ID, hashlib.md5(url.encode()).hexdigest()
+    )
+
+
+def get_flatpage(url):
+    """Страница текущего сайта по url из кэша или из БД; None, если нет."""
+    key = _key(url)
+    flatpage = cache.get(key)
+    if flatpage is None:
+        flatpage = FlatPage.objects.filter(
+            url=url, sites=settings.SITE_ID
+        ).first()
+        if flatpage is not None:
+            cache.set(key, flatpage, FLATPAGES_TIMEOUT)
+    return flatpage
+
+
+def invalidate(*urls):
+    cache.delete_many([_key(url) for url in urls])
+
+
+def flatpage(request, url):
+    """Замена django.contrib.flatpages.views.flatpage с кэшем страницы."""
+    if not url.startswith('/'):
+        url = '/' + url
+    page = get_flatpage(url)
+    if page is None:
+        raise Http404('Страница не найдена')
+    return render_flatpage(request, page)
+
+
+def path_for(url, root=None):
+    """/about-author/ -> <root>/about-author/index.html."""
+    root = os.path.abspath(root or settings.FLATPAGES_ROOT)
+    path = os.path.normpath(os.path.join(root, url.strip('/'), INDEX))
+    if not path.startswith(root + os.sep):
+        raise ValueError(f'Недопустимый url страницы: {url}')
+    return path
+
+
+def guest_request(url):
+    """
+    Запрос гостя к странице: без него не работают контекст-процессоры
+    (год в подвале, request в шаблонах).
+    """
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = url
+    request.user = AnonymousUser()
+    return request
+
+
+def render_static(page):
+    """HTML страницы, каким его видит гость."""
+    template = loader.select_template(
+        [page.template_name, DEFAULT_TEMPLATE] if page.template_name
+        else [DEFAULT_TEMPLATE]
+    )
+    page.title = mark_safe(page.title)
+    page.content = mark_safe(page.content)
+    return template.render({'flatpage': page}, guest_request(page.url))
+
+
+def is_public(page):
+    return not page.registration_required and page.sites.filter(
+        id=settings.SITE_ID
+    ).exists()
+
+
+def write(page, root=None):
+    """
+    Пересобирает файл страницы или удаляет его, если страница закрыта
+    или не относится к текущему сайту. Возвращает True, если файл записан.
+    """
+    path = path_for(page.url, root)
+    if not is_public(page):
+        remove(page.url, root)
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render_static(page))
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_url(url, root=None):
+    page = FlatPage.objects.filter(url=url).first()
+    if page is None:
+        remove(url, root)
+    else:
+        write(page, root)
+
+
+def remove(url, root=None):
+    path = path_for(url, root)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def build(root=None):
+    """
+    Пересобирает файлы всех страниц текущего сайта и удаляет файлы
+    страниц, которых больше нет. Возвращает список url записанных страниц.
+    """
+    root = os.path.abspath(root or settings.FLATPAGES_ROOT)
+    os.makedirs(root, exist_ok=True)
+    written = [
+        page.url for page in FlatPage.objects.order_by('url') if write(
+            page, root
+        )
+    ]
+    expected = {path_for(url, root) for url in written}
+    for directory, _, files in os.walk(root):
+        path = os.path.join(directory, INDEX)
+        if INDEX in files and path not in expected:
+            os.remove(path)
+    return written
@@ -0,0 +1,105 @@
+"""
+Подписки пачками: одна вставка с ignore_conflicts и один delete() на
+пачку вместо exists() + create() на каждого автора. bulk_create не
+вызывает сигналы Follow, поэтому счётчики сбрасываются здесь же.
+"""
+import csv
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.db.models import Q
+
+from . import counters
+from .models import Follow, User
+
+
+def resolve(usernames):
+    """{username: id} для существующих пользователей из списка."""
+    return dict(User.objects.filter(username__in=set(usernames)).values_list(
+        'username', 'id'
+    ))
+
+
+def _invalidate(pairs):
+    counters.invalidate_users(*{pk for pair in pairs for pk in pair})
+
+
+def follow_pairs(pairs):
+    """
+    Создаёт подписки по парам (user_id, author_id) одной вставкой и
+    возвращает число новых. Существующие подписки не считаются, а
+    созданные параллельным запросом пропускаются по unique_follow;
+    подписки на себя отбрасываются.
+    """
+    pairs = {(user, author) for user, author in pairs if user != author}
+    if not pairs:
+        return 0
+    existing = set(Follow.objects.filter(
+        user__in={user for user, _ in pairs},
+        author__in={author for _, author in pairs},
+    ).values_list('user_id', 'author_id'))
+    new = pairs - existing
+    if not new:
+        return 0
+    Follow.objects.bulk_create(
+        [Follow(user_id=user, author_id=author) for user, author in new],
+        ignore_conflicts=True,
+    )
+    _invalidate(new)
+    return len(new)
+
+
+def unfollow_pairs(pairs):
+    """Удаляет подписки по парам одним запросом; возвращает число удалённых."""
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+    queryset = Follow.objects.filter(reduce(or_, (
+        Q(user=user, author=author) for user, author in pairs
+    )))
+    deleted, _ = queryset.delete()
+    _invalidate(pairs)
+    return deleted
+
+
+def follow_many(user, author_ids):
+    return follow_pairs((user.pk, pk) for pk in author_ids)
+
+
+def unfollow_many(user, author_ids):
+    author_ids = set(author_ids)
+    if not author_ids:
+        return 0
+    deleted, _ = Follow.objects.filter(
+        user=user.pk, author__in=author_ids
+    ).delete()
+    counters.invalidate_users(user.pk, *author_ids)
+    return deleted
+
+
+def import_pairs(lines, unfollow=False, batch_size=1000):
+    """
+    Подписывает (или отписывает) по CSV-строкам «подписчик,автор» пачками
+    по batch_size: на пачку один запрос за id и одна вставка или DELETE.
+    Возвращает (обработано пар, пропущено строк с неизвестными именами).
+    """
+    rows = csv.reader(lines)
+    done = skipped = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return done, skipped
+        names = [
+            (row[0].strip(), row[1].strip()) for row in batch if len(row) >= 2
+        ]
+        ids = resolve(name for pair in names for name in pair)
+        pairs = [
+            (ids[user], ids[author]) for user, author in names
+            if user in ids and author in ids
+        ]
+        skipped += len(names) - len(pairs)
+        if unfollow:
+            done += unfollow_pairs(pairs)
+        else:
+            done += follow_pairs(pairs)
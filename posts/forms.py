@@ -1,12 +1,75 @@
 from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
+from .images import optimize_image
 from .models import Comment, Post
+from .uploads import check_upload
+
+
+class LimitedImageField(forms.ImageField):
+    """Проверяет размер файла до того, как его откроет Pillow."""
+
+    def to_python(self, data):
+        if data and getattr(data, 'size', 0) > settings.FILE_UPLOAD_MAX_SIZE:
+            raise forms.ValidationError(
+                'Файл слишком большой: %(size)s, допустимо до %(limit)s.',
+                code='file_too_large',
+                params={
+                    'size': filesizeformat(data.size),
+                    'limit': filesizeformat(settings.FILE_UPLOAD_MAX_SIZE),
+                },
+            )
+        return super().to_python(data)
 
 
 class PostForm(forms.ModelForm):
+    # Ключ картинки, загруженной браузером напрямую в хранилище.
+    image_key = forms.CharField(
+        required=False, max_length=255, widget=forms.HiddenInput
+    )
+
     class Meta:
         model = Post
         fields = ('group', 'text', 'image')
+        field_classes = {'image': LimitedImageField}
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if not isinstance(image, UploadedFile):
+            return image
+        try:
+            return optimize_image(image, image.name) or image
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # Обрезанный файл проходит verify() в ImageField, но не
+            # декодируется целиком.
+            raise forms.ValidationError(
+                self.fields['image'].error_messages['invalid_image'],
+                code='invalid_image',
+            )
+
+    def clean_image_key(self):
+        key = self.cleaned_data['image_key']
+        if not key:
+            return key
+        if self.user is None:
+            raise forms.ValidationError('Прямая загрузка файлов отключена.')
+        error = check_upload(self.user, key)
+        if error:
+            raise forms.ValidationError(error)
+        return key
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('image_key'):
+            cleaned_data['image'] = cleaned_data['image_key']
+        return cleaned_data
 
 
 class CommentForm(forms.ModelForm):
@@ -0,0 +1,147 @@
+"""
+Подготовка картинок перед сохранением: поворот по EXIF и удаление
+метаданных, уменьшение до IMAGE_MAX_DIMENSION по большей стороне и
+перекодирование в progressive JPEG (или WebP).
+"""
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from .models import ArchivedPost, Post
+from .tasks import warm_thumbnail
+
+# GIF не трогаем: перекодирование ломает анимацию.
+RECOMPRESS_FORMATS = {'JPEG', 'PNG', 'WEBP', 'BMP', 'TIFF', 'MPO'}
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+
+def has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+
+
+def output_format(image):
+    target = settings.IMAGE_OUTPUT_FORMAT
+    if target == 'JPEG' and has_alpha(image):
+        return 'PNG'
+    return target
+
+
+def encode(image, image_format):
+    output = io.BytesIO()
+    if image_format == 'JPEG':
+        image.convert('RGB').save(
+            output, 'JPEG', quality=settings.IMAGE_QUALITY,
+            optimize=True, progressive=True,
+        )
+    elif image_format == 'WEBP':
+        image.save(
+            output, 'WEBP', quality=settings.IMAGE_QUALITY, method=6
+        )
+    else:
+        image.save(output, image_format, optimize=True)
+    return output.getvalue()
+
+
+def optimize_image(file, name):
+    """
+    Перекодированная картинка как ContentFile или None, если исходник
+    лучше оставить как есть.
+    """
+    file.seek(0)
+    original = file.read()
+    image = Image.open(io.BytesIO(original))
+    if image.format not in RECOMPRESS_FORMATS:
+        return None
+    had_metadata = bool(image.info.get('exif') or image.getexif())
+    image = ImageOps.exif_transpose(image)
+    max_dimension = settings.IMAGE_MAX_DIMENSION
+    resized = max(image.size) > max_dimension
+    if resized:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    image_format = output_format(image)
+    data = encode(image, image_format)
+    if len(data) >= len(original) and not resized and not had_metadata:
+        return None
+    base = os.path.splitext(os.path.basename(name))[0]
+    return ContentFile(data, name=f'{base}.{EXTENSIONS[image_format]}')
+
+
+def recompress_post(post_id, name, dry_run=False):
+    """
+    Пережимает картинку поста. Возвращает размер исходника и ContentFile
+    с новой картинкой (None, если её лучше оставить как есть).
+    """
+    with default_storage.open(name) as file:
+        original_size = file.size
+        optimized = optimize_image(file, name)
+    if optimized is not None and not dry_run:
+        new_name = default_storage.save(
+            os.path.join(os.path.dirname(name), optimized.name), optimized
+        )
+        Post.objects.filter(id=post_id, image=name).update(image=new_name)
+        warm_thumbnail.delay(post_id, key=f'thumbnail:{post_id}:{new_name}')
+        delete_unused(name)
+    return original_size, optimized
+
+
+def delete_unused(name):
+    in_use = (Post.objects.filter(image=name).exists()
+              or ArchivedPost.objects.filter(image=name).exists())
+    if not in_use:
+        default_storage.delete(name)
+
+
+def optimize_upload(post):
+    """
+    Пережимает картинку, загруженную браузером напрямую в хранилище:
+    форма видела только её ключ. Готовый файл переезжает в каталог
+    upload_to поля image, исходник удаляется.
+    """
+    name = post.image.name
+    with default_storage.open(name) as file:
+        optimized = optimize_image(file, name)
+    if optimized is None:
+        return False
+    upload_to = Post._meta.get_field('image').upload_to
+    post.image = default_storage.save(
+        os.path.join(upload_to, optimized.name), optimized
+    )
+    # Через save(): сигналы сбросят ленты со старой ссылкой на картинку.
+    post.save(update_fields=['image'])
+    delete_unused(name)
+    return True
+
+
+def recompress_media(dry_run=False):
+    """
+    Пережимает картинки существующих постов. Возвращает статистику:
+    сколько файлов проверено и пережато, объём до и после.
+    """
+    stats = {'checked': 0, 'recompressed': 0, 'failed': 0,
+             'bytes_before': 0, 'bytes_after': 0}
+    rows = Post.objects.exclude(
+        Q(image='') | Q(image__isnull=True)
+    ).values_list('id', 'image').order_by('id')
+    for post_id, name in rows.iterator():
+        try:
+            original_size, optimized = recompress_post(
+                post_id, name, dry_run
+            )
+        except (OSError, ValueError, Image.DecompressionBombError):
+            stats['failed'] += 1
+            continue
+        stats['checked'] += 1
+        stats['bytes_before'] += original_size
+        if optimized is None:
+            stats['bytes_after'] += original_size
+            continue
+        stats['recompressed'] += 1
+        stats['bytes_after'] += optimized.size
+    return stats
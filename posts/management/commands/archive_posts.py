@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_posts
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты и комментарии в архивные таблицы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=None,
+            help='Возраст поста в днях (по умолчанию ARCHIVE_AFTER_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько постов переносить в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        total = archive_posts(
+            older_than_days=options['older_than'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(f'Перенесено в архив постов: {total}')
@@ -0,0 +1,113 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory, override_settings
+from django.test.utils import setup_databases, teardown_databases
+
+from posts.models import Post, User
+from yatube.cache import get_cache, reset_cache
+
+# Фрагменты ленты кэшируются: замер сбрасывает свой кэш, а не общий.
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench_templates',
+    },
+}
+
+FEED = (
+    '{% for post in page %}'
+    '{% include "includes/post_item.html" with post=post %}'
+    '{% endfor %}'
+)
+
+
+def django_engine(cached):
+    options = dict(settings.TEMPLATES[0]['OPTIONS'])
+    loaders = settings.TEMPLATE_LOADERS
+    options['loaders'] = (
+        [('django.template.loaders.cached.Loader', loaders)]
+        if cached else loaders
+    )
+    return DjangoTemplates({
+        'NAME': 'bench',
+        'DIRS': settings.TEMPLATES[0]['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': options,
+    })
+
+
+def measure(render, repeat):
+    render()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время рендера index.html и ленты постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, nargs='+', default=[10, 50, 100],
+            help='Размеры страницы ленты',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Число повторов каждого замера',
+        )
+
+    def handle(self, *args, **options):
+        # Посты для замера пишутся во временную тестовую БД, рабочая база
+        # и общий кэш не затрагиваются.
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(CACHES=BENCH_CACHES):
+                reset_cache()
+                try:
+                    self.run(options['posts'], options['repeat'])
+                finally:
+                    reset_cache()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    def run(self, sizes, repeat):
+        author = User.objects.create_user(username='bench-author')
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый пост {i}\nвторая строка', author=author)
+            for i in range(max(sizes))
+        )
+        request = RequestFactory().get('/')
+        request.user = author
+        variants = {
+            'без кэша': django_engine(cached=False),
+            'cached.Loader': django_engine(cached=True),
+        }
+
+        self.stdout.write(f'{"шаблон":<12}{"постов":>8}  {"вариант":<16}мс')
+        for size in sizes:
+            posts = Post.objects.filter(author=author).select_related(
+                'author', 'group'
+            )
+            page = Paginator(posts, size).get_page(1)
+            context = {'page': page, 'paginator': page.paginator}
+            page.object_list = list(page.object_list)
+            tiered = get_cache()
+            for label, engine in variants.items():
+                index = engine.get_template('index.html')
+                feed = engine.from_string(FEED)
+                # Фрагментный кэш ленты сбрасывается, чтобы мерить рендер.
+                self.report('index.html', size, label, measure(
+                    lambda: tiered.clear() or index.render(context, request),
+                    repeat
+                ))
+                self.report('feed', size, label, measure(
+                    lambda: feed.render(context, request), repeat
+                ))
+
+    def report(self, name, size, label, elapsed):
+        self.stdout.write(f'{name:<12}{size:>8}  {label:<16}{elapsed:.2f}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.flatpages import build
+
+
+class Command(BaseCommand):
+    help = 'Рендерит статические страницы в HTML-файлы для nginx'
+
+    def handle(self, *args, **options):
+        written = build()
+        self.stdout.write(
+            f'Собрано страниц: {len(written)}'
+            + (f' ({", ".join(written)})' if written else '')
+        )
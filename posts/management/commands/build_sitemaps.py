@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Собирает статические файлы карты сайта для nginx'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересобрать все файлы, а не только изменившиеся',
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = build_sitemaps(full=options['full'])
+        self.stdout.write(
+            f'Пересобрано файлов: {len(rebuilt)}'
+            + (f' ({", ".join(rebuilt)})' if rebuilt else '')
+        )
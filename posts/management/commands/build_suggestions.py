@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import build
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации "на кого подписаться"'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Сколько авторов рекомендовать каждому пользователю',
+        )
+        parser.add_argument(
+            '--processes', type=int, default=None,
+            help='Число процессов (по умолчанию - число ядер)',
+        )
+
+    def handle(self, *args, **options):
+        total = build(limit=options['limit'], processes=options['processes'])
+        self.stdout.write(f'Пользователей с рекомендациями: {total}')
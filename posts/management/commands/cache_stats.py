@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from yatube.cache import STAT_FIELDS, get_cache
+
+
+class Command(BaseCommand):
+    help = 'Показывает счётчики двухуровневого кэша по ключам'
+
+    def handle(self, *args, **options):
+        stats = get_cache().get_stats()
+        if not stats:
+            self.stdout.write('Статистики пока нет')
+            return
+        width = max(len(key) for key in stats)
+        self.stdout.write(
+            'ключ'.ljust(width) + ''.join(f'{f:>10}' for f in STAT_FIELDS)
+        )
+        for key, counters in stats.items():
+            self.stdout.write(key.ljust(width) + ''.join(
+                f'{counters[field]:>10}' for field in STAT_FIELDS
+            ))
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.follows import import_pairs
+
+
+class Command(BaseCommand):
+    help = (
+        'Массово подписывает пользователей по CSV со строками '
+        '«подписчик,автор» (или отписывает с --unfollow)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='CSV-файл; «-» - читать из stdin'
+        )
+        parser.add_argument('--unfollow', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        kwargs = {
+            'unfollow': options['unfollow'],
+            'batch_size': options['batch_size'],
+        }
+        if options['path'] == '-':
+            done, skipped = import_pairs(sys.stdin, **kwargs)
+        else:
+            with open(options['path'], newline='', encoding='utf-8') as f:
+                done, skipped = import_pairs(f, **kwargs)
+        action = 'Отписано пар' if options['unfollow'] else 'Подписано пар'
+        self.stdout.write(
+            f'{action}: {done}, пропущено строк '
+            f'с неизвестными пользователями: {skipped}'
+        )
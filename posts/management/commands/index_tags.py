@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.tagging import backfill
+
+
+class Command(BaseCommand):
+    help = 'Заполняет индекс тегов и упоминаний по уже опубликованным постам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = backfill(batch_size=options['batch_size'])
+        self.stdout.write(f'Проиндексировано постов: {total}')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.ranking import recompute
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг популярных постов за последние дни'
+
+    def handle(self, *args, **options):
+        total = recompute()
+        self.stdout.write(f'Пересчитано постов: {total}')
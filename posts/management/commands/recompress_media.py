@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from posts.images import recompress_media
+
+
+class Command(BaseCommand):
+    help = (
+        'Пережимает картинки постов (EXIF, размер, формат) и показывает, '
+        'сколько места это экономит'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать экономию, ничего не сохранять',
+        )
+
+    def handle(self, *args, **options):
+        stats = recompress_media(dry_run=options['dry_run'])
+        before, after = stats['bytes_before'], stats['bytes_after']
+        saved = before - after
+        percent = saved * 100 / before if before else 0
+        self.stdout.write(
+            f'Проверено файлов: {stats["checked"]}, '
+            f'пережато: {stats["recompressed"]}, '
+            f'ошибок: {stats["failed"]}'
+        )
+        self.stdout.write(
+            f'Было: {filesizeformat(before)} ({before} байт), '
+            f'стало: {filesizeformat(after)} ({after} байт), '
+            f'экономия: {saved} байт ({percent:.1f}%)'
+        )
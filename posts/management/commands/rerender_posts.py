@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from posts.rendering import RENDER_VERSION, rerender_all
+
+
+class Command(BaseCommand):
+    help = (
+        'Перерисовывает сохранённый HTML постов и комментариев, '
+        'отрендеренный старой версией правил'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=None,
+            help='Число процессов для рендера (по умолчанию - по числу CPU)',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перерисовать все записи, а не только устаревшие',
+        )
+
+    def handle(self, *args, **options):
+        totals = rerender_all(
+            processes=options['processes'],
+            batch_size=options['batch_size'],
+            force=options['force'],
+        )
+        for name, total in totals.items():
+            self.stdout.write(f'{name}: перерисовано {total}')
+        self.stdout.write(f'Версия рендера: {RENDER_VERSION}')
@@ -17,7 +17,9 @@ class Post(models.Model):
     text = models.TextField(
         'Текст', help_text='Напишите что-нибудь'
     )
-    pub_date = models.DateTimeField("date published", auto_now_add=True)
+    pub_date = models.DateTimeField(
+        "date published", auto_now_add=True, db_index=True
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="posts"
     )
@@ -33,6 +35,15 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True, null=True
     )
+    # Готовый HTML текста, см. rendering.py.
+    text_html = models.TextField(blank=True, editable=False)
+    html_version = models.PositiveSmallIntegerField(
+        default=0, editable=False
+    )
+    # Копится в памяти воркеров и сбрасывается пачками, см. viewcounts.py.
+    views = models.PositiveIntegerField(
+        'Просмотры', default=0, editable=False
+    )
 
     class Meta:
         ordering = ['-pub_date']
@@ -40,6 +51,20 @@ class Post(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        # views меняет только viewcounts через F(): полное сохранение из
+        # формы, API или админки не должно затирать его прочитанным
+        # когда-то значением.
+        if update_fields is None and not (
+            self._state.adding or force_insert
+        ):
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'views'
+            ]
+        super().save(force_insert, force_update, using, update_fields)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -51,7 +76,13 @@ class Comment(models.Model):
     text = models.TextField(
         'Текст', help_text='Напишите что-нибудь'
     )
-    created = models.DateTimeField("date published", auto_now_add=True)
+    text_html = models.TextField(blank=True, editable=False)
+    html_version = models.PositiveSmallIntegerField(
+        default=0, editable=False
+    )
+    created = models.DateTimeField(
+        "date published", auto_now_add=True, db_index=True
+    )
 
 
 class Follow(models.Model):
@@ -68,3 +99,124 @@ class Follow(models.Model):
                 fields=['user', 'author'], name='unique_follow'
             )
         ]
+        # Списки подписчиков листаются по (author, user), подписок - по
+        # индексу unique_follow.
+        indexes = [models.Index(fields=['author', 'user'])]
+
+
+class PostScore(models.Model):
+    post = models.OneToOneField(
+        Post, on_delete=models.CASCADE, primary_key=True,
+        related_name="score"
+    )
+    group = models.ForeignKey(
+        Group, on_delete=models.SET_NULL, related_name="+",
+        blank=True, null=True
+    )
+    score = models.FloatField(db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['group', '-score'])]
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    """
+    Индекс постов по тегу; pub_date повторяет дату поста, чтобы лента
+    тега читалась по индексу без сортировки постов.
+    """
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="+")
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="post_tags"
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tag', 'post'], name='unique_post_tag'
+            )
+        ]
+        indexes = [models.Index(fields=['tag', '-pub_date', '-post'])]
+
+
+class Mention(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="mentions"
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="mentions"
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_mention'
+            )
+        ]
+        indexes = [models.Index(fields=['user', '-pub_date', '-post'])]
+
+
+class FollowSuggestion(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name="follow_suggestion"
+    )
+    authors = models.TextField(blank=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def author_ids(self):
+        return [int(pk) for pk in self.authors.split(',') if pk]
+
+
+class ArchivedPost(models.Model):
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField('Текст')
+    pub_date = models.DateTimeField("date published", db_index=True)
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_posts"
+    )
+    group = models.ForeignKey(
+        Group,
+        verbose_name='Группа',
+        on_delete=models.SET_NULL,
+        related_name="archived_posts", blank=True, null=True
+    )
+    image = models.ImageField(
+        'Изображение',
+        upload_to='posts/',
+        blank=True, null=True
+    )
+    views = models.PositiveIntegerField('Просмотры', default=0)
+    text_html = models.TextField(blank=True)
+    html_version = models.PositiveSmallIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    archived = True
+
+    class Meta:
+        ordering = ['-pub_date']
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost, on_delete=models.CASCADE, related_name="comments"
+    )
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_comments"
+    )
+    text = models.TextField('Текст')
+    text_html = models.TextField(blank=True)
+    html_version = models.PositiveSmallIntegerField(default=0)
+    created = models.DateTimeField("date published")
@@ -0,0 +1,97 @@
+import base64
+import binascii
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .models import Post
+
+
+def encode_cursor(position, pk):
+    raw = f'{position.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        position, pk = raw.rsplit('|', 1)
+        position = parse_datetime(position)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if position is None:
+        return None
+    return position, pk
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Для нефильтрованного списка на Postgres берёт число строк из
+    статистики планировщика (pg_class.reltuples) вместо COUNT(*),
+    который на больших таблицах читает всю таблицу.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate()
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+    def estimate(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where or query.distinct:
+            return None
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s',
+                [self.object_list.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return None
+        return int(row[0])
+
+
+class KeysetPage(list):
+    def __init__(self, posts, next_cursor):
+        super().__init__(posts)
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def keyset_page(index, cursor=None, per_page=10):
+    """
+    Страница постов по индексной таблице с полями pub_date и post
+    (PostTag, Mention): позиция задаётся курсором, а не OFFSET, поэтому
+    глубокие страницы стоят столько же, сколько первая.
+    """
+    index = index.order_by('-pub_date', '-post')
+    decoded = decode_cursor(cursor) if cursor else None
+    if decoded is not None:
+        position, pk = decoded
+        index = index.filter(
+            Q(pub_date__lt=position) | Q(pub_date=position, post__lt=pk)
+        )
+    rows = list(index.values_list('post_id', 'pub_date')[:per_page + 1])
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+    posts = Post.objects.select_related('author', 'group').in_bulk(
+        [pk for pk, _ in rows]
+    )
+    return KeysetPage(
+        [posts[pk] for pk, _ in rows if pk in posts], next_cursor
+    )
@@ -0,0 +1,175 @@
+import datetime as dt
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Exp, Greatest, Ln
+from django.utils import timezone
+
+from .counters import get_user_counters
+from .models import Comment, Follow, Post, PostScore
+
+# Точка отсчёта для логарифмической шкалы. Рейтинг хранится как
+# log(sum(w * exp(decay * (t - EPOCH)))), поэтому новые события только
+# добавляются к нему, а старые записи не нужно пересчитывать со временем:
+# порядок по такому рейтингу совпадает с порядком по затухающему счёту.
+EPOCH = dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)
+# exp() на PostgreSQL падает с underflow ниже примерно -745; при таком
+# показателе ln(1 + exp(x)) всё равно равен 0.
+MIN_EXPONENT = -700.0
+
+
+def decay():
+    half_life = getattr(settings, 'RANKING_HALF_LIFE_HOURS', 24) * 3600
+    return math.log(2) / half_life
+
+
+def time_term(when):
+    return decay() * (when - EPOCH).total_seconds()
+
+
+def base_weight(followers):
+    weight = getattr(settings, 'RANKING_FOLLOWERS_WEIGHT', 1.0)
+    return 1 + weight * math.log1p(followers)
+
+
+def logaddexp(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def initial_score(post, followers):
+    return math.log(base_weight(followers)) + time_term(post.pub_date)
+
+
+def score_post(post):
+    """
+    Заводит рейтинг нового поста: вес автора по числу подписчиков в
+    момент публикации.
+    """
+    followers = Follow.objects.filter(author=post.author_id).count()
+    PostScore.objects.update_or_create(
+        post=post, defaults={
+            'group_id': post.group_id,
+            'score': initial_score(post, followers),
+        }
+    )
+
+
+def log1p_exp(exponent):
+    """ln(1 + exp(exponent)) в SQL без underflow."""
+    return Ln(Exp(Greatest(exponent, Value(MIN_EXPONENT))) + Value(1.0))
+
+
+def add_comment_activity(post_id, when=None):
+    """
+    Учитывает новый комментарий одним атомарным UPDATE без блокировок
+    в Python: score = x + ln(1 + exp(score - x)).
+    """
+    term = time_term(when or timezone.now())
+    PostScore.objects.filter(post_id=post_id).update(
+        score=Value(term) + log1p_exp(F('score') - Value(term))
+    )
+
+
+def views_weight(views):
+    """ln(вес просмотров); -inf, если просмотры не учитываются."""
+    weight = getattr(settings, 'RANKING_VIEWS_WEIGHT', 0.05) * views
+    return math.log(weight) if weight > 0 else -math.inf
+
+
+def add_view_activity(views, when=None):
+    """
+    Учитывает пачку просмотров {post_id: число} одним UPDATE, так же как
+    комментарии: просмотр - событие с весом RANKING_VIEWS_WEIGHT.
+    """
+    weights = {
+        post_id: views_weight(count) for post_id, count in views.items()
+    }
+    weights = {
+        post_id: weight for post_id, weight in weights.items()
+        if weight > -math.inf
+    }
+    if not weights:
+        return
+    term = time_term(when or timezone.now())
+    activity = Case(
+        *[
+            When(post_id=post_id, then=Value(term + weight))
+            for post_id, weight in weights.items()
+        ],
+        output_field=FloatField(),
+    )
+    PostScore.objects.filter(post_id__in=weights).update(
+        score=activity + log1p_exp(F('score') - activity)
+    )
+
+
+def window_start():
+    days = getattr(settings, 'RANKING_WINDOW_DAYS', 14)
+    return timezone.now() - dt.timedelta(days=days)
+
+
+def recompute(batch_size=1000):
+    """
+    Пересчитывает рейтинг постов из окна RANKING_WINDOW_DAYS и удаляет
+    записи старше окна; история за пределами окна не читается.
+    """
+    since = window_start()
+    PostScore.objects.filter(post__pub_date__lt=since).delete()
+    posts = Post.objects.filter(pub_date__gte=since).values(
+        'id', 'author_id', 'group_id', 'pub_date', 'views'
+    ).order_by('id')
+    total = 0
+    last_id = 0
+    while True:
+        batch = list(posts.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1]['id']
+        followers = get_user_counters(
+            list({row['author_id'] for row in batch})
+        )
+        scores = {
+            row['id']: (
+                math.log(base_weight(
+                    followers[row['author_id']]['followers']
+                )) + time_term(row['pub_date'])
+            )
+            for row in batch
+        }
+        # Время просмотров не хранится: считаем их по дате публикации.
+        for row in batch:
+            if row['views']:
+                scores[row['id']] = logaddexp(
+                    scores[row['id']],
+                    views_weight(row['views']) + time_term(row['pub_date'])
+                )
+        comments = Comment.objects.filter(
+            post_id__in=scores
+        ).values_list('post_id', 'created').iterator()
+        for post_id, created in comments:
+            scores[post_id] = logaddexp(scores[post_id], time_term(created))
+        rows = [
+            PostScore(post_id=row['id'], group_id=row['group_id'],
+                      score=scores[row['id']])
+            for row in batch
+        ]
+        # Строки обновляются на месте под блокировкой: пост не пропадает
+        # из популярного, а параллельный инкремент ждёт коммита пачки и
+        # ложится поверх пересчитанного рейтинга.
+        with transaction.atomic():
+            existing = set(PostScore.objects.select_for_update().filter(
+                post_id__in=scores
+            ).values_list('post_id', flat=True))
+            PostScore.objects.bulk_update(
+                [row for row in rows if row.post_id in existing],
+                ['group', 'score'],
+            )
+            PostScore.objects.bulk_create(
+                [row for row in rows if row.post_id not in existing],
+                ignore_conflicts=True,
+            )
+        total += len(batch)
+    return total
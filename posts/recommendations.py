@@ -0,0 +1,163 @@
+import heapq
+import os
+from array import array
+from collections import defaultdict
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Follow, FollowSuggestion, User
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Граф живёт в глобальной переменной модуля: дочерние процессы получают
+# его через fork без копирования и сериализации.
+_graph = None
+
+
+class Graph:
+    """
+    Граф подписок в формате CSR: соседи вершины i лежат в
+    indices[indptr[i]:indptr[i + 1]]. Вершины - плотные номера
+    пользователей, ids[i] - настоящий id.
+    """
+
+    def __init__(self, ids, follows, followers):
+        self.ids = ids
+        self.follows = follows
+        self.followers = followers
+
+    def neighbours(self, csr, node):
+        indptr, indices = csr
+        return indices[indptr[node]:indptr[node + 1]]
+
+
+def _csr(src, dst, size):
+    if np is not None:
+        src = np.asarray(src, dtype=np.int32)
+        dst = np.asarray(dst, dtype=np.int32)
+        order = np.argsort(src, kind='stable')
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=size), out=indptr[1:])
+        return indptr, dst[order]
+    counts = [0] * (size + 1)
+    for node in src:
+        counts[node + 1] += 1
+    for i in range(size):
+        counts[i + 1] += counts[i]
+    indptr = array('q', counts)
+    position = list(counts[:-1])
+    indices = array('i', [0]) * len(dst)
+    for node, target in zip(src, dst):
+        indices[position[node]] = target
+        position[node] += 1
+    return indptr, indices
+
+
+def load_graph():
+    """
+    Читает таблицу Follow одним потоком пар (user, author) и строит два
+    CSR-массива: подписки и подписчики.
+    """
+    index = {}
+    src = array('i')
+    dst = array('i')
+    edges = Follow.objects.values_list('user_id', 'author_id').order_by()
+    for user_id, author_id in edges.iterator(chunk_size=10000):
+        src.append(index.setdefault(user_id, len(index)))
+        dst.append(index.setdefault(author_id, len(index)))
+    ids = array('i', [0]) * len(index)
+    for user_id, node in index.items():
+        ids[node] = user_id
+    size = len(index)
+    return Graph(ids, _csr(src, dst, size), _csr(dst, src, size))
+
+
+def suggest(graph, node, limit, max_followers=100):
+    """
+    Кандидаты для вершины node: друзья друзей (на кого подписаны те, на
+    кого подписан пользователь) и со-подписки (на кого ещё подписаны
+    читатели тех же авторов, с весом 1 / число их подписок).
+    """
+    following = set(graph.neighbours(graph.follows, node).tolist())
+    scores = defaultdict(float)
+    for author in following:
+        for candidate in graph.neighbours(graph.follows, author).tolist():
+            scores[candidate] += 1.0
+        readers = graph.neighbours(graph.followers, author)[:max_followers]
+        for reader in readers.tolist():
+            if reader == node:
+                continue
+            their = graph.neighbours(graph.follows, reader)
+            weight = 0.5 / len(their)
+            for candidate in their.tolist():
+                scores[candidate] += weight
+    for excluded in following | {node}:
+        scores.pop(excluded, None)
+    best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+    return [graph.ids[candidate] for candidate, _ in best]
+
+
+def _suggest_range(args):
+    start, stop, limit = args
+    return [
+        (_graph.ids[node], suggest(_graph, node, limit))
+        for node in range(start, stop)
+        if len(_graph.neighbours(_graph.follows, node))
+    ]
+
+
+def compute(graph, limit, processes=None, chunk=1000):
+    global _graph
+    _graph = graph
+    ranges = [
+        (start, min(start + chunk, len(graph.ids)), limit)
+        for start in range(0, len(graph.ids), chunk)
+    ]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(ranges) < 2:
+        parts = map(_suggest_range, ranges)
+        return [item for part in parts for item in part]
+    with get_context('fork').Pool(processes) as pool:
+        parts = pool.imap_unordered(_suggest_range, ranges)
+        return [item for part in parts for item in part]
+
+
+def build(limit=None, processes=None, batch_size=1000):
+    limit = limit or getattr(settings, 'FOLLOW_SUGGESTIONS_LIMIT', 5)
+    results = compute(load_graph(), limit, processes)
+    with transaction.atomic():
+        FollowSuggestion.objects.all().delete()
+        FollowSuggestion.objects.bulk_create(
+            (
+                FollowSuggestion(
+                    user_id=user_id,
+                    authors=','.join(map(str, authors)),
+                )
+                for user_id, authors in results if authors
+            ),
+            batch_size=batch_size
+        )
+    return len(results)
+
+
+def get_suggestions(user):
+    """
+    Рекомендации для страницы: выборка по первичному ключу и один
+    запрос за пользователями, на которых ещё нет подписки.
+    """
+    if not user.is_authenticated:
+        return []
+    suggestion = FollowSuggestion.objects.filter(user=user.id).first()
+    if suggestion is None:
+        return []
+    ids = suggestion.author_ids()
+    authors = User.objects.filter(id__in=ids).exclude(
+        following__user=user
+    ).only('username', 'first_name', 'last_name')
+    position = {pk: index for index, pk in enumerate(ids)}
+    return sorted(authors, key=lambda author: position[author.id])
@@ -0,0 +1,159 @@
+"""
+HTML тела постов и комментариев, которое рендерится при записи и
+хранится в text_html: чтение только выводит готовую строку.
+
+При изменении правил рендера нужно увеличить RENDER_VERSION и запустить
+rerender_posts - команда перерисует записи со старой версией.
+"""
+import os
+import re
+from multiprocessing import get_context
+
+from django.db import connections
+from django.urls import reverse
+from django.utils.html import escape
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post, User
+
+RENDER_VERSION = 2
+
+URL_RE = re.compile(r'https?://[^\s<>"\']+[^\s<>"\'.,;:!?)\]]')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.+-]*\w)')
+# Тег должен содержать хотя бы одну букву: «#1» - это номер, а не тег.
+TAG_RE = re.compile(r'(?<![\w&#])#(\w*[^\W\d]\w*)')
+TOKEN_RE = re.compile(f'{MENTION_RE.pattern}|{TAG_RE.pattern}')
+
+TAG_MAX_LENGTH = 100
+
+
+def mentions(text):
+    return set(MENTION_RE.findall(URL_RE.sub(' ', text)))
+
+
+def tags(text):
+    return {
+        name.lower() for name in TAG_RE.findall(URL_RE.sub(' ', text))
+        if len(name) <= TAG_MAX_LENGTH
+    }
+
+
+def existing_usernames(names):
+    if not names:
+        return set()
+    return set(User.objects.filter(username__in=names).values_list(
+        'username', flat=True
+    ))
+
+
+def _render_fragment(text, known_users):
+    """Экранирует фрагмент без ссылок и связывает упоминания и теги."""
+    result = []
+    position = 0
+    for match in TOKEN_RE.finditer(text):
+        username, tag = match.groups()
+        if username is not None:
+            if username not in known_users:
+                continue
+            url = reverse('profile', kwargs={'username': username})
+        else:
+            if len(tag) > TAG_MAX_LENGTH:
+                continue
+            url = reverse('tag', kwargs={'name': tag.lower()})
+        result.append(escape(text[position:match.start()]))
+        result.append(f'<a href="{escape(url)}">{escape(match.group(0))}</a>')
+        position = match.end()
+    result.append(escape(text[position:]))
+    return ''.join(result)
+
+
+def render(text, known_users=frozenset()):
+    """
+    Безопасный HTML из текста: всё экранируется, ссылки, теги и упоминания
+    существующих пользователей становятся <a>, переводы строк - <br>.
+    """
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    result = []
+    position = 0
+    for match in URL_RE.finditer(text):
+        result.append(_render_fragment(text[position:match.start()],
+                                       known_users))
+        url = escape(match.group(0))
+        result.append(
+            f'<a href="{url}" rel="nofollow noopener" target="_blank">'
+            f'{url}</a>'
+        )
+        position = match.end()
+    result.append(_render_fragment(text[position:], known_users))
+    return ''.join(result).replace('\n', '<br>')
+
+
+def render_text(text):
+    return render(text, existing_usernames(mentions(text)))
+
+
+def render_instance(instance):
+    instance.text_html = render_text(instance.text)
+    instance.html_version = RENDER_VERSION
+
+
+def _render_rows(args):
+    known, rows = args
+    return [(pk, render(text, known)) for pk, text in rows]
+
+
+def rerender(model, processes=None, batch_size=500, force=False):
+    """
+    Перерисовывает text_html у записей model со старой версией рендера
+    (или у всех при force). Рендер идёт в пуле процессов, чтение и запись
+    пачками - в основном процессе.
+    """
+    queryset = model.objects.order_by('id')
+    if not force:
+        queryset = queryset.exclude(html_version=RENDER_VERSION)
+    processes = processes or os.cpu_count() or 1
+    pool = None
+    if processes > 1:
+        # Соединения с БД не должны достаться дочерним процессам.
+        connections.close_all()
+        pool = get_context('fork').Pool(processes)
+    total = 0
+    last_id = 0
+    try:
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).values_list(
+                'id', 'text'
+            )[:batch_size])
+            if not batch:
+                return total
+            last_id = batch[-1][0]
+            known = existing_usernames(
+                set().union(*(mentions(text) for _, text in batch))
+            )
+            if pool is None:
+                rendered = _render_rows((known, batch))
+            else:
+                chunk = -(-len(batch) // processes)
+                parts = pool.map(_render_rows, [
+                    (known, batch[i:i + chunk])
+                    for i in range(0, len(batch), chunk)
+                ])
+                rendered = [item for part in parts for item in part]
+            model.objects.bulk_update(
+                [
+                    model(id=pk, text_html=html, html_version=RENDER_VERSION)
+                    for pk, html in rendered
+                ],
+                ['text_html', 'html_version'],
+            )
+            total += len(rendered)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def rerender_all(processes=None, batch_size=500, force=False):
+    return {
+        model._meta.model_name: rerender(model, processes, batch_size, force)
+        for model in (Post, Comment, ArchivedPost, ArchivedComment)
+    }
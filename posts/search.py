@@ -0,0 +1,38 @@
+from django.db import connections
+
+SEARCH_CONFIG = 'russian'
+
+# (имя индекса, таблица, колонка). Выражение индекса совпадает с тем, что
+# строит SearchVector, поэтому планировщик Postgres его использует.
+SEARCH_INDEXES = (
+    ('posts_post_text_fts', 'posts_post', 'text'),
+    ('posts_comment_text_fts', 'posts_comment', 'text'),
+)
+
+
+def is_postgres(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def create_search_indexes(sender, using='default', **kwargs):
+    """
+    Создаёт GIN-индексы для полнотекстового поиска после migrate: в
+    репозитории нет миграций, а функциональный индекс через Meta.indexes
+    в Django 2.2 не описать.
+    """
+    if not is_postgres(using):
+        return
+    with connections[using].cursor() as cursor:
+        for name, table, column in SEARCH_INDEXES:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin '
+                f"(to_tsvector('{SEARCH_CONFIG}'::regconfig, "
+                f"COALESCE({column}, '')))"
+            )
+
+
+def full_text_search(queryset, field, term):
+    from django.contrib.postgres.search import SearchQuery, SearchVector
+    return queryset.annotate(
+        search=SearchVector(field, config=SEARCH_CONFIG)
+    ).filter(search=SearchQuery(term, config=SEARCH_CONFIG))
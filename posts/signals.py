@@ -0,0 +1,142 @@
+from django.contrib.flatpages.models import FlatPage
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import (counters, entities, feeds, flatpages, ranking, rendering,
+               sitemaps, tagging)
+from .models import Comment, Follow, Group, Post, PostScore, User
+from .tasks import rank_comment
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    counters.invalidate_users(instance.user_id, instance.author_id)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def post_changed(sender, instance, created=True, **kwargs):
+    if created:
+        counters.invalidate_users(instance.author_id)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def comment_changed(sender, instance, created=True, **kwargs):
+    if created:
+        counters.invalidate_posts(instance.post_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_ranked(sender, instance, created, **kwargs):
+    # UPDATE строки рейтинга популярного поста - точка конкуренции
+    # между комментаторами, поэтому не в запросе.
+    if created:
+        rank_comment.delay_on_commit(
+            instance.post_id, instance.created.isoformat(),
+            key=f'rank_comment:{instance.id}'
+        )
+
+
+@receiver(post_save, sender=Post)
+def post_ranked(sender, instance, created, **kwargs):
+    if created:
+        ranking.score_post(instance)
+    elif getattr(instance, '_old_group_id', None) != instance.group_id:
+        PostScore.objects.filter(post=instance).update(
+            group_id=instance.group_id
+        )
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._old_group_id = None
+    if instance.pk:
+        instance._old_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def render_html(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'text' not in update_fields:
+        return
+    rendering.render_instance(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_tags(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'text' not in update_fields:
+        return
+    tagging.index_post(instance)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def touch_feeds(sender, instance, **kwargs):
+    group_ids = {instance.group_id, getattr(instance, '_old_group_id', None)}
+    group_ids.discard(None)
+    feeds.touch(
+        feeds.INDEX_SCOPE, feeds.author_scope(instance.author_id),
+        *(feeds.group_scope(group_id) for group_id in group_ids)
+    )
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Group)
+def renamed(sender, instance, update_fields=None, **kwargs):
+    field = 'username' if sender is User else 'slug'
+    if not instance.pk or (
+        update_fields is not None and field not in update_fields
+    ):
+        return
+    old = sender.objects.filter(pk=instance.pk).values_list(
+        field, flat=True
+    ).first()
+    if old is not None and old != getattr(instance, field):
+        sitemaps.names_changed('user' if sender is User else 'group')
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    entities.invalidate_user(instance)
+
+
+@receiver([post_save, post_delete], sender=Group)
+def group_changed(sender, instance, **kwargs):
+    entities.invalidate_group(instance)
+
+
+def rebuild_flatpages(*urls):
+    flatpages.invalidate(*urls)
+    for url in urls:
+        transaction.on_commit(lambda url=url: flatpages.write_url(url))
+
+
+@receiver(pre_save, sender=FlatPage)
+def remember_flatpage_url(sender, instance, **kwargs):
+    instance._old_url = None
+    if instance.pk:
+        instance._old_url = FlatPage.objects.filter(
+            pk=instance.pk
+        ).values_list('url', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=FlatPage)
+def flatpage_changed(sender, instance, **kwargs):
+    urls = {instance.url, getattr(instance, '_old_url', None)}
+    urls.discard(None)
+    rebuild_flatpages(*urls)
+
+
+@receiver(m2m_changed, sender=FlatPage.sites.through)
+def flatpage_sites_changed(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        rebuild_flatpages(instance.url)
+    elif pk_set:
+        rebuild_flatpages(*FlatPage.objects.filter(
+            pk__in=pk_set
+        ).values_list('url', flat=True))
@@ -0,0 +1,227 @@
+import abc
+import json
+import os
+import uuid
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ArchivedPost, Group, Post, User
+
+MANIFEST = 'manifest.json'
+INDEX = 'sitemap.xml'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+ITERATOR_CHUNK_SIZE = 2000
+NAMES_KEY = 'sitemaps:names:{}'
+
+
+def chunk_size():
+    return getattr(settings, 'SITEMAP_CHUNK_SIZE', 50000)
+
+
+def names_version(kind):
+    """
+    Версия имён kind ('user' или 'group'): адреса содержат username и
+    slug, а отпечаток файла по id переименования не видит.
+    """
+    key = NAMES_KEY.format(kind)
+    version = cache.get(key)
+    if version is None:
+        # Кэш потерян - лучше лишний раз пересобрать файлы.
+        version = uuid.uuid4().hex
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def names_changed(kind):
+    cache.set(NAMES_KEY.format(kind), uuid.uuid4().hex, None)
+
+
+class SitemapSection(abc.ABC):
+    """
+    Раздел карты сайта, нарезанный на файлы по диапазонам первичного
+    ключа: chunk k содержит объекты с id в [k * size, (k + 1) * size).
+    """
+    name = None
+    model = None
+    fields = ('id',)
+    lastmod_field = None
+    # Чьи имена входят в адреса раздела, см. names_version.
+    names = None
+
+    def queryset(self):
+        return self.model.objects.all()
+
+    @abc.abstractmethod
+    def location(self, row):
+        """Путь страницы объекта по строке из rows()."""
+
+    def fingerprints(self, size):
+        """
+        Одним GROUP BY считает для каждого файла количество, сумму и
+        максимум id: если они и версия имён не изменились, файл тот же.
+        """
+        names = names_version(self.names) if self.names else ''
+
+        aggregates = {
+            'total': Count('id'), 'id_sum': Sum('id'), 'max_id': Max('id'),
+        }
+        if self.lastmod_field:
+            aggregates['lastmod'] = Max(self.lastmod_field)
+        rows = self.queryset().annotate(chunk=F('id') / size).values(
+            'chunk'
+        ).annotate(**aggregates).order_by('chunk')
+        result = {}
+        for row in rows:
+            lastmod = row.get('lastmod')
+            result[f'{self.name}-{row["chunk"]}.xml'] = {
+                'chunk': row['chunk'],
+                'fingerprint': (
+                    f'{row["total"]}:{row["id_sum"]}:{row["max_id"]}:{names}'
+                ),
+                'lastmod': lastmod.isoformat() if lastmod else None,
+            }
+        return result
+
+    def rows(self, chunk, size):
+        queryset = self.queryset().filter(
+            id__gte=chunk * size, id__lt=(chunk + 1) * size
+        ).order_by('id').values(*self.fields)
+        return queryset.iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+    def lastmod(self, row):
+        return row.get(self.lastmod_field) if self.lastmod_field else None
+
+
+class PostSection(SitemapSection):
+    name = 'posts'
+    model = Post
+    fields = ('id', 'author__username', 'pub_date')
+    lastmod_field = 'pub_date'
+    names = 'user'
+
+    def location(self, row):
+        return reverse('post', args=(row['author__username'], row['id']))
+
+
+class ArchivedPostSection(PostSection):
+    # Архивные посты открываются по тем же адресам, что и обычные.
+    name = 'archived-posts'
+    model = ArchivedPost
+
+
+class ProfileSection(SitemapSection):
+    name = 'profiles'
+    model = User
+    fields = ('id', 'username')
+    names = 'user'
+
+    def queryset(self):
+        return User.objects.filter(is_active=True)
+
+    def location(self, row):
+        return reverse('profile', args=(row['username'],))
+
+
+class GroupSection(SitemapSection):
+    name = 'groups'
+    model = Group
+    fields = ('id', 'slug')
+    names = 'group'
+
+    def location(self, row):
+        return reverse('group', args=(row['slug'],))
+
+
+SECTIONS = (
+    PostSection(), ArchivedPostSection(), ProfileSection(), GroupSection()
+)
+
+
+def _write_atomic(path, lines):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line)
+    os.replace(tmp_path, path)
+
+
+def _urlset(section, chunk, size, base_url):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{XMLNS}">\n'
+    for row in section.rows(chunk, size):
+        loc = escape(base_url + section.location(row))
+        lastmod = section.lastmod(row)
+        if lastmod:
+            yield (
+                f'<url><loc>{loc}</loc>'
+                f'<lastmod>{lastmod.isoformat()}</lastmod></url>\n'
+            )
+        else:
+            yield f'<url><loc>{loc}</loc></url>\n'
+    yield '</urlset>\n'
+
+
+def _sitemap_index(files, base_url):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{XMLNS}">\n'
+    for name, info in sorted(files.items()):
+        loc = escape(f'{base_url}{settings.SITEMAP_URL}{name}')
+        lastmod = info.get('lastmod') or info['built']
+        yield (
+            f'<sitemap><loc>{loc}</loc>'
+            f'<lastmod>{lastmod}</lastmod></sitemap>\n'
+        )
+    yield '</sitemapindex>\n'
+
+
+def build_sitemaps(root=None, full=False):
+    """
+    Пересобирает файлы карты сайта, у которых изменился отпечаток, и
+    индекс sitemap.xml. Строки читаются курсором чанками, поэтому память
+    не зависит от числа постов. Возвращает список пересобранных файлов.
+    """
+    root = root or settings.SITEMAP_ROOT
+    os.makedirs(root, exist_ok=True)
+    manifest_path = os.path.join(root, MANIFEST)
+    manifest = {}
+    if not full and os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    site = Site.objects.get_current()
+    base_url = f'{settings.SITEMAP_PROTOCOL}://{site.domain}'
+    size = chunk_size()
+    built_at = timezone.now().isoformat()
+    files = {}
+    rebuilt = []
+    for section in SECTIONS:
+        for name, info in section.fingerprints(size).items():
+            path = os.path.join(root, name)
+            previous = manifest.get(name)
+            if (previous is None
+                    or previous['fingerprint'] != info['fingerprint']
+                    or not os.path.exists(path)):
+                _write_atomic(
+                    path, _urlset(section, info['chunk'], size, base_url)
+                )
+                info['built'] = built_at
+                rebuilt.append(name)
+            else:
+                info['built'] = previous['built']
+            files[name] = info
+
+    for name in set(manifest) - set(files):
+        path = os.path.join(root, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    _write_atomic(os.path.join(root, INDEX), _sitemap_index(files, base_url))
+    _write_atomic(manifest_path, [json.dumps(files)])
+    return rebuilt
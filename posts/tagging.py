@@ -0,0 +1,69 @@
+"""
+Индекс тегов и упоминаний: строки PostTag и Mention пишутся при
+сохранении поста, ленты /tag/<name>/ и упоминаний читают только их.
+"""
+from .models import Mention, Post, PostTag, Tag, User
+from .rendering import mentions, tags
+
+
+def _index_rows(rows):
+    """Индексирует пачку (id, text, pub_date) несколькими bulk-запросами."""
+    post_tags = {pk: tags(text) for pk, text, _ in rows}
+    post_mentions = {pk: mentions(text) for pk, text, _ in rows}
+    dates = {pk: pub_date for pk, _, pub_date in rows}
+
+    names = set().union(*post_tags.values())
+    tag_ids = {}
+    if names:
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in names], ignore_conflicts=True
+        )
+        tag_ids = dict(Tag.objects.filter(name__in=names).values_list(
+            'name', 'id'
+        ))
+    PostTag.objects.bulk_create(
+        [
+            PostTag(tag_id=tag_ids[name], post_id=pk, pub_date=dates[pk])
+            for pk, post_names in post_tags.items() for name in post_names
+        ],
+        ignore_conflicts=True,
+    )
+
+    usernames = set().union(*post_mentions.values())
+    user_ids = {}
+    if usernames:
+        user_ids = dict(User.objects.filter(
+            username__in=usernames
+        ).values_list('username', 'id'))
+    Mention.objects.bulk_create(
+        [
+            Mention(user_id=user_ids[name], post_id=pk, pub_date=dates[pk])
+            for pk, post_names in post_mentions.items()
+            for name in post_names if name in user_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def index_post(post):
+    PostTag.objects.filter(post=post).delete()
+    Mention.objects.filter(post=post).delete()
+    _index_rows([(post.id, post.text, post.pub_date)])
+
+
+def backfill(batch_size=1000):
+    """
+    Индексирует все посты пачками по id, не загружая таблицу в память.
+    Возвращает число обработанных постов.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        rows = list(Post.objects.filter(id__gt=last_id).order_by(
+            'id'
+        ).values_list('id', 'text', 'pub_date')[:batch_size])
+        if not rows:
+            return total
+        last_id = rows[-1][0]
+        _index_rows(rows)
+        total += len(rows)
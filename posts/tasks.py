@@ -0,0 +1,57 @@
+from django.utils.dateparse import parse_datetime
+from sorl.thumbnail import get_thumbnail
+
+from taskqueue.registry import task
+
+from . import ranking
+from .models import Post
+from .uploads import UPLOAD_PREFIX
+
+# Должно совпадать с тегом thumbnail в includes/post_item.html.
+THUMBNAIL_GEOMETRY = '850x500'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+@task(name='posts.warm_thumbnail')
+def warm_thumbnail(post_id):
+    """
+    Заранее создаёт миниатюру, чтобы её не строил первый просмотр ленты.
+    """
+    post = Post.objects.filter(id=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    get_thumbnail(post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+
+
+@task(name='posts.rank_comment')
+def rank_comment(post_id, created):
+    ranking.add_comment_activity(post_id, parse_datetime(created))
+
+
+@task(name='posts.optimize_upload')
+def optimize_upload(post_id):
+    # images импортирует этот модуль ради warm_thumbnail.
+    from .images import optimize_upload as optimize
+
+    post = Post.objects.filter(id=post_id).first()
+    if post is None or not post.image.name.startswith(f'{UPLOAD_PREFIX}/'):
+        return
+    try:
+        optimize(post)
+    finally:
+        warm_thumbnail(post.id)
+
+
+def post_saved(post):
+    if not post.image:
+        return
+    if post.image.name.startswith(f'{UPLOAD_PREFIX}/'):
+        # Прямую загрузку не видел clean_image: пережимаем её в фоне,
+        # миниатюру задача построит уже по новой картинке.
+        optimize_upload.delay_on_commit(
+            post.id, key=f'optimize_upload:{post.id}:{post.image.name}'
+        )
+        return
+    warm_thumbnail.delay_on_commit(
+        post.id, key=f'thumbnail:{post.id}:{post.image.name}'
+    )
@@ -0,0 +1,49 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from yatube.cache import get_or_set
+
+register = template.Library()
+
+# Свой префикс: под ключами {% cache %} лежат строки, а здесь - записи
+# yatube.cache, и старые воркеры при выкладке не должны читать чужие.
+KEY_PREFIX = 'tiered'
+
+
+class TieredCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = int(self.timeout.resolve(context))
+        key = KEY_PREFIX + '.' + make_template_fragment_key(
+            self.fragment_name, [var.resolve(context) for var in self.vary_on]
+        )
+        return get_or_set(
+            key, lambda: self.nodelist.render(context), timeout,
+            stats_key=self.fragment_name,
+        )
+
+
+@register.tag
+def tiered_cache(parser, token):
+    """
+    Как {% cache %}, но через двухуровневый кэш yatube.cache: фрагмент
+    пересчитывает один запрос, остальные получают готовый или старый.
+
+        {% tiered_cache 20 index_page page %}...{% endtiered_cache %}
+    """
+    nodelist = parser.parse(('endtiered_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает время жизни и имя фрагмента'
+        )
+    return TieredCacheNode(
+        nodelist, parser.compile_filter(bits[1]), bits[2],
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
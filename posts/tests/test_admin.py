@@ -0,0 +1,56 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, User
+from posts.paginators import EstimatedCountPaginator
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@yatube.ru', 'pass-12345'
+        )
+        cls.group = Group.objects.create(title='Котики', slug='test-slug')
+        for i in range(5):
+            post = Post.objects.create(
+                text=f'Текст {i}', author=cls.admin, group=cls.group
+            )
+            Comment.objects.create(post=post, author=cls.admin, text='Ком')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_changelists_are_available(self):
+        """Списки постов и комментариев открываются с поиском и датами."""
+        urls = (
+            reverse('admin:posts_post_changelist'),
+            reverse('admin:posts_post_changelist') + '?q=Текст',
+            reverse('admin:posts_comment_changelist'),
+            reverse('admin:posts_group_autocomplete') + '?term=Кот',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_post_changelist_queries_do_not_grow(self):
+        """Автор и группа подгружаются одним запросом со списком."""
+        url = reverse('admin:posts_post_changelist')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(url)
+        for i in range(5):
+            Post.objects.create(text='Ещё', author=self.admin,
+                                group=self.group)
+        with self.assertNumQueries(len(first.captured_queries)):
+            self.client.get(url)
+
+    def test_paginator_falls_back_to_exact_count(self):
+        """Без статистики Postgres пагинатор считает строки точно."""
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        self.assertIsNone(paginator.estimate())
+        self.assertEqual(paginator.count, 5)
@@ -0,0 +1,62 @@
+import datetime as dt
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Group,
+                          Post, User)
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Котики', slug='test-slug')
+        cls.old = [
+            Post.objects.create(
+                text=f'Старый {i}', author=cls.author, group=cls.group
+            )
+            for i in range(3)
+        ]
+        cls.fresh = Post.objects.create(text='Новый', author=cls.author)
+        Comment.objects.create(
+            post=cls.old[0], author=cls.author, text='Коммент'
+        )
+        Post.objects.filter(id__in=[post.id for post in cls.old]).update(
+            pub_date=timezone.now() - dt.timedelta(days=400)
+        )
+
+    def test_archive_moves_old_posts(self):
+        """Старые посты с комментариями переезжают в архив."""
+        out = StringIO()
+        call_command('archive_posts', '--batch-size=2', stdout=out)
+        self.assertIn('3', out.getvalue())
+        self.assertEqual(list(Post.objects.all()), [self.fresh])
+        self.assertEqual(ArchivedPost.objects.count(), 3)
+        self.assertFalse(Comment.objects.exists())
+        comment = ArchivedComment.objects.get()
+        self.assertEqual(comment.post_id, self.old[0].id)
+        archived = ArchivedPost.objects.get(id=self.old[0].id)
+        self.assertEqual(archived.group, self.group)
+        self.assertEqual(archived.text, 'Старый 0')
+
+    def test_post_view_resolves_archived_post(self):
+        """Страница архивного поста открывается без формы комментария."""
+        call_command('archive_posts', stdout=StringIO())
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(reverse(
+            'post', kwargs={'username': 'author', 'post_id': self.old[0].id}
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['post'].archived)
+        self.assertEqual(response.context['comments'][0].text, 'Коммент')
+        self.assertNotContains(response, 'Добавить комментарий:')
+        response = client.get(reverse(
+            'post', kwargs={'username': 'author', 'post_id': 100500}
+        ))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,136 @@
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase
+
+from yatube.cache import LRU, TieredCache, get_cache
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tiered = TieredCache(
+            l1_size=10, l1_ttl=60, stale_ttl=60, beta=0, wait_timeout=2
+        )
+        self.calls = 0
+
+    def compute(self, value='значение', delay=0):
+        def inner():
+            self.calls += 1
+            time.sleep(delay)
+            return value
+        return inner
+
+    def test_l1_then_l2(self):
+        """Повторные чтения идут из L1, после его очистки - из L2."""
+        for _ in range(2):
+            self.assertEqual(
+                self.tiered.get_or_set('key', self.compute(), 10), 'значение'
+            )
+        self.tiered.l1.clear()
+        self.tiered.get_or_set('key', self.compute(), 10)
+        self.assertEqual(self.calls, 1)
+        stats = self.tiered.get_stats()['key']
+        self.assertEqual(
+            (stats['miss'], stats['l1_hit'], stats['l2_hit']), (1, 1, 1)
+        )
+
+    def test_stats_keys_from_all_processes(self):
+        """Ключи статистики разных процессов не теряют друг друга."""
+        other = TieredCache(l1_size=10, l1_ttl=60, beta=0)
+        self.tiered.get_or_set('first', self.compute(), 10)
+        other.get_or_set('second', self.compute(), 10)
+        self.tiered.flush_stats()
+        other.flush_stats()
+        self.tiered.get_or_set('first', self.compute(), 10)
+        stats = self.tiered.get_stats()
+        self.assertEqual(sorted(stats), ['first', 'second'])
+        self.assertEqual(stats['first']['l1_hit'], 1)
+        self.assertEqual(stats['second']['miss'], 1)
+
+    def test_single_flight(self):
+        """Холодный ключ пересчитывает один поток, остальные ждут."""
+        results = []
+
+        def worker():
+            results.append(self.tiered.get_or_set(
+                'hot', self.compute(delay=0.3), 10
+            ))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['значение'] * 5)
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_while_recomputing(self):
+        """Пока другой пересчитывает, отдаётся старое значение."""
+        self.tiered.get_or_set('key', self.compute('старое'), 0.01)
+        time.sleep(0.02)
+        cache.add('key:lock', 1)
+        self.assertEqual(
+            self.tiered.get_or_set('key', self.compute('новое'), 10),
+            'старое'
+        )
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_on_error(self):
+        """Если пересчёт упал, отдаётся устаревшее значение."""
+        self.tiered.get_or_set('key', self.compute('старое'), 0.01)
+        time.sleep(0.02)
+
+        def broken():
+            raise ValueError('база недоступна')
+
+        self.assertEqual(self.tiered.get_or_set('key', broken, 10), 'старое')
+        self.assertEqual(self.tiered.get_stats()['key']['error'], 1)
+        with self.assertRaises(ValueError):
+            self.tiered.get_or_set('cold', broken, 10)
+
+    def test_early_refresh(self):
+        """Дорогое значение обновляется заранее, до истечения срока."""
+        tiered = TieredCache(l1_ttl=0, beta=1000)
+        tiered.get_or_set('key', self.compute(delay=0.01), 5)
+        with mock.patch('yatube.cache.random.random', return_value=0.5):
+            tiered.get_or_set('key', self.compute(), 5)
+        self.assertEqual(self.calls, 2)
+        tiered.beta = 0
+        tiered.get_or_set('key', self.compute(), 5)
+        self.assertEqual(self.calls, 2)
+
+    def test_lru_is_bounded(self):
+        """L1 вытесняет давно не читанные ключи."""
+        lru = LRU(2)
+        lru.set('a', 1, time.time() + 60)
+        lru.set('b', 2, time.time() + 60)
+        lru.get('a', time.time())
+        lru.set('c', 3, time.time() + 60)
+        self.assertIsNone(lru.get('b', time.time()))
+        self.assertEqual(lru.get('a', time.time()), 1)
+
+    def test_template_tag_and_stats_command(self):
+        """Тег кэширует фрагмент, команда показывает его счётчики."""
+        get_cache().clear()
+        # Строка от {% cache %} с тем же именем фрагмента не мешает тегу.
+        cache.set(make_template_fragment_key('fragment', [1]), 'строка')
+        template = Template(
+            '{% load tiered_cache %}'
+            '{% tiered_cache 20 fragment page %}{{ value }}'
+            '{% endtiered_cache %}'
+        )
+        for value in ('первое', 'второе'):
+            rendered = template.render(Context({'value': value, 'page': 1}))
+            self.assertEqual(rendered, 'первое')
+        out = StringIO()
+        call_command('cache_stats', stdout=out)
+        row = [line for line in out.getvalue().splitlines()
+               if line.startswith('fragment')][0]
+        self.assertEqual(row.split()[1:4], ['1', '0', '1'])
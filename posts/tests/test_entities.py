@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.entities import USER_KEY, get_group, get_user_by_username
+from posts.models import Group, User
+
+
+class EntityCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='reader', password='pass-12345'
+        )
+        cls.group = Group.objects.create(title='Котики', slug='cats')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookups_are_cached(self):
+        """Повторный поиск по username и slug не ходит в БД."""
+        get_user_by_username('reader')
+        get_group('cats')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_by_username('reader'), self.user)
+            self.assertEqual(get_group('cats'), self.group)
+
+    def test_password_hash_is_not_cached(self):
+        """В кэш не попадает хэш пароля, а сам пароль читается из БД."""
+        get_user_by_username('reader')
+        cached = cache.get(USER_KEY.format(self.user.pk))
+        self.assertNotIn(self.user.password, str(cached))
+        user = get_user_by_username('reader')
+        self.assertTrue(user.check_password('pass-12345'))
+
+    def test_rename_invalidates(self):
+        """После переименования старое имя больше не находится."""
+        get_user_by_username('reader')
+        get_group('cats')
+        user = User.objects.get(username='reader')
+        user.username = 'writer'
+        user.save()
+        group = Group.objects.get(slug='cats')
+        group.slug = 'dogs'
+        group.save()
+        self.assertIsNone(get_user_by_username('reader'))
+        self.assertEqual(get_user_by_username('writer').pk, user.pk)
+        self.assertIsNone(get_group('cats'))
+        self.assertEqual(get_group('dogs').title, 'Котики')
+
+    def test_request_user_and_lookups_without_queries(self):
+        """На попадании в кэш страница не ищет пользователя и группу в БД."""
+        client = Client()
+        client.login(username='reader', password='pass-12345')
+        url = reverse('group', kwargs={'slug': 'cats'})
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+        lookups = [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "auth_user"' in query['sql']
+            or 'FROM "posts_group"' in query['sql']
+            or 'FROM "django_session"' in query['sql']
+        ]
+        self.assertEqual(lookups, [])
+
+    def test_password_change_logs_out(self):
+        """Смена пароля сбрасывает сессии и при кэшированном пользователе."""
+        client = Client()
+        client.login(username='reader', password='pass-12345')
+        client.get(reverse('index'))
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-pass-12345')
+        user.save()
+        response = client.get(reverse('index'))
+        self.assertFalse(response.context['user'].is_authenticated)
@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class FeedsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Котики', description='О котиках', slug='test-slug'
+        )
+        cls.other_group = Group.objects.create(title='Собаки', slug='dogs')
+        cls.post = Post.objects.create(
+            text='Первый пост', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_contain_posts(self):
+        """Ленты RSS и Atom содержат посты своей области."""
+        urls = (
+            reverse('index_rss'),
+            reverse('index_atom'),
+            reverse('group_rss', kwargs={'slug': 'test-slug'}),
+            reverse('group_atom', kwargs={'slug': 'test-slug'}),
+            reverse('profile_rss', kwargs={'username': 'author'}),
+            reverse('profile_atom', kwargs={'username': 'author'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Первый пост', response.content.decode())
+        response = self.guest_client.get(
+            reverse('group_rss', kwargs={'slug': 'dogs'})
+        )
+        self.assertNotIn('Первый пост', response.content.decode())
+
+    def test_conditional_get(self):
+        """Повторный условный запрос получает 304 без обращений к БД."""
+        url = reverse('group_atom', kwargs={'slug': 'test-slug'})
+        response = self.guest_client.get(url)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(
+                url,
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_post_save_invalidates_feeds(self):
+        """Сохранение поста обновляет ленты, включая прежнюю группу."""
+        url = reverse('group_rss', kwargs={'slug': 'test-slug'})
+        etag = self.guest_client.get(url)['ETag']
+        self.post.group = self.other_group
+        self.post.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Первый пост', response.content.decode())
+        response = self.guest_client.get(
+            reverse('group_rss', kwargs={'slug': 'dogs'})
+        )
+        self.assertIn('Первый пост', response.content.decode())
+
+    def test_missing_scope_is_not_cached(self):
+        """Лента несуществующего автора - 404 без состояния в кэше."""
+        with mock.patch('posts.feeds.get_state') as get_state:
+            response = self.guest_client.get(
+                reverse('profile_rss', kwargs={'username': 'nobody'})
+            )
+        self.assertEqual(response.status_code, 404)
+        get_state.assert_not_called()
@@ -0,0 +1,86 @@
+import datetime as dt
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.flatpages.models import FlatPage
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from posts.flatpages import path_for
+
+
+class FlatPagesTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        settings = override_settings(FLATPAGES_ROOT=self.root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def create_page(self, url, **kwargs):
+        page = FlatPage.objects.create(
+            url=url, title='Об авторе', content='<b>текст</b>', **kwargs
+        )
+        page.sites.add(Site.objects.get_current())
+        return page
+
+    def read(self, url):
+        with open(path_for(url, self.root), encoding='utf-8') as f:
+            return f.read()
+
+
+class FlatPagesTests(FlatPagesTestMixin, TestCase):
+    def test_build_command(self):
+        """Команда рендерит открытые страницы и удаляет лишние файлы."""
+        self.create_page('/about-author/')
+        self.create_page('/private/', registration_required=True)
+        stale = path_for('/old/', self.root)
+        os.makedirs(os.path.dirname(stale))
+        open(stale, 'w').close()
+        out = StringIO()
+        call_command('build_flatpages', stdout=out)
+        self.assertIn('Собрано страниц: 1 (/about-author/)', out.getvalue())
+        html = self.read('/about-author/')
+        self.assertIn('<b>текст</b>', html)
+        self.assertIn('Войти', html)
+        self.assertIn(f'tube © {dt.date.today().year},', html)
+        self.assertFalse(os.path.exists(path_for('/private/', self.root)))
+        self.assertFalse(os.path.exists(stale))
+
+    def test_view_uses_cached_page(self):
+        """Повторный запрос страницы не читает FlatPage из БД."""
+        page = self.create_page('/about-author/')
+        client = Client()
+        client.get(reverse('author'))
+        with self.assertNumQueries(0):
+            response = client.get(reverse('author'))
+        self.assertEqual(response.context['flatpage'].title, 'Об авторе')
+        page.title = 'Обо мне'
+        page.save()
+        response = client.get(reverse('author'))
+        self.assertEqual(response.context['flatpage'].title, 'Обо мне')
+
+    def test_url_outside_root_is_rejected(self):
+        with self.assertRaises(ValueError):
+            path_for('/../../etc/', self.root)
+
+
+class FlatPagesOnSaveTests(FlatPagesTestMixin, TransactionTestCase):
+    def test_file_follows_page(self):
+        """Файл пересобирается при сохранении, переезде и удалении."""
+        page = self.create_page('/about-spec/')
+        self.assertIn('<b>текст</b>', self.read('/about-spec/'))
+        page.url = '/about-tech/'
+        page.content = 'новый текст'
+        page.save()
+        self.assertFalse(os.path.exists(path_for('/about-spec/', self.root)))
+        self.assertIn('новый текст', self.read('/about-tech/'))
+        page.delete()
+        self.assertFalse(os.path.exists(path_for('/about-tech/', self.root)))
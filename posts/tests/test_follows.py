@@ -0,0 +1,68 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, User
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ('alice', 'bob', 'carol'):
+            User.objects.create_user(username=name, password='pass-12345')
+
+    def import_follows(self, content, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as f:
+            f.write(content)
+            f.flush()
+            out = StringIO()
+            call_command('import_follows', f.name, *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_command(self):
+        """Команда подписывает по CSV пачками и пропускает неизвестных."""
+        out = self.import_follows(
+            'alice,bob\nalice,carol\nbob,alice\nbob,nobody\nalice,alice\n',
+            '--batch-size', '2'
+        )
+        self.assertIn('Подписано пар: 3', out)
+        self.assertIn('пользователями: 1', out)
+        self.assertEqual(Follow.objects.count(), 3)
+        out = self.import_follows('alice,bob\n')
+        self.assertIn('Подписано пар: 0', out)
+        self.assertEqual(Follow.objects.count(), 3)
+        out = self.import_follows('alice,bob\nbob,alice\n', '--unfollow')
+        self.assertIn('Отписано пар: 2', out)
+        self.assertEqual(
+            list(Follow.objects.values_list(
+                'user__username', 'author__username'
+            )),
+            [('alice', 'carol')]
+        )
+
+    def test_import_skips_malformed_batch(self):
+        """Пачка из одних битых строк не обрывает импорт."""
+        out = self.import_follows(
+            'alice\n\nbob\nalice,bob\n', '--batch-size', '2'
+        )
+        self.assertIn('Подписано пар: 1', out)
+        self.assertTrue(Follow.objects.filter(
+            user__username='alice', author__username='bob'
+        ).exists())
+
+    def test_profile_follow_is_idempotent(self):
+        """Повторная подписка со страницы профиля не создаёт дубликат."""
+        client = Client()
+        client.login(username='alice', password='pass-12345')
+        url = reverse('profile_follow', kwargs={'username': 'bob'})
+        client.get(url)
+        client.get(url)
+        self.assertEqual(
+            Follow.objects.filter(author__username='bob').count(), 1
+        )
+        client.get(reverse('profile_unfollow', kwargs={'username': 'bob'}))
+        self.assertFalse(Follow.objects.exists())
@@ -0,0 +1,142 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post, User
+from posts.tasks import optimize_upload, post_saved
+from yatube.uploadhandlers import TooLargeUpload
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(size=(300, 200), image_format='JPEG', **options):
+    output = io.BytesIO()
+    image = Image.effect_noise(size, 64).convert('RGB')
+    image.save(output, image_format, **options)
+    return output.getvalue()
+
+
+def jpeg_with_exif():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: повернуть на 90 градусов
+    exif[0x010F] = 'Camera'
+    return make_image(exif=exif.tobytes(), quality=100)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_MAX_DIMENSION=100)
+class ImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(ImageUploadTests.user)
+
+    def test_upload_is_downscaled_and_stripped(self):
+        """Картинка уменьшается, теряет EXIF и становится progressive."""
+        self.client.post(reverse('new_post'), {
+            'text': 'Фото',
+            'image': SimpleUploadedFile(
+                'photo.jpeg', jpeg_with_exif(), content_type='image/jpeg'
+            ),
+        })
+        post = Post.objects.get(text='Фото')
+        self.assertTrue(post.image.name.endswith('.jpg'))
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (67, 100))
+            self.assertFalse(image.getexif())
+            self.assertTrue(image.info.get('progressive'))
+
+    @override_settings(FILE_UPLOAD_MAX_SIZE=1024)
+    def test_too_large_upload_is_rejected(self):
+        """Слишком большой файл отклоняется и не доходит до Pillow."""
+        response = self.client.post(reverse('new_post'), {
+            'text': 'Большое фото',
+            'image': SimpleUploadedFile(
+                'big.jpg', make_image(), content_type='image/jpeg'
+            ),
+        })
+        form = response.context['form']
+        self.assertIsInstance(form.files['image'], TooLargeUpload)
+        self.assertEqual(
+            form.errors.as_data()['image'][0].code,
+            'file_too_large',
+        )
+        self.assertFalse(Post.objects.filter(text='Большое фото').exists())
+
+    def test_truncated_upload_is_rejected(self):
+        """Обрезанный файл даёт ошибку формы, а не 500."""
+        data = make_image((400, 300))
+        response = self.client.post(reverse('new_post'), {
+            'text': 'Обрезанное фото',
+            'image': SimpleUploadedFile(
+                'cut.jpg', data[:len(data) // 2], content_type='image/jpeg'
+            ),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['image'])
+        self.assertFalse(
+            Post.objects.filter(text='Обрезанное фото').exists()
+        )
+
+    def test_direct_upload_is_optimized_in_task(self):
+        """Картинка, загруженная по ключу, пережимается задачей."""
+        key = default_storage.save(
+            f'uploads/{ImageUploadTests.user.id}/direct.jpg',
+            ContentFile(jpeg_with_exif()),
+        )
+        post = Post.objects.create(
+            text='Напрямую', author=ImageUploadTests.user, image=key
+        )
+        with mock.patch.object(
+            optimize_upload, 'delay_on_commit'
+        ) as delay, mock.patch('posts.tasks.get_thumbnail') as thumbnail:
+            post_saved(post)
+            delay.assert_called_once()
+            optimize_upload(*delay.call_args[0])
+        thumbnail.assert_called_once()
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.startswith('posts/'))
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (67, 100))
+            self.assertFalse(image.getexif())
+        self.assertFalse(default_storage.exists(key))
+
+    def test_recompress_media(self):
+        """Команда пережимает старые картинки и считает экономию."""
+        name = default_storage.save(
+            'posts/old.png', ContentFile(make_image((400, 300), 'PNG'))
+        )
+        post = Post.objects.create(
+            text='Старое фото', author=ImageUploadTests.user, image=name
+        )
+        size_before = default_storage.size(name)
+
+        out = StringIO()
+        call_command('recompress_media', '--dry-run', stdout=out)
+        self.assertIn('пережато: 1', out.getvalue())
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, name)
+
+        call_command('recompress_media', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.endswith('.jpg'))
+        self.assertLess(post.image.size, size_before)
+        self.assertFalse(default_storage.exists(name))
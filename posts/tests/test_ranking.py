@@ -0,0 +1,97 @@
+import datetime as dt
+from unittest import mock
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import ranking
+from posts.models import Comment, Group, Post, PostScore, User
+from posts.tasks import rank_comment
+
+
+class RankingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Котики', slug='test-slug')
+        cls.quiet = Post.objects.create(text='Тихий', author=cls.author)
+        cls.hot = Post.objects.create(
+            text='Горячий', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def comment(self, post, count):
+        # В TestCase on_commit не срабатывает: задачу выполняем сразу.
+        with mock.patch.object(
+            rank_comment, 'delay_on_commit',
+            side_effect=lambda *args, key: rank_comment(*args),
+        ):
+            for _ in range(count):
+                Comment.objects.create(
+                    post=post, author=self.reader, text='!'
+                )
+
+    def test_new_posts_are_scored(self):
+        """У нового поста сразу появляется рейтинг."""
+        self.assertEqual(
+            PostScore.objects.get(post=self.hot).group, self.group
+        )
+        self.assertTrue(PostScore.objects.filter(post=self.quiet).exists())
+
+    def test_comments_raise_score(self):
+        """Комментарии поднимают пост в популярном."""
+        self.comment(self.quiet, 3)
+        response = self.guest_client.get(reverse('popular'))
+        self.assertEqual(response.context['page'][0], self.quiet)
+        self.comment(self.hot, 5)
+        response = self.guest_client.get(reverse('popular'))
+        self.assertEqual(response.context['page'][0], self.hot)
+
+    def test_incremental_update_matches_recompute(self):
+        """Инкрементальное обновление совпадает с полным пересчётом."""
+        self.comment(self.hot, 4)
+        incremental = PostScore.objects.get(post=self.hot).score
+        self.assertEqual(ranking.recompute(), 2)
+        self.assertAlmostEqual(
+            PostScore.objects.get(post=self.hot).score, incremental, places=6
+        )
+
+    def test_stale_score_does_not_underflow(self):
+        """Активность у очень старого рейтинга не ломает UPDATE."""
+        PostScore.objects.filter(post=self.quiet).update(score=-10000.0)
+        ranking.add_comment_activity(self.quiet.id)
+        ranking.add_view_activity({self.quiet.id: 10})
+        self.assertGreater(
+            PostScore.objects.get(post=self.quiet).score,
+            ranking.time_term(ranking.timezone.now()) - 10
+        )
+
+    def test_zero_views_weight_is_skipped(self):
+        """Нулевой вес или ноль просмотров не ломают учёт просмотров."""
+        before = PostScore.objects.get(post=self.quiet).score
+        ranking.add_view_activity({self.quiet.id: 0})
+        with self.settings(RANKING_VIEWS_WEIGHT=0):
+            ranking.add_view_activity({self.quiet.id: 10})
+            Post.objects.filter(pk=self.quiet.pk).update(views=10)
+            self.assertEqual(ranking.recompute(), 2)
+        self.assertAlmostEqual(
+            PostScore.objects.get(post=self.quiet).score, before, places=6
+        )
+
+    def test_old_events_decay(self):
+        """Старая активность весит меньше новой."""
+        now = ranking.EPOCH + dt.timedelta(days=100)
+        older = ranking.time_term(now - dt.timedelta(days=2))
+        newer = ranking.time_term(now)
+        self.assertAlmostEqual(newer - older, 2 * ranking.math.log(2))
+
+    def test_group_popular(self):
+        """Популярное сообщества содержит только его посты."""
+        response = self.guest_client.get(
+            reverse('group_popular', kwargs={'slug': 'test-slug'})
+        )
+        self.assertEqual(list(response.context['page']), [self.hot])
@@ -0,0 +1,62 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import recommendations
+from posts.models import Follow, FollowSuggestion, User
+
+
+class RecommendationsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = {
+            name: User.objects.create_user(username=name)
+            for name in ('ann', 'bob', 'cat', 'dan', 'eve')
+        }
+        edges = (
+            ('ann', 'bob'), ('bob', 'cat'), ('bob', 'dan'),
+            ('eve', 'bob'), ('eve', 'dan'), ('cat', 'ann'),
+        )
+        for user, author in edges:
+            Follow.objects.create(
+                user=cls.users[user], author=cls.users[author]
+            )
+
+    def names(self, ids):
+        names = {user.id: name for name, user in self.users.items()}
+        return [names[pk] for pk in ids]
+
+    def test_suggestions_from_graph(self):
+        """Друзья друзей и со-подписки попадают в рекомендации."""
+        graph = recommendations.load_graph()
+        results = dict(recommendations.compute(graph, 3, processes=1))
+        ann = self.names(results[self.users['ann'].id])
+        self.assertEqual(ann[0], 'dan')
+        self.assertIn('cat', ann)
+        self.assertNotIn('bob', ann)
+        self.assertNotIn('ann', ann)
+
+    def test_parallel_compute_matches_serial(self):
+        """Результат в нескольких процессах совпадает с однопоточным."""
+        graph = recommendations.load_graph()
+        serial = recommendations.compute(graph, 3, processes=1)
+        parallel = recommendations.compute(graph, 3, processes=2, chunk=2)
+        self.assertEqual(sorted(serial), sorted(parallel))
+
+    def test_suggestions_on_pages(self):
+        """Рекомендации выводятся на странице подписок."""
+        recommendations.build(processes=1)
+        self.assertTrue(
+            FollowSuggestion.objects.filter(user=self.users['ann']).exists()
+        )
+        client = Client()
+        client.force_login(self.users['ann'])
+        response = client.get(reverse('follow_index'))
+        names = [author.username for author in response.context['suggestions']]
+        self.assertEqual(names[0], 'dan')
+        Follow.objects.create(user=self.users['ann'], author=self.users['dan'])
+        response = client.get(
+            reverse('profile', kwargs={'username': 'ann'})
+        )
+        names = [author.username for author in response.context['suggestions']]
+        self.assertNotIn('dan', names)
@@ -0,0 +1,60 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import rendering
+from posts.models import Comment, Post, User
+
+
+class RenderingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        User.objects.create_user(username='reader')
+
+    def test_render_escapes_and_links(self):
+        """Текст экранируется, ссылки и упоминания становятся ссылками."""
+        html = rendering.render(
+            '<b>привет</b> @reader и @nobody\nhttps://example.com/a?b=1&c=2.',
+            {'reader'}
+        )
+        self.assertIn('&lt;b&gt;привет&lt;/b&gt;', html)
+        self.assertIn('<a href="/reader/">@reader</a>', html)
+        self.assertIn('@nobody<br>', html)
+        self.assertIn(
+            '<a href="https://example.com/a?b=1&amp;c=2" '
+            'rel="nofollow noopener" target="_blank">', html
+        )
+        self.assertTrue(html.endswith('</a>.'))
+
+    def test_html_rendered_on_save(self):
+        """HTML сохраняется вместе с постом и комментарием."""
+        post = Post.objects.create(text='Привет, @reader', author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.author, text='a@reader.ru'
+        )
+        post.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual(post.html_version, rendering.RENDER_VERSION)
+        self.assertIn('<a href="/reader/">@reader</a>', post.text_html)
+        self.assertEqual(comment.text_html, 'a@reader.ru')
+        response = Client().get(
+            reverse('profile', kwargs={'username': 'author'})
+        )
+        self.assertContains(response, post.text_html, html=False)
+
+    def test_rerender_command(self):
+        """Команда перерисовывает только записи со старой версией."""
+        post = Post.objects.create(text='@reader', author=self.author)
+        Post.objects.filter(pk=post.pk).update(text_html='', html_version=0)
+        out = StringIO()
+        call_command('rerender_posts', processes=1, stdout=out)
+        self.assertIn('post: перерисовано 1', out.getvalue())
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<a href="/reader/">@reader</a>')
+        out = StringIO()
+        call_command('rerender_posts', processes=1, stdout=out)
+        self.assertIn('post: перерисовано 0', out.getvalue())
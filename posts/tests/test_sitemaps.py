@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from posts.models import Group, Post, User
+from posts.archive import archive_batch
+from posts.sitemaps import build_sitemaps
+
+
+@override_settings(SITEMAP_CHUNK_SIZE=2)
+class SitemapsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        Group.objects.create(title='Котики', slug='test-slug')
+        cls.posts = [
+            Post.objects.create(text=f'Текст {i}', author=cls.author)
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def read(self, name):
+        with open(os.path.join(self.root, name), encoding='utf-8') as f:
+            return f.read()
+
+    def test_build_writes_index_and_chunks(self):
+        """Собираются индекс и файлы по диапазонам id."""
+        rebuilt = build_sitemaps(root=self.root)
+        post_files = [name for name in rebuilt if name.startswith('posts')]
+        chunks = {post.id // 2 for post in self.posts}
+        self.assertEqual(len(post_files), len(chunks))
+        index = self.read('sitemap.xml')
+        for name in rebuilt:
+            self.assertIn(f'/sitemaps/{name}', index)
+        content = ''.join(self.read(name) for name in post_files)
+        for post in self.posts:
+            self.assertIn(f'/author/{post.id}/', content)
+        self.assertIn('/group/test-slug/', self.read('groups-0.xml'))
+
+    def test_incremental_rebuild(self):
+        """Повторная сборка трогает только изменившиеся файлы."""
+        build_sitemaps(root=self.root)
+        self.assertEqual(build_sitemaps(root=self.root), [])
+        chunks = [post.id // 2 for post in self.posts]
+        post = next(
+            post for post in self.posts if chunks.count(post.id // 2) > 1
+        )
+        chunk = post.id // 2
+        post.delete()
+        self.assertEqual(
+            build_sitemaps(root=self.root), [f'posts-{chunk}.xml']
+        )
+        self.assertNotIn(
+            f'/author/{post.id}/', self.read(f'posts-{chunk}.xml')
+        )
+
+    def test_rename_rebuilds_files_with_names(self):
+        """Переименование автора пересобирает файлы с его адресами."""
+        build_sitemaps(root=self.root)
+        self.author.username = 'writer'
+        self.author.save()
+        rebuilt = build_sitemaps(root=self.root)
+        self.assertIn('profiles-0.xml', rebuilt)
+        self.assertFalse([name for name in rebuilt if name.startswith('g')])
+        content = ''.join(
+            self.read(name) for name in rebuilt if name.startswith('posts')
+        )
+        for post_id in Post.objects.values_list('id', flat=True):
+            self.assertIn(f'/writer/{post_id}/', content)
+
+    def test_archived_posts_are_listed(self):
+        """Архивные посты остаются в карте сайта."""
+        post = Post.objects.first()
+        archive_batch([post.id])
+        build_sitemaps(root=self.root)
+        self.assertIn(
+            f'/author/{post.id}/',
+            self.read(f'archived-posts-{post.id // 2}.xml')
+        )
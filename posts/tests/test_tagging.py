@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Mention, Post, PostTag, User
+
+
+class TaggingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def test_index_on_save(self):
+        """Теги и упоминания индексируются при сохранении и правке."""
+        post = Post.objects.create(
+            text='#Котики и #котики, @reader, @nobody, #1',
+            author=self.author
+        )
+        self.assertEqual(
+            list(PostTag.objects.filter(post=post).values_list(
+                'tag__name', flat=True
+            )),
+            ['котики']
+        )
+        self.assertEqual(
+            list(Mention.objects.filter(post=post).values_list(
+                'user__username', flat=True
+            )),
+            ['reader']
+        )
+        post.text = '#собаки'
+        post.save()
+        self.assertEqual(
+            list(PostTag.objects.filter(post=post).values_list(
+                'tag__name', flat=True
+            )),
+            ['собаки']
+        )
+        self.assertFalse(Mention.objects.filter(post=post).exists())
+
+    def test_tag_page_keyset_pagination(self):
+        """Лента тега листается курсором, без повторов и пропусков."""
+        posts = [
+            Post.objects.create(text=f'Пост {i} #котики', author=self.author)
+            for i in range(12)
+        ]
+        client = Client()
+        url = reverse('tag', kwargs={'name': 'котики'})
+        response = client.get(url)
+        first = list(response.context['page'])
+        self.assertEqual(len(first), 10)
+        self.assertContains(response, '?cursor=')
+        response = client.get(url, {
+            'cursor': response.context['page'].next_cursor
+        })
+        second = list(response.context['page'])
+        self.assertFalse(response.context['page'].has_next)
+        self.assertEqual(first + second, posts[::-1])
+        self.assertContains(client.get(url), f'<a href="{url}">#котики</a>')
+
+    def test_mentions_page(self):
+        """На странице упоминаний - посты, где упомянут пользователь."""
+        post = Post.objects.create(text='Привет, @reader', author=self.author)
+        Post.objects.create(text='Без упоминаний', author=self.author)
+        response = Client().get(
+            reverse('mentions', kwargs={'username': 'reader'})
+        )
+        self.assertEqual(list(response.context['page']), [post])
+
+    def test_backfill_command(self):
+        """Команда восстанавливает индекс по существующим постам."""
+        post = Post.objects.create(text='#котики @reader', author=self.author)
+        PostTag.objects.all().delete()
+        Mention.objects.all().delete()
+        out = StringIO()
+        call_command('index_tags', batch_size=1, stdout=out)
+        self.assertIn('Проиндексировано постов: 1', out.getvalue())
+        self.assertTrue(PostTag.objects.filter(
+            post=post, tag__name='котики'
+        ).exists())
+        self.assertTrue(Mention.objects.filter(
+            post=post, user=self.reader
+        ).exists())
@@ -0,0 +1,41 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase
+
+from yatube.warmup import warm_templates
+
+BENCH = 'posts.management.commands.bench_templates'
+
+
+class TemplatesWarmupTests(TestCase):
+    def test_warm_templates_fills_cached_loader(self):
+        """Прогрев компилирует все шаблоны проекта в cached.Loader."""
+        engine = engines['django'].engine
+        loader = engine.template_loaders[0]
+        loader.reset()
+        self.assertGreater(warm_templates(), 10)
+        cached = set(loader.get_template_cache)
+        for name in ('index.html', 'includes/post_item.html',
+                     'includes/paginator.html', 'signup.html'):
+            self.assertIn(name, cached)
+
+    def test_bench_templates(self):
+        """Бенчмарк выводит замеры для каждого размера страницы."""
+        out = StringIO()
+        cache.set('shared', 1)
+        # Тесты уже идут на тестовой БД: вторую команда не создаёт.
+        with mock.patch(f'{BENCH}.setup_databases') as setup, \
+                mock.patch(f'{BENCH}.teardown_databases') as teardown:
+            call_command(
+                'bench_templates', '--posts', '2', '3', '--repeat', '1',
+                stdout=out
+            )
+        teardown.assert_called_once_with(setup.return_value, verbosity=0)
+        self.assertEqual(cache.get('shared'), 1)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(any('cached.Loader' in line for line in lines))
+        self.assertTrue(any(line.split()[1] == '3' for line in lines[1:]))
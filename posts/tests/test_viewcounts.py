@@ -0,0 +1,113 @@
+import threading
+from unittest import mock
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import viewcounts
+from posts.models import Post, PostScore, User
+
+
+@override_settings(VIEWS_FLUSH_INTERVAL=3600, VIEWS_FLUSH_MAX_KEYS=1000)
+class ViewCountsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {i}', author=cls.author)
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        viewcounts.buffer.drain()
+        self.addCleanup(viewcounts.buffer.drain)
+        self.client = Client()
+
+    def view(self, post, times=1):
+        url = reverse('post', kwargs={
+            'username': 'author', 'post_id': post.id
+        })
+        for _ in range(times):
+            self.client.get(url)
+
+    def test_views_are_buffered_and_flushed_in_one_update(self):
+        """Просмотры копятся в буфере и уходят в БД одним UPDATE."""
+        first, second, _ = ViewCountsTests.posts
+        self.view(first, 3)
+        self.view(second, 2)
+        first.refresh_from_db()
+        self.assertEqual(first.views, 0)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(viewcounts.flush(), 2)
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "posts_post"')
+        ]
+        self.assertEqual(len(updates), 1)
+        views = dict(Post.objects.values_list('id', 'views'))
+        self.assertEqual(
+            [views[post.id] for post in ViewCountsTests.posts], [3, 2, 0]
+        )
+        response = self.client.get(
+            reverse('profile', kwargs={'username': 'author'})
+        )
+        self.assertContains(response, 'Просмотров: 3')
+
+    def test_views_raise_ranking(self):
+        """Сброс просмотров поднимает рейтинг поста."""
+        post = ViewCountsTests.posts[0]
+        before = PostScore.objects.get(post=post).score
+        self.view(post, 5)
+        viewcounts.flush()
+        self.assertGreater(PostScore.objects.get(post=post).score, before)
+
+    def test_failed_flush_keeps_views(self):
+        """Если БД недоступна, просмотры остаются в буфере."""
+        post = ViewCountsTests.posts[0]
+        self.view(post, 2)
+        with mock.patch(
+            'posts.viewcounts.apply_views', side_effect=RuntimeError
+        ):
+            self.assertEqual(viewcounts.flush(), 0)
+        self.assertEqual(viewcounts.buffer.views[post.id], 2)
+        viewcounts.flush()
+        post.refresh_from_db()
+        self.assertEqual(post.views, 2)
+
+    @override_settings(VIEWS_FLUSH_INTERVAL=0)
+    def test_flush_on_timer(self):
+        """По истечении интервала буфер сбрасывается сам."""
+        post = ViewCountsTests.posts[1]
+        self.view(post)
+        post.refresh_from_db()
+        self.assertEqual(post.views, 1)
+
+    def test_full_save_keeps_views(self):
+        """Сохранение поста целиком не затирает накопленные просмотры."""
+        post = Post.objects.get(pk=ViewCountsTests.posts[2].pk)
+        self.view(post, 4)
+        viewcounts.flush()
+        post.text = 'Исправленный текст'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Исправленный текст')
+        self.assertEqual(post.views, 4)
+
+    @override_settings(VIEWS_FLUSH_INTERVAL=0.01)
+    def test_flusher_thread(self):
+        """Фоновый поток сбрасывает буфер по таймеру без новых просмотров."""
+        flushed = threading.Event()
+        with mock.patch(
+            'posts.viewcounts.flush', side_effect=flushed.set
+        ):
+            flusher = viewcounts.start_flusher()
+            self.assertIs(viewcounts.start_flusher(), flusher)
+            try:
+                self.assertTrue(flushed.wait(5))
+            finally:
+                viewcounts.stop_flusher()
+            flusher.join(5)
+        self.assertFalse(flusher.is_alive())
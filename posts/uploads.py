@@ -0,0 +1,68 @@
+"""
+Прямая загрузка картинок в объектное хранилище: сервер выдаёт presigned
+POST на ключ в каталоге пользователя, браузер кладёт файл сам, а в форму
+поста передаётся только ключ (image_key). Размер файла ограничивает
+политика POST-запроса, а не только проверка после загрузки.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+UPLOAD_PREFIX = 'uploads'
+
+
+def direct_upload_enabled():
+    return getattr(default_storage, 'supports_presigned_upload', False)
+
+
+def user_prefix(user):
+    return f'{UPLOAD_PREFIX}/{user.pk}/'
+
+
+def presign_upload(user, content_type):
+    """
+    Ключ и presigned POST для картинки типа content_type или None, если
+    тип не поддерживается. Файл отправляется последним полем формы после
+    fields.
+    """
+    extension = settings.UPLOAD_IMAGE_TYPES.get(content_type)
+    if extension is None:
+        return None
+    key = f'{user_prefix(user)}{uuid.uuid4().hex}.{extension}'
+    url, fields = default_storage.presigned_post(
+        key, content_type, settings.FILE_UPLOAD_MAX_SIZE
+    )
+    return {
+        'key': key,
+        'url': url,
+        'method': 'POST',
+        'fields': fields,
+        'expires': settings.S3_PRESIGNED_EXPIRES,
+    }
+
+
+def check_upload(user, key):
+    """
+    Текст ошибки, если ключ нельзя прикрепить к посту пользователя, иначе
+    None.
+    """
+    if not direct_upload_enabled():
+        return 'Прямая загрузка файлов отключена.'
+    if (not key.startswith(user_prefix(user)) or '..' in key
+            or '/' in key[len(user_prefix(user)):]):
+        return 'Недопустимый ключ загрузки.'
+    headers = default_storage.head(key)
+    if headers is None:
+        return 'Файл не загружен.'
+    content_type = headers.get('content-type', '').split(';')[0]
+    if content_type not in settings.UPLOAD_IMAGE_TYPES:
+        error = 'Загрузите правильное изображение.'
+    elif (int(headers.get('content-length', 0))
+          > settings.FILE_UPLOAD_MAX_SIZE):
+        error = 'Файл слишком большой.'
+    else:
+        return None
+    # Отклонённый файл никто не прикрепит: не храним его.
+    default_storage.delete(key)
+    return error
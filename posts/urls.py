@@ -1,11 +1,32 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('rss/', feeds.cached_feed(feeds.IndexFeed), name='index_rss'),
+    path(
+        'atom/', feeds.cached_feed(feeds.atom(feeds.IndexFeed)),
+        name='index_atom'
+    ),
+    path('popular/', views.popular, name='popular'),
     path('group/<slug:slug>/', views.group_posts, name='group'),
+    path(
+        'group/<slug:slug>/popular/', views.group_popular,
+        name='group_popular'
+    ),
+    path(
+        'group/<slug:slug>/rss/', feeds.cached_feed(feeds.GroupFeed),
+        name='group_rss'
+    ),
+    path(
+        'group/<slug:slug>/atom/',
+        feeds.cached_feed(feeds.atom(feeds.GroupFeed)),
+        name='group_atom'
+    ),
+    path('tag/<str:name>/', views.tag_posts, name='tag'),
     path('new/', views.new_post, name='new_post'),
+    path('upload/', views.upload_url, name='upload_url'),
     path('follow/', views.follow_index, name='follow_index'),
     path(
         '<str:username>/follow/', views.profile_follow, name='profile_follow'
@@ -15,6 +36,18 @@ urlpatterns = [
         name='profile_unfollow'
     ),
     path('<str:username>/', views.profile, name='profile'),
+    path(
+        '<str:username>/mentions/', views.mentions, name='mentions'
+    ),
+    path(
+        '<str:username>/rss/', feeds.cached_feed(feeds.AuthorFeed),
+        name='profile_rss'
+    ),
+    path(
+        '<str:username>/atom/',
+        feeds.cached_feed(feeds.atom(feeds.AuthorFeed)),
+        name='profile_atom'
+    ),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
     path(
         '<str:username>/<int:post_id>/edit/', views.post_edit, name='post_edit'
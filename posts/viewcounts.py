@@ -0,0 +1,137 @@
+"""
+Счётчик просмотров постов.
+
+Просмотры копятся в памяти воркера и раз в VIEWS_FLUSH_INTERVAL секунд
+(или при VIEWS_FLUSH_MAX_KEYS разных постов) сбрасываются в БД одним
+UPDATE на пачку, а не UPDATE на каждый просмотр: популярный пост не
+становится точкой конкуренции за блокировку строки. По таймеру буфер
+сбрасывает фоновый поток Flusher (его запускает хук gunicorn
+post_worker_init), так что просмотры не ждут следующего запроса. При
+падении воркера теряется не больше одного интервала его просмотров; при
+штатной остановке буфер сбрасывается хуком worker_exit.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from . import ranking
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class ViewBuffer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = Counter()
+        self.flushed = time.monotonic()
+
+    def add(self, post_id, count=1):
+        """Добавляет просмотр; True, если пора сбросить буфер."""
+        with self.lock:
+            self.views[post_id] += count
+            return (
+                len(self.views) >= settings.VIEWS_FLUSH_MAX_KEYS
+                or time.monotonic() - self.flushed
+                >= settings.VIEWS_FLUSH_INTERVAL
+            )
+
+    def drain(self):
+        with self.lock:
+            views, self.views = self.views, Counter()
+            self.flushed = time.monotonic()
+        return views
+
+    def restore(self, views):
+        with self.lock:
+            self.views.update(views)
+
+
+buffer = ViewBuffer()
+
+
+class Flusher(threading.Thread):
+    def __init__(self):
+        super().__init__(name='viewcounts-flusher', daemon=True)
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(settings.VIEWS_FLUSH_INTERVAL):
+            try:
+                flush()
+            finally:
+                # У потока своё соединение: не держим его между сбросами.
+                connection.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def start_flusher():
+    global _flusher
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = Flusher()
+            _flusher.start()
+    return _flusher
+
+
+def stop_flusher():
+    global _flusher
+    with _flusher_lock:
+        if _flusher is not None:
+            _flusher.stop()
+            _flusher = None
+
+
+def record_view(post_id):
+    if buffer.add(post_id):
+        flush()
+
+
+def flush():
+    """Сбрасывает накопленные просмотры в БД; возвращает число постов."""
+    views = buffer.drain()
+    if not views:
+        return 0
+    try:
+        with transaction.atomic():
+            apply_views(views)
+            ranking.add_view_activity(views)
+    except Exception:
+        # БД недоступна - вернём дельты в буфер до следующей попытки.
+        logger.exception('Не удалось сбросить просмотры')
+        buffer.restore(views)
+        return 0
+    return len(views)
+
+
+def apply_views(views):
+    """
+    Прибавляет дельты одним UPDATE: на PostgreSQL через FROM (VALUES ...),
+    на остальных СУБД через CASE.
+    """
+    items = sorted(views.items())
+    if connection.vendor == 'postgresql':
+        table = Post._meta.db_table
+        values = ', '.join(['(%s, %s)'] * len(items))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} AS p SET views = p.views + v.delta '
+                f'FROM (VALUES {values}) AS v(id, delta) WHERE p.id = v.id',
+                [param for item in items for param in item],
+            )
+        return
+    Post.objects.filter(id__in=views).update(views=F('views') + Case(
+        *[When(id=post_id, then=Value(delta)) for post_id, delta in items],
+        output_field=IntegerField(),
+    ))
@@ -1,9 +1,18 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
 
+from .entities import get_group_or_404, get_user_or_404
+from .follows import follow_many, unfollow_many
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import ArchivedPost, Follow, Mention, Post, PostTag, Tag
+from .paginators import keyset_page
+from .recommendations import get_suggestions
+from .tasks import post_saved
+from .uploads import direct_upload_enabled, presign_upload
+from .viewcounts import record_view
 
 
 def index(request):
@@ -17,7 +26,7 @@ def index(request):
 
 
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_group_or_404(slug)
     posts = group.posts.all()
     paginator = Paginator(posts, 10)
     page_number = request.GET.get('page')
@@ -28,8 +37,50 @@ def group_posts(request, slug):
     )
 
 
+def popular(request):
+    posts = Post.objects.filter(score__isnull=False).select_related(
+        'author', 'group'
+    ).order_by('-score__score')
+    paginator = Paginator(posts, 10)
+    page_number = request.GET.get('page')
+    page = paginator.get_page(page_number)
+    return render(
+        request, 'popular.html', {'page': page, 'paginator': paginator}
+    )
+
+
+def group_popular(request, slug):
+    group = get_group_or_404(slug)
+    posts = Post.objects.filter(score__group=group).select_related(
+        'author', 'group'
+    ).order_by('-score__score')
+    paginator = Paginator(posts, 10)
+    page_number = request.GET.get('page')
+    page = paginator.get_page(page_number)
+    return render(
+        request, 'popular.html',
+        {'page': page, 'paginator': paginator, 'group': group}
+    )
+
+
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    page = keyset_page(
+        PostTag.objects.filter(tag=tag), request.GET.get('cursor')
+    )
+    return render(request, 'tag.html', {'tag': tag, 'page': page})
+
+
+def mentions(request, username):
+    author = get_user_or_404(username)
+    page = keyset_page(
+        Mention.objects.filter(user=author), request.GET.get('cursor')
+    )
+    return render(request, 'mentions.html', {'author': author, 'page': page})
+
+
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_user_or_404(username)
     posts = author.posts.all()
     paginator = Paginator(posts, 10)
     page_number = request.GET.get('page')
@@ -46,11 +97,15 @@ def profile(request, username):
         'following': following,
         'followers': followers,
         'follow': follow,
+        'suggestions': get_suggestions(request.user),
     })
 
 
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, author__username=username, id=post_id)
+    post = Post.objects.filter(author__username=username, id=post_id).first()
+    if post is None:
+        return archived_post_view(request, username, post_id)
+    record_view(post.id)
     comments = post.comments.all()
     following = Follow.objects.filter(
             author=post.author.id, user=request.user.id
@@ -69,32 +124,50 @@ def post_view(request, username, post_id):
     })
 
 
+def archived_post_view(request, username, post_id):
+    post = get_object_or_404(
+        ArchivedPost.objects.select_related('author', 'group'),
+        author__username=username, id=post_id
+    )
+    following = Follow.objects.filter(
+            author=post.author.id, user=request.user.id
+    )
+    followers = post.author.following.count()
+    follow = post.author.follower.count()
+    return render(request, 'post.html', {
+        'post': post,
+        'author': post.author,
+        'comments': post.comments.select_related('author'),
+        'following': following,
+        'followers': followers,
+        'follow': follow,
+    })
+
+
 @login_required
 def follow_index(request):
     posts = Post.objects.filter(author__following__user=request.user.id)
     paginator = Paginator(posts, 10)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
-    return render(
-        request, 'follow.html', {'page': page, 'paginator': paginator}
-    )
+    return render(request, 'follow.html', {
+        'page': page,
+        'paginator': paginator,
+        'suggestions': get_suggestions(request.user),
+    })
 
 
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
-    follow = Follow.objects.filter(user=request.user, author=author).exists()
-    if not follow and author != request.user:
-        Follow.objects.create(user=request.user, author=author)
+    author = get_user_or_404(username)
+    follow_many(request.user, [author.id])
     return redirect('profile', username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
-    follow = Follow.objects.filter(user=request.user, author=author)
-    if follow.exists():
-        follow.delete()
+    author = get_user_or_404(username)
+    unfollow_many(request.user, [author.id])
     return redirect('profile', username)
 
 
@@ -120,25 +193,48 @@ def post_edit(request, username, post_id):
         return redirect('post', username, post_id)
     post = get_object_or_404(Post, author__username=username, id=post_id)
     form = PostForm(
-        request.POST or None, files=request.FILES or None, instance=post
+        request.POST or None, files=request.FILES or None, instance=post,
+        user=request.user
     )
     if not form.is_valid():
-        return render(request, 'new_post.html', {'form': form, 'post': post})
+        return render(request, 'new_post.html', {
+            'form': form, 'post': post,
+            'direct_upload': direct_upload_enabled(),
+        })
     form.save()
+    post_saved(post)
     return redirect('post', username, post_id)
 
 
 @login_required
 def new_post(request):
-    form = PostForm(request.POST or None, files=request.FILES or None)
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, user=request.user
+    )
     if not form.is_valid():
-        return render(request, 'new_post.html', {'form': form})
+        return render(request, 'new_post.html', {
+            'form': form, 'direct_upload': direct_upload_enabled()
+        })
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    post_saved(post)
     return redirect('index')
 
 
+@login_required
+@require_POST
+def upload_url(request):
+    if not direct_upload_enabled():
+        raise Http404
+    upload = presign_upload(request.user, request.POST.get('content_type'))
+    if upload is None:
+        return JsonResponse(
+            {'detail': 'Неподдерживаемый тип файла.'}, status=400
+        )
+    return JsonResponse(upload)
+
+
 def page_not_found(request, exception):
     return render(request, "misc/404.html", {"path": request.path}, status=404)
 
@@ -0,0 +1,46 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from profiling.profiles import aggregate, load, prune
+from profiling.sampler import collapsed
+
+
+class Command(BaseCommand):
+    help = 'Сводка по сохранённым профилям запросов: самые горячие функции'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument(
+            '--url-name', help='Только профили запросов к этому URL'
+        )
+        parser.add_argument(
+            '--output',
+            help='Записать объединённые стеки в файл для flamegraph.pl',
+        )
+
+    def handle(self, *args, **options):
+        if os.path.isdir(settings.PROFILING_DIR):
+            prune()
+        report = aggregate(load(options['url_name']))
+        samples = report['samples']
+        if not samples:
+            self.stdout.write('Профилей нет')
+            return
+        for url_name, durations in sorted(report['durations'].items()):
+            self.stdout.write(
+                f'{url_name}: {len(durations)} запросов, в среднем '
+                f'{sum(durations) / len(durations):.0f} мс, '
+                f'максимум {max(durations)} мс'
+            )
+        self.stdout.write(f'\nСэмплов: {samples}')
+        self.stdout.write(f'{"своё":>7} {"всего":>7}  функция')
+        for label, count in report['own'].most_common(options['top']):
+            self.stdout.write(
+                f'{count * 100 / samples:6.1f}% '
+                f'{report["total"][label] * 100 / samples:6.1f}%  {label}'
+            )
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(collapsed(report['stacks']))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from profiling.middleware import make_token
+
+
+class Command(BaseCommand):
+    help = (
+        'Выдаёт значение заголовка X-Profile, по которому запрос будет '
+        'профилирован'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
@@ -0,0 +1,59 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+
+from . import profiles
+from .sampler import Sampler
+
+TOKEN_SALT = 'profiling'
+
+
+def make_token():
+    """Значение заголовка X-Profile, включающего профилирование запроса."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def valid_token(token):
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class SamplingProfilerMiddleware:
+    """
+    Профилирует долю PROFILING_SAMPLE_RATE запросов и запросы с
+    подписанным заголовком X-Profile. Ставится первым, чтобы в профиль
+    попали остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.META.get('HTTP_X_PROFILE')
+        requested = bool(token) and valid_token(token)
+        rate = settings.PROFILING_SAMPLE_RATE
+        if not requested and not (rate and random.random() < rate):
+            return self.get_response(request)
+        sampler = Sampler(threading.get_ident(), settings.PROFILING_INTERVAL)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - started
+            sampler.stop()
+        match = request.resolver_match
+        name = profiles.save(
+            match.url_name if match else None, duration, sampler.stacks
+        )
+        if requested:
+            response['X-Profile-File'] = name
+        return response
@@ -0,0 +1,107 @@
+import itertools
+import os
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from .sampler import collapsed, parse_collapsed
+
+SUFFIX = '.collapsed'
+
+_saves = itertools.count(1)
+
+
+def save(url_name, duration, stacks):
+    """
+    Пишет профиль запроса в PROFILING_DIR; имя файла содержит имя URL и
+    длительность: «post__153ms__20240101-120000-<uuid>.collapsed».
+    Каждое PROFILING_PRUNE_EVERY-е сохранение удаляет лишние и старые
+    профили, см. prune.
+    """
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    name = (
+        f'{url_name or "unresolved"}__{round(duration * 1000)}ms__'
+        f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex}{SUFFIX}'
+    )
+    path = os.path.join(settings.PROFILING_DIR, name)
+    with open(path, 'w') as file:
+        file.write(collapsed(stacks))
+    if next(_saves) % settings.PROFILING_PRUNE_EVERY == 0:
+        prune()
+    return name
+
+
+def prune():
+    """
+    Оставляет в PROFILING_DIR не больше PROFILING_MAX_FILES самых новых
+    профилей не старше PROFILING_MAX_AGE секунд. Возвращает число
+    удалённых файлов.
+    """
+    entries = []
+    for entry in os.scandir(settings.PROFILING_DIR):
+        if not entry.name.endswith(SUFFIX):
+            continue
+        try:
+            entries.append((entry.stat().st_mtime, entry.path))
+        except FileNotFoundError:
+            # Удалил другой воркер.
+            continue
+    entries.sort(reverse=True)
+    cutoff = time.time() - settings.PROFILING_MAX_AGE
+    removed = 0
+    for index, (mtime, path) in enumerate(entries):
+        if index < settings.PROFILING_MAX_FILES and mtime >= cutoff:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+
+def parse_name(name):
+    url_name, duration, _ = name[:-len(SUFFIX)].split('__', 2)
+    return url_name, int(duration[:-2])
+
+
+def load(url_name=None):
+    """Профили из PROFILING_DIR: (имя URL, длительность в мс, стеки)."""
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return
+    for name in sorted(os.listdir(settings.PROFILING_DIR)):
+        if not name.endswith(SUFFIX):
+            continue
+        try:
+            name_url, duration = parse_name(name)
+        except ValueError:
+            continue
+        if url_name is not None and name_url != url_name:
+            continue
+        with open(os.path.join(settings.PROFILING_DIR, name)) as file:
+            yield name_url, duration, parse_collapsed(file)
+
+
+def aggregate(profiles):
+    """
+    Сводка по профилям: собственное время функций (верх стека), полное
+    время (функция где-то в стеке) и длительности по именам URL.
+    """
+    own = Counter()
+    total = Counter()
+    merged = Counter()
+    durations = defaultdict(list)
+    for url_name, duration, stacks in profiles:
+        durations[url_name].append(duration)
+        merged.update(stacks)
+        for stack, count in stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+    return {
+        'own': own, 'total': total, 'stacks': merged,
+        'samples': sum(merged.values()), 'durations': dict(durations),
+    }
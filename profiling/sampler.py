@@ -0,0 +1,77 @@
+"""
+Сэмплирующий профилировщик: отдельный поток раз в interval секунд
+снимает стек профилируемого потока через sys._current_frames(). Сам
+запрос не замедляется трассировкой каждого вызова, как в cProfile.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+
+_prefixes = sorted(
+    {os.path.abspath(path) + os.sep for path in sys.path if path},
+    key=len, reverse=True
+)
+
+
+def short_path(filename):
+    for prefix in _prefixes:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+def frame_label(code):
+    return f'{short_path(code.co_filename)}:{code.co_name}'
+
+
+class Sampler:
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._labels = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = frame_label(code)
+        return label
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+
+def collapsed(stacks):
+    """Стеки в формате flamegraph.pl / speedscope: «a;b;c число»."""
+    return ''.join(
+        f'{stack} {count}\n' for stack, count in stacks.most_common()
+    )
+
+
+def parse_collapsed(lines):
+    stacks = Counter()
+    for line in lines:
+        stack, _, count = line.rstrip('\n').rpartition(' ')
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
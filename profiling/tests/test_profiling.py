@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from profiling.middleware import make_token
+from profiling.profiles import save
+from profiling.sampler import Sampler
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings = override_settings(
+            PROFILING_DIR=self.directory, PROFILING_INTERVAL=0.001
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_sampler_records_stacks(self):
+        """Сэмплер видит функцию, в которой поток проводит время."""
+        sampler = Sampler(threading.get_ident(), 0.001)
+        sampler.start()
+        busy(0.05)
+        sampler.stop()
+        self.assertTrue(sampler.stacks)
+        stack = sampler.stacks.most_common(1)[0][0]
+        self.assertTrue(stack.endswith('test_profiling.py:busy'))
+
+    def test_signed_header_enables_profiling(self):
+        """Запрос с подписанным заголовком профилируется, с чужим - нет."""
+        client = Client()
+        client.get('/', HTTP_X_PROFILE='profile:bad')
+        self.assertEqual(os.listdir(self.directory), [])
+        response = client.get('/', HTTP_X_PROFILE=make_token())
+        name = response['X-Profile-File']
+        self.assertTrue(name.startswith('index__'))
+        self.assertEqual(os.listdir(self.directory), [name])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1)
+    def test_sample_rate(self):
+        Client().get('/')
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_report(self):
+        """Отчёт сортирует функции по собственному времени."""
+        profiles = {
+            'post__120ms__a.collapsed': 'views.py:post;orm.py:query 30\n'
+                                        'views.py:post;tpl.py:render 10\n',
+            'post__80ms__b.collapsed': 'views.py:post;tpl.py:render 60\n',
+            'index__10ms__c.collapsed': 'views.py:index 5\n',
+        }
+        for name, content in profiles.items():
+            with open(os.path.join(self.directory, name), 'w') as file:
+                file.write(content)
+        out = StringIO()
+        merged = os.path.join(self.directory, 'merged.txt')
+        call_command(
+            'profile_report', url_name='post', top=2, output=merged,
+            stdout=out
+        )
+        lines = out.getvalue().splitlines()
+        self.assertIn('post: 2 запросов, в среднем 100 мс', lines[0])
+        self.assertTrue(lines[-2].endswith('70.0%  tpl.py:render'))
+        self.assertTrue(lines[-1].endswith('30.0%  orm.py:query'))
+        with open(merged) as file:
+            self.assertEqual(
+                file.readline(), 'views.py:post;tpl.py:render 70\n'
+            )
+
+    @override_settings(
+        PROFILING_MAX_FILES=2, PROFILING_MAX_AGE=60, PROFILING_PRUNE_EVERY=1
+    )
+    def test_old_and_extra_profiles_are_pruned(self):
+        """Сохраняются только последние профили не старше срока."""
+        now = time.time()
+        for name, age in (('old', 120), ('first', 30), ('second', 20)):
+            path = os.path.join(self.directory, f'{name}__1ms__x.collapsed')
+            with open(path, 'w') as file:
+                file.write('views.py:index 1\n')
+            os.utime(path, (now - age, now - age))
+        name = save('index', 0.001, Counter({'views.py:index': 1}))
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            sorted([name, 'second__1ms__x.collapsed'])
+        )
+
+    def test_names_do_not_collide(self):
+        """Профили одного URL в одну секунду не перезаписывают друг друга."""
+        stacks = Counter({'views.py:index': 1})
+        names = {save('index', 0.001, stacks) for _ in range(3)}
+        self.assertEqual(len(names), 3)
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(names))
@@ -0,0 +1,70 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class LocalBackend:
+    """
+    Счётчики в памяти процесса: для тестов и одного воркера.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    def incr(self, key, timeout):
+        now = time.monotonic()
+        with self.lock:
+            value, expires = self.counters.get(key, (0, 0))
+            if expires <= now:
+                value, expires = 0, now + timeout
+            self.counters[key] = (value + 1, expires)
+            return value + 1
+
+    def get(self, key):
+        with self.lock:
+            value, expires = self.counters.get(key, (0, 0))
+            return value if expires > time.monotonic() else 0
+
+
+class CacheBackend:
+    """
+    Счётчики в общем кэше (RATELIMIT_CACHE) с атомарным incr: лимит
+    общий для всех воркеров при memcached/redis.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.RATELIMIT_CACHE]
+
+    def incr(self, key, timeout):
+        self.cache.add(key, 0, timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Ключ истёк между add и incr.
+            self.cache.add(key, 0, timeout)
+            return self.cache.incr(key)
+
+    def get(self, key):
+        return self.cache.get(key, 0)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(settings.RATELIMIT_BACKEND)()
+        return _backend
+
+
+def reset_backend():
+    global _backend
+    with _backend_lock:
+        _backend = None
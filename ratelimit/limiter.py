@@ -0,0 +1,72 @@
+"""
+Ограничение частоты запросов по имени URL (settings.RATELIMITS).
+
+Бэкенды умеют только атомарный incr, поэтому ведро токенов считается
+скользящим окном: число запросов в текущем окне плюс доля предыдущего.
+Это даёт ту же картину, что ведро ёмкостью limit, которое наполняется
+со скоростью limit за period, без чтения-изменения-записи в кэше.
+"""
+import math
+import time
+
+from django.conf import settings
+
+from .backends import get_backend
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)."""
+    limit, _, period = rate.partition('/')
+    return int(limit), PERIODS[period[-1]] * int(period[:-1] or 1)
+
+
+def get_rule(url_name):
+    rule = settings.RATELIMITS.get(url_name)
+    if rule is None:
+        return None
+    if isinstance(rule, str):
+        rule = {'rate': rule}
+    return {'methods': ('POST',), 'min_page': None, **rule}
+
+
+def applies(rule, request):
+    if request.method not in rule['methods']:
+        return False
+    if rule['min_page'] is None:
+        return True
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        return True
+    return page >= rule['min_page']
+
+
+def client_id(request):
+    """Пользователь, если он вошёл, иначе IP-адрес."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    address = request.META.get(settings.RATELIMIT_IP_HEADER) or (
+        request.META.get('REMOTE_ADDR', '')
+    )
+    return f'ip:{address}'
+
+
+def hit(name, client, rate, now=None):
+    """
+    Засчитывает запрос; возвращает (allowed, retry_after) - можно ли
+    обработать запрос и через сколько секунд повторить, если нельзя.
+    """
+    limit, period = parse_rate(rate)
+    now = time.time() if now is None else now
+    window, offset = divmod(now, period)
+    backend = get_backend()
+    key = f'ratelimit:{name}:{client}'
+    current = backend.incr(f'{key}:{int(window)}', period * 2)
+    previous = backend.get(f'{key}:{int(window) - 1}')
+    weight = 1 - offset / period
+    if previous * weight + current <= limit:
+        return True, 0
+    return False, max(1, math.ceil(period - offset))
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from .limiter import applies, client_id, get_rule, hit
+
+
+def throttled(request, retry_after):
+    if request.path.startswith('/api/'):
+        response = JsonResponse(
+            {'detail': 'Request was throttled.'}, status=429
+        )
+    else:
+        response = render(request, 'misc/429.html', status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+class RateLimitMiddleware:
+    """
+    Отвечает 429, если клиент превысил лимит для URL из RATELIMITS.
+    Ставится после AuthenticationMiddleware: лимит считается по
+    пользователю, а для анонимов - по IP.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.RATELIMIT_ENABLED:
+            return None
+        url_name = request.resolver_match.url_name
+        rule = get_rule(url_name)
+        if rule is None or not applies(rule, request):
+            return None
+        allowed, retry_after = hit(url_name, client_id(request), rule['rate'])
+        if allowed:
+            return None
+        return throttled(request, retry_after)
@@ -0,0 +1,105 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from ratelimit.backends import reset_backend
+from ratelimit.limiter import hit, parse_rate
+
+
+@override_settings(
+    RATELIMIT_BACKEND='ratelimit.backends.LocalBackend',
+    RATELIMITS={
+        'add_comment': '2/m',
+        'signup': '1/h',
+        'api_posts': '1/m',
+        'index': {'rate': '1/m', 'methods': ('GET',), 'min_page': 3},
+    },
+)
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+
+    def setUp(self):
+        reset_backend()
+        self.addCleanup(reset_backend)
+
+    def comment(self, user):
+        client = Client()
+        client.force_login(user)
+        return client.post(
+            reverse('add_comment', kwargs={
+                'username': 'author', 'post_id': RateLimitTests.post.id
+            }),
+            {'text': 'Комментарий'},
+        )
+
+    def test_parse_rate(self):
+        """Лимит задаётся как число/период."""
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('5/2h'), (5, 7200))
+
+    def test_sliding_window(self):
+        """Запросы прошлого окна учитываются пропорционально."""
+        for _ in range(2):
+            self.assertTrue(hit('x', 'c', '2/m', now=60)[0])
+        self.assertEqual(hit('x', 'c', '2/m', now=61), (False, 59))
+        # Половина прошлого окна (3 * 0.5) + новый запрос > 2.
+        self.assertFalse(hit('x', 'c', '2/m', now=150)[0])
+        self.assertTrue(hit('x', 'c', '2/m', now=190)[0])
+
+    def test_comments_are_limited_per_user(self):
+        """Третий комментарий за минуту отклоняется, другому можно."""
+        self.assertEqual(self.comment(RateLimitTests.author).status_code, 302)
+        self.assertEqual(self.comment(RateLimitTests.author).status_code, 302)
+        response = self.comment(RateLimitTests.author)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(int(response['Retry-After']) > 0)
+        self.assertEqual(RateLimitTests.post.comments.count(), 2)
+        self.assertEqual(self.comment(RateLimitTests.other).status_code, 302)
+
+    def test_signup_is_limited_per_ip(self):
+        """Регистрации с одного IP ограничены, GET формы не считается."""
+        client = Client()
+        data = {
+            'username': 'bot',
+            'email': 'bot@example.com',
+            'password1': 'Very-secret-42',
+            'password2': 'Very-secret-42',
+        }
+        client.post(reverse('signup'), data, HTTP_X_REAL_IP='10.0.0.1')
+        self.assertEqual(client.get(reverse('signup')).status_code, 200)
+        response = client.post(
+            reverse('signup'), {**data, 'username': 'bot2'},
+            HTTP_X_REAL_IP='10.0.0.1',
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(User.objects.filter(username='bot2').exists())
+        response = client.post(
+            reverse('signup'), {**data, 'username': 'bot2'},
+            HTTP_X_REAL_IP='10.0.0.2',
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_only_deep_feed_pages_are_limited(self):
+        """Лимит ленты действует только на глубокие страницы."""
+        client = Client()
+        for _ in range(3):
+            self.assertEqual(client.get(reverse('index')).status_code, 200)
+        url = reverse('index') + '?page=5'
+        self.assertEqual(client.get(url).status_code, 200)
+        self.assertEqual(client.get(url).status_code, 429)
+
+    def test_api_gets_json(self):
+        """API отвечает на превышение лимита JSON-ом."""
+        client = Client()
+        url = reverse('api_posts')
+        client.post(url, {'text': 'x'})
+        response = client.post(url, {'text': 'x'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(
+            response.json(), {'detail': 'Request was throttled.'}
+        )
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class RealtimeConfig(AppConfig):
+    name = 'realtime'
+
+    def ready(self):
+        from . import signals  # noqa
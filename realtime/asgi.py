@@ -0,0 +1,286 @@
+import asyncio
+import sys
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.http import Http404
+from django.urls import Resolver404, resolve
+
+from . import views
+from .broker import get_broker
+from .channels import resolve_channels
+from .stream import KEEPALIVE, format_event, stream_timeout
+
+KEEPALIVE_INTERVAL = 15
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+def max_body_size():
+    """
+    Предел тела запроса: файл до FILE_UPLOAD_MAX_SIZE и поля формы до
+    DATA_UPLOAD_MAX_MEMORY_SIZE. None - без ограничения.
+    """
+    if settings.DATA_UPLOAD_MAX_MEMORY_SIZE is None:
+        return None
+    return settings.FILE_UPLOAD_MAX_SIZE + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+
+
+def build_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin1'),
+        'PATH_INFO': scope['path'].encode().decode('latin1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1')
+        value = value.decode('latin1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        if key in environ:
+            value = f'{environ[key]},{value}'
+        environ[key] = value
+    return environ
+
+
+def run_wsgi(application, environ, send, loop):
+    """
+    Выполняет WSGI-приложение в текущем (рабочем) потоке и отправляет
+    ответ по частям: StreamingHttpResponse и FileResponse не собираются
+    целиком в памяти. send вызывается в цикле событий loop.
+    """
+    started = {}
+
+    def call(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    result = application(environ, start_response)
+    try:
+        for chunk in result:
+            if not chunk:
+                continue
+            if 'sent' not in started:
+                started['sent'] = True
+                call({
+                    'type': 'http.response.start',
+                    'status': started['status'],
+                    'headers': encode_headers(started['headers']),
+                })
+            call({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': True,
+            })
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    if 'sent' not in started:
+        call({
+            'type': 'http.response.start',
+            'status': started['status'],
+            'headers': encode_headers(started['headers']),
+        })
+    call({'type': 'http.response.body', 'body': b''})
+
+
+def authorize(environ, kwargs):
+    """
+    Аутентифицирует запрос по сессии и возвращает каналы его ленты.
+    """
+    request = WSGIRequest(environ)
+    try:
+        SessionMiddleware().process_request(request)
+        AuthenticationMiddleware().process_request(request)
+        return resolve_channels(request, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def encode_headers(headers):
+    return [
+        (name.encode('latin1'), value.encode('latin1'))
+        for name, value in headers
+    ]
+
+
+class ASGIApplication:
+    """
+    ASGI-приложение: ленты событий из realtime.urls обслуживаются
+    асинхронно и не занимают потоков, остальные запросы выполняются
+    обычным WSGI-обработчиком Django в пуле потоков.
+    """
+
+    def __init__(self, wsgi_application):
+        self.wsgi_application = wsgi_application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f'Unsupported scope type {scope["type"]}')
+        try:
+            body = await self.read_body(scope, receive)
+        except RequestTooLarge:
+            await self.respond(send, 413, b'Request entity too large')
+            return
+        try:
+            environ = build_environ(scope, body)
+            try:
+                match = resolve(scope['path'])
+            except Resolver404:
+                match = None
+            if match is not None and match.func is views.events:
+                await self.stream(environ, match.kwargs, receive, send)
+            else:
+                await self.wsgi(environ, send)
+        finally:
+            body.close()
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, scope, receive):
+        """
+        Читает тело во временный файл (в памяти - до
+        FILE_UPLOAD_MAX_MEMORY_SIZE). Тело больше max_body_size()
+        отклоняется сразу, не дожидаясь Django.
+        """
+        limit = max_body_size()
+        headers = dict(scope.get('headers', []))
+        try:
+            declared = int(headers.get(b'content-length', 0))
+        except ValueError:
+            declared = 0
+        if limit is not None and declared > limit:
+            raise RequestTooLarge
+        body = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        size = 0
+        try:
+            while True:
+                message = await receive()
+                chunk = message.get('body', b'')
+                size += len(chunk)
+                if limit is not None and size > limit:
+                    raise RequestTooLarge
+                body.write(chunk)
+                if not message.get('more_body'):
+                    break
+        except RequestTooLarge:
+            body.close()
+            raise
+        body.seek(0)
+        return body
+
+    async def respond(self, send, status, text):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': encode_headers([('Content-Type', 'text/plain')]),
+        })
+        await send({'type': 'http.response.body', 'body': text})
+
+    async def wsgi(self, environ, send):
+        # Весь запрос - в одном потоке пула: соединения с БД Django
+        # привязаны к потоку.
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            None, run_wsgi, self.wsgi_application, environ, send, loop
+        )
+
+    async def stream(self, environ, kwargs, receive, send):
+        loop = asyncio.get_event_loop()
+        try:
+            channels = await loop.run_in_executor(
+                None, authorize, environ, kwargs
+            )
+        except Http404:
+            await self.respond(send, 404, b'Not found')
+            return
+        subscription = await get_broker().asubscribe(channels)
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': encode_headers([
+                ('Content-Type', 'text/event-stream'),
+                ('Cache-Control', 'no-cache'),
+                ('X-Accel-Buffering', 'no'),
+            ]),
+        })
+        deadline = loop.time() + stream_timeout()
+        try:
+            await self.send_chunk(send, 'retry: 3000\n\n')
+            while not watcher.done():
+                left = deadline - loop.time()
+                if left <= 0:
+                    break
+                getter = asyncio.ensure_future(
+                    subscription.aget(min(KEEPALIVE_INTERVAL, left))
+                )
+                await asyncio.wait(
+                    {getter, watcher}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not getter.done():
+                    # Клиент отключился, пока ждали события.
+                    getter.cancel()
+                    break
+                item = getter.result()
+                if item is None:
+                    await self.send_chunk(send, KEEPALIVE)
+                else:
+                    await self.send_chunk(send, format_event(item[1]))
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            watcher.cancel()
+            subscription.close()
+
+    async def send_chunk(self, send, text):
+        await send({
+            'type': 'http.response.body',
+            'body': text.encode(),
+            'more_body': True,
+        })
@@ -0,0 +1,314 @@
+import asyncio
+import queue
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = set(channels)
+
+    def get(self, timeout=None):
+        """
+        Ждёт следующее сообщение до timeout секунд; возвращает пару
+        (channel, message) или None.
+        """
+        raise NotImplementedError
+
+    async def aget(self, timeout=None):
+        """
+        Как get, но для asyncio: ждёт сообщение, не занимая поток.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LocalSubscription(Subscription):
+    def __init__(self, broker, channels):
+        super().__init__(broker, channels)
+        self.queue = queue.Queue(maxsize=broker.max_queue_size)
+        # (loop, asyncio.Event) ожидающего aget: публикуют из других
+        # потоков, поэтому будим его через call_soon_threadsafe.
+        self.waiter = None
+
+    def put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Медленный клиент не должен тормозить публикацию.
+            pass
+        waiter = self.waiter
+        if waiter is not None:
+            loop, event = waiter
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Цикл событий уже закрыт.
+                pass
+
+    def get(self, timeout=None):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def aget(self, timeout=None):
+        event = asyncio.Event()
+        self.waiter = (asyncio.get_event_loop(), event)
+        try:
+            # Ждущий выставлен до проверки очереди: put между проверкой и
+            # ожиданием не потеряется.
+            item = self.get(timeout=0)
+            if item is not None:
+                return item
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+            return self.get(timeout=0)
+        finally:
+            self.waiter = None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """
+    Pub/sub внутри процесса: подходит для тестов и одного воркера.
+    """
+    max_queue_size = 100
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def publish(self, channel, message):
+        with self.lock:
+            targets = list(self.subscriptions.get(channel, ()))
+        for subscription in targets:
+            subscription.put((channel, message))
+
+    def subscribe(self, channels):
+        subscription = LocalSubscription(self, channels)
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscriptions.setdefault(channel, set()).add(
+                    subscription
+                )
+        return subscription
+
+    async def asubscribe(self, channels):
+        return self.subscribe(channels)
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                targets = self.subscriptions.get(channel)
+                if targets is None:
+                    continue
+                targets.discard(subscription)
+                if not targets:
+                    del self.subscriptions[channel]
+
+
+class CacheSubscription(Subscription):
+    def __init__(self, broker, channels):
+        super().__init__(broker, channels)
+        self.positions = broker.get_positions(self.channels)
+        self.pending = []
+
+    def get(self, timeout=None):
+        waited = 0
+        while not self.pending:
+            self.pending = self.broker.fetch(self.positions)
+            if self.pending:
+                break
+            if timeout is not None and waited >= timeout:
+                return None
+            time.sleep(self.broker.poll_interval)
+            waited += self.broker.poll_interval
+        return self.pending.pop(0)
+
+
+class AsyncCacheSubscription(Subscription):
+    """
+    Подписка для asyncio: сообщения ей раскладывает общий CachePoller
+    цикла событий, сама она кэш не опрашивает.
+    """
+
+    def __init__(self, broker, channels, poller):
+        super().__init__(broker, channels)
+        self.poller = poller
+        self.queue = asyncio.Queue(maxsize=broker.max_queue_size)
+
+    def put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            pass
+
+    async def aget(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.poller.remove(self)
+
+
+class CachePoller:
+    """
+    Один опрос кэша раз в poll_interval на цикл событий, сколько бы
+    клиентов ни было подписано: пул потоков занимает один fetch, а не
+    по запросу на каждое соединение.
+    """
+
+    def __init__(self, broker, loop):
+        self.broker = broker
+        self.loop = loop
+        self.positions = {}
+        self.subscribers = {}
+        self.task = None
+
+    async def add(self, subscription):
+        new = [
+            channel for channel in subscription.channels
+            if channel not in self.positions
+        ]
+        if new:
+            positions = await self.loop.run_in_executor(
+                None, self.broker.get_positions, new
+            )
+            for channel, position in positions.items():
+                self.positions.setdefault(channel, position)
+        for channel in subscription.channels:
+            self.subscribers.setdefault(channel, set()).add(subscription)
+        if self.task is None or self.task.done():
+            self.task = self.loop.create_task(self.run())
+
+    def remove(self, subscription):
+        for channel in subscription.channels:
+            targets = self.subscribers.get(channel)
+            if targets is None:
+                continue
+            targets.discard(subscription)
+            if not targets:
+                del self.subscribers[channel]
+                self.positions.pop(channel, None)
+
+    async def run(self):
+        while self.subscribers:
+            positions = dict(self.positions)
+            items = await self.loop.run_in_executor(
+                None, self.broker.fetch, positions
+            )
+            for channel, position in positions.items():
+                if channel in self.positions:
+                    self.positions[channel] = position
+            for channel, message in items:
+                for subscription in list(self.subscribers.get(channel, ())):
+                    subscription.put((channel, message))
+            await asyncio.sleep(self.broker.poll_interval)
+
+
+class CacheBroker:
+    """
+    Pub/sub поверх общего кэша из CACHES: каждый канал - счётчик,
+    увеличиваемый атомарным incr, и сообщения под ключами с номерами.
+    Работает между воркерами gunicorn при memcached/redis.
+    """
+    poll_interval = 0.5
+    max_queue_size = 100
+    message_timeout = 60
+
+    def __init__(self):
+        self.pollers = weakref.WeakKeyDictionary()
+
+    def _counter_key(self, channel):
+        return f'realtime:{channel}'
+
+    def _message_key(self, channel, number):
+        return f'realtime:{channel}:{number}'
+
+    def publish(self, channel, message):
+        key = self._counter_key(channel)
+        cache.add(key, 0, None)
+        number = cache.incr(key)
+        cache.set(
+            self._message_key(channel, number), message, self.message_timeout
+        )
+
+    def subscribe(self, channels):
+        return CacheSubscription(self, channels)
+
+    async def asubscribe(self, channels):
+        loop = asyncio.get_event_loop()
+        poller = self.pollers.get(loop)
+        if poller is None:
+            poller = self.pollers[loop] = CachePoller(self, loop)
+        subscription = AsyncCacheSubscription(self, channels, poller)
+        await poller.add(subscription)
+        return subscription
+
+    def get_positions(self, channels):
+        keys = {self._counter_key(channel): channel for channel in channels}
+        current = cache.get_many(keys)
+        return {
+            channel: current.get(key, 0) for key, channel in keys.items()
+        }
+
+    def fetch(self, positions):
+        current = self.get_positions(positions)
+        wanted = {}
+        for channel, last in current.items():
+            for number in range(positions[channel] + 1, last + 1):
+                wanted[self._message_key(channel, number)] = channel
+            positions[channel] = last
+        if not wanted:
+            return []
+        messages = cache.get_many(wanted)
+        return [
+            (channel, messages[key])
+            for key, channel in wanted.items() if key in messages
+        ]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            path = getattr(
+                settings, 'REALTIME_BROKER', 'realtime.broker.CacheBroker'
+            )
+            _broker = import_string(path)()
+        return _broker
+
+
+def reset_broker():
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def publish(channel, message):
+    get_broker().publish(channel, message)
@@ -0,0 +1,39 @@
+from django.http import Http404
+
+from posts.entities import get_group_or_404
+from posts.models import Follow
+
+INDEX = 'index'
+
+
+def group_channel(group_id):
+    return f'group:{group_id}'
+
+
+def author_channel(author_id):
+    return f'author:{author_id}'
+
+
+def post_channels(post):
+    channels = [INDEX, author_channel(post.author_id)]
+    if post.group_id:
+        channels.append(group_channel(post.group_id))
+    return channels
+
+
+def resolve_channels(request, stream, slug=None):
+    """
+    Каналы для ленты: index, group (по slug) или follow (все авторы,
+    на которых подписан пользователь).
+    """
+    if stream == 'index':
+        return [INDEX]
+    if stream == 'group':
+        group = get_group_or_404(slug)
+        return [group_channel(group.id)]
+    if stream == 'follow' and request.user.is_authenticated:
+        authors = Follow.objects.filter(user=request.user).values_list(
+            'author_id', flat=True
+        )
+        return [author_channel(pk) for pk in authors]
+    raise Http404
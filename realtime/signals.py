@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+from .broker import publish
+from .channels import post_channels
+
+
+def _post_message(post):
+    return {
+        'type': 'post',
+        'post': post.id,
+        'author': post.author.username,
+        'text': post.text[:200],
+        'url': reverse('post', args=(post.author.username, post.id)),
+    }
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    message = _post_message(instance)
+    channels = post_channels(instance)
+
+    def send():
+        for channel in channels:
+            publish(channel, message)
+    transaction.on_commit(send)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    post = instance.post
+    message = {
+        'type': 'comment',
+        'comment': instance.id,
+        'post': post.id,
+        'author': instance.author.username,
+        'text': instance.text[:200],
+        'url': reverse('post', args=(post.author.username, post.id)),
+    }
+    channels = post_channels(post)
+
+    def send():
+        for channel in channels:
+            publish(channel, message)
+    transaction.on_commit(send)
@@ -0,0 +1,38 @@
+import json
+import time
+
+from django.conf import settings
+
+KEEPALIVE = ': keepalive\n\n'
+
+
+def format_event(message):
+    data = json.dumps(message, ensure_ascii=False)
+    return f'event: {message["type"]}\ndata: {data}\n\n'
+
+
+def stream_timeout():
+    return getattr(settings, 'REALTIME_STREAM_TIMEOUT', 300)
+
+
+def event_stream(subscription, timeout=None, keepalive=15):
+    """
+    Генератор SSE-кадров из подписки. Поток закрывается через timeout
+    секунд: EventSource переподключится сам, а воркер не занят вечно.
+    """
+    timeout = stream_timeout() if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            item = subscription.get(timeout=min(keepalive, left))
+            if item is None:
+                yield KEEPALIVE
+                continue
+            _, message = item
+            yield format_event(message)
+    finally:
+        subscription.close()
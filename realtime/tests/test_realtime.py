@@ -0,0 +1,254 @@
+import asyncio
+import json
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+from realtime.asgi import ASGIApplication
+from realtime.broker import (CacheBroker, LocalBroker, get_broker, publish,
+                             reset_broker)
+from realtime.channels import INDEX, author_channel, group_channel
+
+
+class BrokerTests(TestCase):
+    def test_local_broker_delivers_to_subscribers(self):
+        """Сообщение доходит только до подписчиков канала."""
+        broker = LocalBroker()
+        with broker.subscribe(['a']) as first, broker.subscribe(['b']) as b:
+            broker.publish('a', {'type': 'post'})
+            self.assertEqual(first.get(timeout=0), ('a', {'type': 'post'}))
+            self.assertIsNone(b.get(timeout=0))
+        self.assertEqual(broker.subscriptions, {})
+
+    def test_local_subscription_aget_wakes_on_publish(self):
+        """aget просыпается от публикации из другого потока."""
+        broker = LocalBroker()
+
+        async def run():
+            loop = asyncio.get_event_loop()
+            with broker.subscribe(['a']) as subscription:
+                getter = asyncio.ensure_future(subscription.aget(5))
+                await asyncio.sleep(0)
+                await loop.run_in_executor(
+                    None, broker.publish, 'a', {'type': 'post'}
+                )
+                item = await asyncio.wait_for(getter, 1)
+                timed_out = await subscription.aget(0)
+            return item, timed_out
+
+        item, timed_out = asyncio.run(run())
+        self.assertEqual(item, ('a', {'type': 'post'}))
+        self.assertIsNone(timed_out)
+
+    def test_cache_broker_shares_one_poller(self):
+        """Асинхронные подписчики CacheBroker делят один опрос кэша."""
+        broker = CacheBroker()
+
+        async def run():
+            first = await broker.asubscribe(['fan'])
+            second = await broker.asubscribe(['fan', 'other'])
+            self.assertEqual(len(broker.pollers), 1)
+            broker.publish('fan', {'type': 'post'})
+            items = [await first.aget(2), await second.aget(2)]
+            first.close()
+            second.close()
+            poller = broker.pollers[asyncio.get_event_loop()]
+            return items, poller.subscribers
+
+        items, subscribers = asyncio.run(run())
+        self.assertEqual(items, [('fan', {'type': 'post'})] * 2)
+        self.assertEqual(subscribers, {})
+
+    @override_settings(REALTIME_BROKER='realtime.broker.CacheBroker')
+    def test_cache_broker(self):
+        """CacheBroker отдаёт только сообщения после подписки."""
+        reset_broker()
+        try:
+            publish('c', {'type': 'old'})
+            subscription = get_broker().subscribe(['c'])
+            publish('c', {'type': 'new'})
+            self.assertEqual(
+                subscription.get(timeout=0), ('c', {'type': 'new'})
+            )
+            self.assertIsNone(subscription.get(timeout=0))
+        finally:
+            reset_broker()
+
+
+class PublishTests(TransactionTestCase):
+    def setUp(self):
+        reset_broker()
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(title='Котики', slug='test-slug')
+
+    def test_post_and_comment_are_published(self):
+        """Новый пост и комментарий публикуются в каналы лент."""
+        channels = [
+            INDEX, group_channel(self.group.id), author_channel(self.author.id)
+        ]
+        with get_broker().subscribe(channels) as subscription:
+            post = Post.objects.create(
+                text='Текст', author=self.author, group=self.group
+            )
+            received = [subscription.get(timeout=0) for _ in range(3)]
+            self.assertEqual({channel for channel, _ in received},
+                             set(channels))
+            self.assertEqual(received[0][1]['post'], post.id)
+            post.comments.create(author=self.author, text='Коммент')
+            _, message = subscription.get(timeout=0)
+            self.assertEqual(message['type'], 'comment')
+
+
+@override_settings(REALTIME_STREAM_TIMEOUT=1)
+class EventsViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.author = User.objects.create_user(username='author')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        reset_broker()
+
+    def test_index_stream(self):
+        """Лента index отдаёт опубликованные события в формате SSE."""
+        response = Client().get(reverse('events_index'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = iter(response.streaming_content)
+        self.assertEqual(next(stream), b'retry: 3000\n\n')
+        publish(INDEX, {'type': 'post', 'post': 1})
+        chunk = next(stream).decode()
+        self.assertTrue(chunk.startswith('event: post\n'))
+        self.assertEqual(json.loads(chunk.split('data: ')[1]), {
+            'type': 'post', 'post': 1
+        })
+        response.close()
+
+    def test_follow_stream(self):
+        """Лента подписок доступна только авторизованным."""
+        self.assertEqual(
+            Client().get(reverse('events_follow')).status_code, 404
+        )
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('events_follow'))
+        stream = iter(response.streaming_content)
+        next(stream)
+        publish(author_channel(self.author.id), {'type': 'post'})
+        self.assertIn(b'event: post', next(stream))
+        response.close()
+
+
+class ASGIApplicationTests(TestCase):
+    def setUp(self):
+        reset_broker()
+        self.application = ASGIApplication(WSGIHandler())
+
+    def call(self, path, on_message, method='GET', chunks=(b'',),
+             headers=()):
+        scope = {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': b'',
+            'headers': [(b'host', b'testserver'), *headers],
+        }
+        disconnect = asyncio.Event()
+        body = list(chunks)
+
+        async def receive():
+            if body:
+                return {
+                    'type': 'http.request',
+                    'body': body.pop(0),
+                    'more_body': bool(body),
+                }
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if on_message(message):
+                disconnect.set()
+
+        async def run():
+            await asyncio.wait_for(
+                self.application(scope, receive, send), 5
+            )
+
+        asyncio.run(run())
+
+    def test_regular_request_uses_wsgi(self):
+        """Обычные страницы обслуживает WSGI-обработчик Django."""
+        messages = []
+        self.call(
+            reverse('group', kwargs={'slug': 'missing'}), messages.append
+        )
+        self.assertEqual(messages[0]['status'], 404)
+        self.assertIn('Yatube'.encode(), messages[1]['body'])
+
+    @override_settings(
+        FILE_UPLOAD_MAX_SIZE=10, DATA_UPLOAD_MAX_MEMORY_SIZE=10
+    )
+    def test_too_large_body_is_rejected(self):
+        """Тело больше предела отклоняется до вызова Django."""
+        path = reverse('new_post')
+        for kwargs in (
+            {'headers': [(b'content-length', b'21')]},
+            {'chunks': [b'x' * 15, b'x' * 15]},
+        ):
+            with self.subTest(**kwargs):
+                messages = []
+                self.call(path, messages.append, method='POST', **kwargs)
+                self.assertEqual(messages[0]['status'], 413)
+
+    def test_wsgi_body_is_streamed(self):
+        """Ответ WSGI-приложения отправляется по частям, а не целиком."""
+        closed = []
+        received = []
+
+        class Result:
+            def __iter__(self):
+                yield b'first'
+                yield b''
+                yield b'second'
+
+            def close(self):
+                closed.append(True)
+
+        def application(environ, start_response):
+            received.append(environ['wsgi.input'].read())
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return Result()
+
+        self.application = ASGIApplication(application)
+        messages = []
+        self.call(
+            '/download/', messages.append, method='POST',
+            chunks=[b'a=1', b'&b=2']
+        )
+        self.assertEqual(received, [b'a=1&b=2'])
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertEqual(
+            [(m['body'], m.get('more_body')) for m in messages[1:]],
+            [(b'first', True), (b'second', True), (b'', None)]
+        )
+        self.assertEqual(closed, [True])
+
+    def test_events_stream(self):
+        """ASGI-приложение отдаёт события без WSGI."""
+        bodies = []
+
+        def on_message(message):
+            if message['type'] != 'http.response.body':
+                return False
+            bodies.append(message['body'])
+            if len(bodies) == 1:
+                publish(INDEX, {'type': 'post', 'post': 7})
+            return len(bodies) == 2
+
+        self.call(reverse('events_index'), on_message)
+        self.assertIn(b'event: post', bodies[1])
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('', views.events, {'stream': 'index'}, name='events_index'),
+    path('follow/', views.events, {'stream': 'follow'}, name='events_follow'),
+    path(
+        'group/<slug:slug>/', views.events, {'stream': 'group'},
+        name='events_group'
+    ),
+]
@@ -0,0 +1,16 @@
+from django.http import StreamingHttpResponse
+
+from .broker import get_broker
+from .channels import resolve_channels
+from .stream import event_stream
+
+
+def events(request, stream, slug=None):
+    channels = resolve_channels(request, stream, slug)
+    subscription = get_broker().subscribe(channels)
+    response = StreamingHttpResponse(
+        event_stream(subscription), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
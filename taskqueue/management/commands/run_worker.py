@@ -0,0 +1,62 @@
+import multiprocessing
+import time
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+import django
+from django.core.management.base import BaseCommand
+
+from taskqueue.worker import claim, execute
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди taskqueue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Число одновременно выполняемых задач',
+        )
+        parser.add_argument(
+            '--pool', choices=('thread', 'process'), default='thread',
+            help='Пул потоков для задач с I/O, пул процессов для CPU',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, секунд',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить все готовые задачи и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        if options['pool'] == 'process':
+            # spawn, а не fork: пул запускает процессы лениво, уже после
+            # claim(), и форк унаследовал бы сокет соединения с БД родителя.
+            executor = ProcessPoolExecutor(
+                concurrency, mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        else:
+            executor = ThreadPoolExecutor(concurrency)
+        done = 0
+        running = set()
+        with executor:
+            while True:
+                free = concurrency - len(running)
+                if free:
+                    for task_id in claim(free):
+                        running.add(executor.submit(execute, task_id))
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                finished, running = wait(
+                    running, timeout=options['poll_interval'],
+                    return_when=FIRST_COMPLETED
+                )
+                done += len(finished)
+        self.stdout.write(f'Выполнено задач: {done}')
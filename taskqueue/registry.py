@@ -0,0 +1,61 @@
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import Task
+
+registry = {}
+
+
+class TaskFunction:
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, key=None, **kwargs):
+        return enqueue(self.name, args, kwargs, key=key)
+
+    def delay_on_commit(self, *args, key=None, **kwargs):
+        transaction.on_commit(lambda: self.delay(*args, key=key, **kwargs))
+
+
+def task(name=None, max_attempts=3):
+    """
+    Регистрирует функцию как фоновую задачу. Аргументы задачи должны
+    сериализоваться в JSON.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        wrapped = TaskFunction(func, task_name, max_attempts)
+        registry[task_name] = wrapped
+        return wrapped
+    return decorator
+
+
+def enqueue(name, args=(), kwargs=None, key=None):
+    """
+    Ставит задачу в очередь. Повторный вызов с тем же key не создаёт
+    дубликат, а возвращает уже существующую задачу.
+    """
+    func = registry[name]
+    payload = json.dumps({'args': list(args), 'kwargs': kwargs or {}})
+    if getattr(settings, 'TASKS_EAGER', False):
+        func(*args, **(kwargs or {}))
+        return None
+    if key is None:
+        return Task.objects.create(
+            name=name, payload=payload, max_attempts=func.max_attempts
+        )
+    try:
+        with transaction.atomic():
+            return Task.objects.create(
+                name=name, payload=payload, idempotency_key=key,
+                max_attempts=func.max_attempts
+            )
+    except IntegrityError:
+        return Task.objects.get(idempotency_key=key)
@@ -0,0 +1,83 @@
+import datetime as dt
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from taskqueue.models import Task
+from taskqueue.registry import enqueue, task
+from taskqueue.worker import LOST_ERROR, claim, execute
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.broken', max_attempts=2)
+def broken():
+    raise ValueError('boom')
+
+
+class WorkerCommandTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def run_worker(self):
+        out = StringIO()
+        call_command('run_worker', '--once', '--concurrency=2', stdout=out)
+        return out.getvalue()
+
+    def test_worker_executes_queued_tasks(self):
+        """Воркер выполняет задачи из очереди и помечает их выполненными."""
+        for value in range(3):
+            record.delay(value)
+        self.assertIn('3', self.run_worker())
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 3)
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_idempotency_key(self):
+        """Повтор с тем же ключом не создаёт дубликат задачи."""
+        first = record.delay(1, key='same')
+        second = record.delay(2, key='same')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_retries_then_fails(self):
+        """Упавшая задача повторяется, затем помечается как ошибочная."""
+        broken_task = enqueue('tests.broken')
+        self.assertEqual(execute(broken_task.pk), Task.QUEUED)
+        broken_task.refresh_from_db()
+        self.assertEqual(broken_task.attempts, 1)
+        self.assertIn('boom', broken_task.last_error)
+        self.assertEqual(claim(10), [])
+        self.assertEqual(execute(broken_task.pk), Task.FAILED)
+
+    def test_lost_task_counts_attempts(self):
+        """Задача, ронявшая воркер, не забирается бесконечно."""
+        lost = enqueue('tests.broken')
+        stale = timezone.now() - dt.timedelta(hours=1)
+        for attempts in (1, 2):
+            Task.objects.filter(pk=lost.pk).update(
+                status=Task.RUNNING, locked_at=stale
+            )
+            self.assertEqual(claim(10), [lost.pk] if attempts == 1 else [])
+            lost.refresh_from_db()
+            self.assertEqual(lost.attempts, attempts)
+        self.assertEqual(lost.status, Task.FAILED)
+        self.assertEqual(lost.last_error, LOST_ERROR)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode(self):
+        """В режиме TASKS_EAGER задача выполняется сразу."""
+        record.delay('eager')
+        self.assertEqual(calls, ['eager'])
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,90 @@
+import datetime as dt
+import json
+import logging
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+def lock_timeout():
+    return dt.timedelta(
+        seconds=getattr(settings, 'TASKS_LOCK_TIMEOUT', 10 * 60)
+    )
+
+
+LOST_ERROR = 'Воркер не завершил задачу за TASKS_LOCK_TIMEOUT'
+
+
+def claim(limit):
+    """
+    Забирает до limit готовых задач. Зависшие в running дольше
+    TASKS_LOCK_TIMEOUT (упавший воркер) тоже забираются повторно.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Попытка зависшей задачи засчитывается: задача, которая роняет
+        # воркер, после max_attempts помечается ошибочной, а не берётся
+        # снова и снова.
+        lost = list(Task.objects.filter(
+            status=Task.RUNNING, locked_at__lt=now - lock_timeout()
+        ).select_for_update(skip_locked=True).values_list('id', flat=True))
+        if lost:
+            Task.objects.filter(id__in=lost).update(
+                attempts=F('attempts') + 1, last_error=LOST_ERROR
+            )
+            Task.objects.filter(
+                id__in=lost, attempts__gte=F('max_attempts')
+            ).update(status=Task.FAILED, locked_at=None)
+        ready = Task.objects.filter(
+            Q(status=Task.QUEUED, run_at__lte=now)
+            | Q(id__in=lost, status=Task.RUNNING)
+        ).order_by('run_at').select_for_update(skip_locked=True)
+        ids = list(ready.values_list('id', flat=True)[:limit])
+        Task.objects.filter(id__in=ids).update(
+            status=Task.RUNNING, locked_at=now
+        )
+    return ids
+
+
+def retry_delay(attempts):
+    return dt.timedelta(seconds=min(2 ** attempts, 60 * 60))
+
+
+def execute(task_id):
+    """
+    Выполняет задачу в текущем потоке или процессе пула.
+    """
+    try:
+        task = Task.objects.get(id=task_id)
+        func = registry.get(task.name)
+        task.attempts += 1
+        try:
+            if func is None:
+                raise LookupError(f'Unknown task {task.name}')
+            payload = json.loads(task.payload)
+            func(*payload['args'], **payload['kwargs'])
+        except Exception:
+            task.last_error = traceback.format_exc()
+            logger.exception('Task %s failed', task)
+            if task.attempts < task.max_attempts:
+                task.status = Task.QUEUED
+                task.run_at = timezone.now() + retry_delay(task.attempts)
+            else:
+                task.status = Task.FAILED
+        else:
+            task.status = Task.DONE
+        task.locked_at = None
+        task.save(update_fields=(
+            'status', 'attempts', 'run_at', 'locked_at', 'last_error'
+        ))
+        return task.status
+    finally:
+        close_old_connections()
@@ -1,3 +1,53 @@
 from django.contrib import admin
+from django.contrib.auth import get_permission_codename, get_user_model
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-# Register your models here.
\ No newline at end of file
+from posts.models import Comment, Follow, Post
+
+from .tasks import schedule_purge
+
+User = get_user_model()
+
+
+class UserAdmin(BaseUserAdmin):
+    """
+    Удаление пользователей через фоновую очистку пачками вместо сборки
+    всех связанных объектов в запросе админки.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        # Страница подтверждения показывает только сводку: полный список
+        # у активного автора - это миллионы строк.
+        ids = [obj.pk for obj in objs]
+        perms_needed = set()
+        model_count = {
+            User._meta.verbose_name_plural: len(ids),
+            Post._meta.verbose_name_plural:
+                Post.objects.filter(author__in=ids).count(),
+            Comment._meta.verbose_name_plural:
+                Comment.objects.filter(author__in=ids).count(),
+            Follow._meta.verbose_name_plural: Follow.objects.filter(
+                user__in=ids
+            ).count() + Follow.objects.filter(author__in=ids).count(),
+        }
+        # Права на каскадное удаление проверяются так же, как в штатном
+        # коллекторе: по моделям, строки которых действительно удалятся.
+        for model in (User, Post, Comment, Follow):
+            if not model_count[model._meta.verbose_name_plural]:
+                continue
+            opts = model._meta
+            codename = get_permission_codename('delete', opts)
+            if not request.user.has_perm(f'{opts.app_label}.{codename}'):
+                perms_needed.add(opts.verbose_name)
+        return [str(obj) for obj in objs], model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        schedule_purge(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            schedule_purge(user)
+
+
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
@@ -0,0 +1,99 @@
+"""
+Выгрузка данных пользователя в ZIP: JSON Lines по разделам и картинки
+постов. Строки читаются курсором пачками (iterator), файлы копируются
+блоками, архив пишется во временный файл - память воркера не зависит
+от объёма аккаунта.
+"""
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Follow,
+                          Post)
+
+from .models import DataExport
+
+ITERATOR_CHUNK_SIZE = 2000
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+def sections(user):
+    """Разделы архива: имя файла и values()-запрос его строк."""
+    return (
+        ('posts.jsonl', Post.objects.filter(author=user).values(
+            'id', 'text', 'pub_date', 'group__slug', 'image', 'views'
+        )),
+        ('archived_posts.jsonl', ArchivedPost.objects.filter(
+            author=user
+        ).values('id', 'text', 'pub_date', 'group__slug', 'image', 'views')),
+        ('comments.jsonl', Comment.objects.filter(author=user).values(
+            'id', 'post_id', 'text', 'created'
+        )),
+        ('archived_comments.jsonl', ArchivedComment.objects.filter(
+            author=user
+        ).values('id', 'post_id', 'text', 'created')),
+        ('following.jsonl', Follow.objects.filter(user=user).values(
+            'author__username'
+        )),
+        ('followers.jsonl', Follow.objects.filter(author=user).values(
+            'user__username'
+        )),
+    )
+
+
+def _images(user):
+    for model in (Post, ArchivedPost):
+        yield from model.objects.filter(author=user).exclude(
+            image=''
+        ).exclude(image=None).order_by('id').values_list(
+            'image', flat=True
+        ).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+
+def write_archive(user, fileobj):
+    """Пишет архив с данными user в открытый на запись файл."""
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, queryset in sections(user):
+            with archive.open(name, 'w', force_zip64=True) as out:
+                rows = queryset.order_by('pk').iterator(
+                    chunk_size=ITERATOR_CHUNK_SIZE
+                )
+                for row in rows:
+                    line = json.dumps(
+                        row, cls=DjangoJSONEncoder, ensure_ascii=False
+                    )
+                    out.write(f'{line}\n'.encode())
+        for image in _images(user):
+            if not default_storage.exists(image):
+                continue
+            with default_storage.open(image) as src, archive.open(
+                f'media/{image}', 'w', force_zip64=True
+            ) as out:
+                shutil.copyfileobj(src, out, COPY_BUFFER_SIZE)
+
+
+def build_export(export):
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            write_archive(export.user, tmp)
+            tmp.seek(0)
+            stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+            export.file.save(
+                os.path.join(str(export.user_id), f'yatube-{stamp}.zip'),
+                File(tmp), save=False
+            )
+    except Exception:
+        export.status = DataExport.FAILED
+        export.finished = timezone.now()
+        export.save(update_fields=['status', 'finished'])
+        raise
+    export.status = DataExport.READY
+    export.finished = timezone.now()
+    export.save(update_fields=['file', 'status', 'finished'])
@@ -1,10 +1,35 @@
+from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from django.urls import Resolver404, resolve
 
 User = get_user_model()
 
 
+def shadows_url(username):
+    """
+    True, если профиль с таким именем перекрыт адресом сайта: rss/,
+    tag/<name>/, about/<url> и другими путями первого уровня.
+    """
+    for path, url_name in ((f'/{username}/', 'profile'),
+                           (f'/{username}/1/', 'post')):
+        try:
+            if resolve(path).url_name != url_name:
+                return True
+        except Resolver404:
+            return True
+    return False
+
+
 class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+    def clean_username(self):
+        username = self.cleaned_data['username']
+        if shadows_url(username):
+            raise forms.ValidationError(
+                'Это имя занято адресом сайта.', code='reserved'
+            )
+        return username
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from users.purge import purge_user
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Удаляет пользователей со всеми постами, комментариями и подписками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='+')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for username in options['usernames']:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f'Пользователь {username} не найден')
+            stats = purge_user(user, batch_size=options['batch_size'])
+            total = sum(stats.values())
+            self.stdout.write(f'{username}: удалено строк {total}')
+            for label, count in sorted(stats.items()):
+                self.stdout.write(f'  {label}: {count}')
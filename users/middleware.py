@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from posts.entities import get_user
+
+MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+
+
+def get_cached_user(request):
+    """
+    То же, что auth.get_user, но пользователь для ModelBackend берётся из
+    кэша сущностей: на попадании запрос не ходит в БД за request.user.
+    """
+    try:
+        user_id = auth.get_user_model()._meta.pk.to_python(
+            request.session[auth.SESSION_KEY]
+        )
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    if backend_path != MODEL_BACKEND:
+        return auth.get_user(request)
+    user = get_user(user_id)
+    if user is None or not user.is_active:
+        return AnonymousUser()
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    expected = getattr(user, 'cached_session_hash', None)
+    if expected is None:
+        expected = user.get_session_auth_hash()
+    if not (session_hash and constant_time_compare(session_hash, expected)):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(
+            lambda: get_cached_user(request)
+        )
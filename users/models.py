@@ -1,4 +1,50 @@
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 
-# Create your models here.
 
+class ExportStorage(FileSystemStorage):
+    """
+    Архивы выгрузок лежат в EXPORTS_ROOT вне MEDIA_ROOT: nginx не должен
+    отдавать их без проверки владельца.
+    """
+
+    @property
+    def base_location(self):
+        return settings.EXPORTS_ROOT
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+
+exports_storage = ExportStorage()
+
+
+class DataExport(models.Model):
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Готовится'),
+        (READY, 'Готов'),
+        (FAILED, 'Ошибка'),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name="data_exports"
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    file = models.FileField(
+        storage=exports_storage, upload_to='exports/', blank=True
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created']
@@ -0,0 +1,108 @@
+"""
+Удаление пользователя со всем содержимым пачками.
+
+Обычный delete() собирает в память каждый пост, комментарий и подписку
+и рассылает сигналы по каждому объекту. Здесь зависимые строки удаляются
+прямыми DELETE по batch_size первичных ключей, каждая пачка - в своей
+транзакции, а счётчики и ленты сбрасываются один раз в конце. Прерванную
+очистку можно просто запустить снова.
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import models, router, transaction
+from django.db.models.deletion import get_candidate_relations_to_delete
+
+from posts import counters, feeds
+from posts.models import Comment, Follow, Post
+
+from .models import DataExport, exports_storage
+
+User = get_user_model()
+
+FAST_ON_DELETE = (models.CASCADE, models.SET_NULL, models.DO_NOTHING)
+
+
+def _relations(model):
+    return [
+        related for related in get_candidate_relations_to_delete(model._meta)
+        if related.field.remote_field.on_delete is not models.DO_NOTHING
+    ]
+
+
+def _delete_related(model, pks, batch_size, stats):
+    for related in _relations(model):
+        field = related.field
+        queryset = related.related_model._base_manager.filter(
+            **{f'{field.name}__in': pks}
+        )
+        if field.remote_field.on_delete is models.SET_NULL:
+            queryset.update(**{field.name: None})
+        else:
+            _delete_queryset(queryset, batch_size, stats)
+
+
+def _delete_queryset(queryset, batch_size, stats):
+    model = queryset.model
+    using = router.db_for_write(model)
+    fast = all(
+        related.field.remote_field.on_delete in FAST_ON_DELETE
+        for related in _relations(model)
+    )
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        chunk = model._base_manager.filter(pk__in=pks)
+        with transaction.atomic(using=using):
+            if not fast:
+                # PROTECT, SET_DEFAULT и SET() обрабатывает штатный
+                # коллектор Django.
+                _, deleted = chunk.delete()
+                stats.update(deleted)
+                continue
+            _delete_related(model, pks, batch_size, stats)
+            stats[model._meta.label] += chunk._raw_delete(using)
+
+
+def purge_user(user, batch_size=1000):
+    """
+    Удаляет пользователя, его посты, комментарии, подписки и всё, что на
+    них ссылается. Возвращает число удалённых строк по моделям.
+    """
+    followed = set(Follow.objects.filter(user=user).values_list(
+        'author_id', flat=True
+    ))
+    followers = set(Follow.objects.filter(author=user).values_list(
+        'user_id', flat=True
+    ))
+    commented = set(Comment.objects.filter(author=user).exclude(
+        post__author=user
+    ).values_list('post_id', flat=True))
+    group_ids = set(Post.objects.filter(author=user).exclude(
+        group=None
+    ).values_list('group_id', flat=True))
+
+    # Строки выгрузок удалятся прямым DELETE, а их архивы - только здесь.
+    for name in DataExport.objects.filter(user=user).exclude(
+        file=''
+    ).values_list('file', flat=True):
+        exports_storage.delete(name)
+
+    stats = Counter()
+    # Сначала посты: их комментарии и уведомления уходят вместе с ними,
+    # а не по одному при удалении остальных связей пользователя.
+    _delete_queryset(Post.objects.filter(author=user), batch_size, stats)
+    _delete_related(User, [user.pk], batch_size, stats)
+    # Зависимых строк уже нет, поэтому коллектор удалит одну строку, а
+    # сигналы сбросят кэш самого пользователя.
+    _, deleted = User.objects.filter(pk=user.pk).delete()
+    stats.update(deleted)
+
+    counters.invalidate_users(user.pk, *followed, *followers)
+    counters.invalidate_posts(*commented)
+    feeds.touch(
+        feeds.INDEX_SCOPE, feeds.author_scope(user.pk),
+        *(feeds.group_scope(group_id) for group_id in group_ids)
+    )
+    return dict(stats)
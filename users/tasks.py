@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from posts.entities import invalidate_user
+from taskqueue.registry import task
+
+from .export import build_export
+from .models import DataExport
+from .purge import purge_user
+
+User = get_user_model()
+
+
+@task(name='users.purge_user')
+def purge_user_later(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        purge_user(user)
+
+
+def schedule_purge(user):
+    """
+    Блокирует вход и ставит удаление в очередь: запрос администратора не
+    ждёт, пока удалятся все посты пользователя.
+    """
+    # Кэш сущностей сбрасывается явно, и ещё раз после коммита: иначе
+    # параллельный запрос успел бы закэшировать пользователя активным.
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    user.is_active = False
+    invalidate_user(user)
+    transaction.on_commit(lambda: invalidate_user(user))
+    purge_user_later.delay_on_commit(user.pk, key=f'purge_user:{user.pk}')
+
+
+# Упавшую выгрузку пользователь запускает заново сам, а повтор задачи
+# показывал бы ему то ошибку, то снова «готовится».
+@task(name='users.build_export', max_attempts=1)
+def build_export_later(export_id):
+    export = DataExport.objects.filter(
+        pk=export_id, status=DataExport.PENDING
+    ).select_related('user').first()
+    if export is not None:
+        build_export(export)
@@ -0,0 +1,111 @@
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.archive import archive_batch
+from posts.models import Comment, Follow, Post, User
+from users.models import DataExport
+from users.tasks import build_export_later
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+class DataExportTests(TestCase):
+    def setUp(self):
+        for name in ('MEDIA_ROOT', 'EXPORTS_ROOT'):
+            directory = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, directory)
+            settings = override_settings(**{name: directory})
+            settings.enable()
+            self.addCleanup(settings.disable)
+        self.user = User.objects.create_user(
+            username='author', password='pass-12345'
+        )
+        reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(
+            text='Первый пост', author=self.user,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif')
+        )
+        Comment.objects.create(post=self.post, author=self.user, text='Ура')
+        Follow.objects.create(user=reader, author=self.user)
+        self.client = Client()
+        self.client.login(username='author', password='pass-12345')
+
+    def request_export(self):
+        with mock.patch.object(
+            build_export_later, 'delay_on_commit'
+        ) as delay:
+            self.client.post(reverse('data_export'))
+        return delay
+
+    def test_export_archive(self):
+        """Архив содержит разделы в JSON Lines и картинки постов."""
+        delay = self.request_export()
+        export = DataExport.objects.get(user=self.user)
+        delay.assert_called_once_with(export.pk, key=f'export:{export.pk}')
+        build_export_later(export.pk)
+        export.refresh_from_db()
+        self.assertEqual(export.status, DataExport.READY)
+
+        response = self.client.get(
+            reverse('data_export_download', args=(export.pk,))
+        )
+        content = b''.join(response.streaming_content)
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            posts = archive.read('posts.jsonl').decode().splitlines()
+            self.assertEqual(json.loads(posts[0])['text'], 'Первый пост')
+            followers = archive.read('followers.jsonl').decode()
+            self.assertEqual(
+                json.loads(followers), {'user__username': 'reader'}
+            )
+            self.assertEqual(
+                archive.read(f'media/{self.post.image.name}'), SMALL_GIF
+            )
+            self.assertEqual(archive.read('comments.jsonl').count(b'\n'), 1)
+
+    def test_archived_comments_are_exported(self):
+        """Комментарии из архива попадают в выгрузку."""
+        post = Post.objects.create(text='Старый пост', author=self.user)
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='Старый коммент'
+        )
+        archive_batch([post.id])
+        self.request_export()
+        export = DataExport.objects.get(user=self.user)
+        build_export_later(export.pk)
+        export.refresh_from_db()
+        with zipfile.ZipFile(export.file.open()) as archive:
+            rows = archive.read('archived_comments.jsonl').decode()
+        self.assertEqual(json.loads(rows)['id'], comment.id)
+        self.assertEqual(json.loads(rows)['text'], 'Старый коммент')
+
+    def test_one_pending_export(self):
+        """Пока архив готовится, новый запрос не создаёт второй."""
+        self.request_export()
+        delay = self.request_export()
+        delay.assert_not_called()
+        self.assertEqual(DataExport.objects.count(), 1)
+
+    def test_download_only_by_owner(self):
+        """Чужой архив скачать нельзя."""
+        self.request_export()
+        export = DataExport.objects.get()
+        build_export_later(export.pk)
+        User.objects.create_user(username='other', password='pass-12345')
+        client = Client()
+        client.login(username='other', password='pass-12345')
+        response = client.get(
+            reverse('data_export_download', args=(export.pk,))
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,125 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notifications.models import Notification
+from posts.counters import get_post_counters, get_user_counters
+from posts.entities import get_user
+from posts.models import Comment, Follow, Group, Mention, Post, PostTag, User
+from users.purge import purge_user
+from users.tasks import purge_user_later, schedule_purge
+
+
+class PurgeUserTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        group = Group.objects.create(title='Котики', slug='cats')
+        self.posts = [
+            Post.objects.create(
+                text=f'#котики {i} @reader', author=self.author, group=group
+            )
+            for i in range(5)
+        ]
+        self.other_post = Post.objects.create(
+            text='Чужой пост', author=self.reader
+        )
+        for post in self.posts:
+            Comment.objects.create(post=post, author=self.reader, text='Да')
+        Comment.objects.create(
+            post=self.other_post, author=self.author, text='Нет'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.author, author=self.reader)
+        Notification.objects.create(
+            recipient=self.reader, kind=Notification.NEW_POST,
+            post=self.posts[0]
+        )
+
+    def test_purge_removes_everything_and_keeps_counters(self):
+        """Очистка удаляет всё содержимое и обновляет чужие счётчики."""
+        get_user_counters([self.reader.id])
+        get_post_counters([self.other_post.id])
+        stats = purge_user(self.author, batch_size=2)
+        self.assertEqual(stats['posts.Post'], 5)
+        self.assertEqual(stats['posts.Comment'], 6)
+        self.assertFalse(User.objects.filter(username='author').exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(Follow.objects.count(), 0)
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(PostTag.objects.count(), 0)
+        self.assertEqual(Mention.objects.count(), 0)
+        self.assertEqual(get_user_counters([self.reader.id])[self.reader.id], {
+            'followers': 0, 'follow': 0, 'posts_count': 1,
+        })
+        self.assertEqual(
+            get_post_counters([self.other_post.id])[self.other_post.id],
+            {'comments_count': 0}
+        )
+
+    def test_purge_command(self):
+        """Команда удаляет пользователя по имени."""
+        out = StringIO()
+        call_command('purge_user', 'author', stdout=out)
+        self.assertIn('author: удалено строк', out.getvalue())
+        self.assertFalse(User.objects.filter(username='author').exists())
+
+    def test_admin_delete_is_scheduled(self):
+        """Удаление в админке блокирует вход и ставит очистку в очередь."""
+        User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        client = Client()
+        client.login(username='admin', password='pass')
+        url = reverse('admin:auth_user_changelist')
+        with mock.patch.object(purge_user_later, 'delay_on_commit') as delay:
+            response = client.post(url, {
+                'action': 'delete_selected',
+                '_selected_action': [self.author.pk],
+            })
+            self.assertContains(response, 'Posts: 5')
+            client.post(url, {
+                'action': 'delete_selected',
+                '_selected_action': [self.author.pk],
+                'post': 'yes',
+            })
+        delay.assert_called_once_with(
+            self.author.pk, key=f'purge_user:{self.author.pk}'
+        )
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.is_active)
+        purge_user_later(self.author.pk)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+
+    def test_schedule_purge_resets_cached_user(self):
+        """После постановки в очередь кэш больше не отдаёт активного."""
+        get_user(self.author.pk)
+        with mock.patch.object(purge_user_later, 'delay_on_commit'):
+            schedule_purge(self.author)
+        self.assertFalse(get_user(self.author.pk).is_active)
+
+    def test_admin_delete_requires_cascade_permissions(self):
+        """Без прав на удаление постов админка не удаляет автора."""
+        staff = User.objects.create_user(
+            'staff', 'staff@example.com', 'pass', is_staff=True
+        )
+        staff.user_permissions.add(*Permission.objects.filter(
+            codename__in=['view_user', 'delete_user']
+        ))
+        client = Client()
+        client.login(username='staff', password='pass')
+        with mock.patch.object(purge_user_later, 'delay_on_commit') as delay:
+            response = client.post(
+                reverse('admin:auth_user_changelist'), {
+                    'action': 'delete_selected',
+                    '_selected_action': [self.author.pk],
+                    'post': 'yes',
+                }
+            )
+        self.assertEqual(response.status_code, 403)
+        delay.assert_not_called()
+        self.author.refresh_from_db()
+        self.assertTrue(self.author.is_active)
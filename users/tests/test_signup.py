@@ -0,0 +1,27 @@
+from django.test import TestCase
+
+from users.forms import CreationForm
+
+
+class SignUpFormTests(TestCase):
+    def form(self, username):
+        return CreationForm(data={
+            'username': username,
+            'password1': 'Kj8#mQ2!vz',
+            'password2': 'Kj8#mQ2!vz',
+        })
+
+    def test_url_names_are_reserved(self):
+        """Имя, под которым профиль не открыть, не регистрируется."""
+        for username in ('rss', 'atom', 'popular', 'tag', 'upload', 'new',
+                         'follow', 'group', 'about', 'admin', 'events'):
+            with self.subTest(username=username):
+                form = self.form(username)
+                self.assertFalse(form.is_valid())
+                self.assertEqual(
+                    form.errors.as_data()['username'][0].code, 'reserved'
+                )
+
+    def test_regular_name(self):
+        """Обычное имя проходит проверку."""
+        self.assertTrue(self.form('leo').is_valid())
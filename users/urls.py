@@ -4,4 +4,9 @@ from . import views
 
 urlpatterns = [
     path('signup/', views.SignUp.as_view(), name='signup'),
+    path('export/', views.data_export, name='data_export'),
+    path(
+        'export/<int:export_id>/', views.data_export_download,
+        name='data_export_download'
+    ),
 ]
@@ -1,10 +1,43 @@
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 
 from .forms import CreationForm
+from .models import DataExport
+from .tasks import build_export_later
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('login')
     template_name = 'signup.html'
+
+
+@login_required
+def data_export(request):
+    exports = request.user.data_exports.all()
+    if request.method == 'POST':
+        if not exports.filter(status=DataExport.PENDING).exists():
+            export = DataExport.objects.create(user=request.user)
+            build_export_later.delay_on_commit(
+                export.pk, key=f'export:{export.pk}'
+            )
+        return redirect('data_export')
+    return render(request, 'export.html', {'exports': exports[:5]})
+
+
+@login_required
+def data_export_download(request, export_id):
+    export = get_object_or_404(
+        DataExport, pk=export_id, user=request.user,
+        status=DataExport.READY
+    )
+    if not export.file.storage.exists(export.file.name):
+        raise Http404('Файл выгрузки удалён')
+    # FileResponse отдаёт файл блоками, не читая его в память целиком.
+    return FileResponse(
+        export.file.open('rb'), as_attachment=True,
+        filename=export.file.name.rsplit('/', 1)[-1]
+    )
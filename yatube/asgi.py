@@ -0,0 +1,18 @@
+"""
+ASGI config for yatube project.
+
+Serves the event streams from realtime.urls natively and passes every
+other request to the regular WSGI handler.
+"""
+
+import os
+
+import django
+from django.core.handlers.wsgi import WSGIHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+django.setup(set_prefix=False)
+
+from realtime.asgi import ASGIApplication  # noqa: E402
+
+application = ASGIApplication(WSGIHandler())
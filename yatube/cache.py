@@ -0,0 +1,247 @@
+"""
+Двухуровневый кэш для горячих ключей.
+
+L1 - ограниченный LRU в памяти процесса с коротким TTL, L2 - бэкенд из
+CACHES. Пересчёт значения защищён от лавины запросов:
+
+* single-flight: пересчитывает только тот, кто взял блокировку ключа в
+  L2 (cache.add), остальные отдают старое значение или ждут нового;
+* вероятностное раннее обновление (XFetch): чем ближе срок и дороже
+  пересчёт, тем вероятнее, что запрос обновит значение заранее;
+* при ошибке пересчёта отдаётся устаревшее значение, пока оно живо в L2
+  (TIERED_CACHE['STALE_TTL'] после срока).
+
+Счётчики попаданий и пересчётов копятся в процессе и периодически
+сбрасываются в L2, где их суммирует команда cache_stats. Список ключей
+статистики в L2 меняется только атомарными add/incr: ключ регистрируется
+один раз в пронумерованном слоте.
+"""
+import math
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+STATS_SLOTS = 'tiered:stats:slots'
+STATS_SLOT = 'tiered:stats:slot:{}'
+STATS_KNOWN = 'tiered:stats:known:{}'
+STAT_FIELDS = ('l1_hit', 'l2_hit', 'miss', 'recompute', 'stale', 'error')
+
+_missing = object()
+
+
+class LRU:
+    """Словарь с вытеснением давно не читанных и истёкших записей."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, now):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires <= now:
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires):
+        with self.lock:
+            self.items[key] = (value, expires)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+class TieredCache:
+    def __init__(self, alias=None, l1_size=None, l1_ttl=None, stale_ttl=None,
+                 beta=None, lock_timeout=None, wait_timeout=None,
+                 stats_interval=None):
+        options = settings.TIERED_CACHE
+        self.l2 = caches[alias or options['ALIAS']]
+        self.l1 = LRU(l1_size or options['L1_SIZE'])
+        self.l1_ttl = options['L1_TTL'] if l1_ttl is None else l1_ttl
+        self.stale_ttl = (
+            options['STALE_TTL'] if stale_ttl is None else stale_ttl
+        )
+        self.beta = options['BETA'] if beta is None else beta
+        self.lock_timeout = lock_timeout or options['LOCK_TIMEOUT']
+        self.wait_timeout = (
+            options['WAIT_TIMEOUT'] if wait_timeout is None else wait_timeout
+        )
+        self.stats_interval = (
+            options['STATS_INTERVAL'] if stats_interval is None
+            else stats_interval
+        )
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+        self.stats_flushed = time.monotonic()
+
+    def get_or_set(self, key, compute, timeout, stats_key=None):
+        """
+        Значение key; при промахе или истечении срока вызывает compute()
+        и кладёт результат на timeout секунд.
+        """
+        stats_key = stats_key or key
+        now = time.time()
+        entry = self.l1.get(key, now)
+        level = 'l1_hit'
+        if entry is None:
+            entry = self.l2.get(key)
+            level = 'l2_hit'
+            if entry is not None:
+                self.l1.set(key, entry, min(now + self.l1_ttl, entry[1]))
+        if entry is not None and not self._should_refresh(entry, now):
+            self._count(stats_key, level)
+            return entry[0]
+
+        lock_key = f'{key}:lock'
+        locked = self.l2.add(lock_key, 1, self.lock_timeout)
+        if not locked:
+            if entry is not None:
+                # Пересчитывает другой запрос - отдаём то, что есть.
+                self._count(stats_key, 'stale')
+                return entry[0]
+            value = self._wait(key)
+            if value is not _missing:
+                self._count(stats_key, 'l2_hit')
+                return value
+            # Держатель блокировки не успел: считаем сами.
+        try:
+            self._count(stats_key, 'miss' if entry is None else 'recompute')
+            return self._recompute(key, compute, timeout)
+        except Exception:
+            if entry is None:
+                raise
+            self._count(stats_key, 'error')
+            return entry[0]
+        finally:
+            if locked:
+                self.l2.delete(lock_key)
+
+    def _should_refresh(self, entry, now):
+        _, expires, delta = entry
+        if now >= expires:
+            return True
+        # XFetch: gap > 0, обычно мал и изредка велик.
+        gap = -math.log(1 - random.random())
+        return now + delta * self.beta * gap >= expires
+
+    def _recompute(self, key, compute, timeout):
+        started = time.time()
+        value = compute()
+        now = time.time()
+        entry = (value, now + timeout, now - started)
+        self.l2.set(key, entry, timeout + self.stale_ttl)
+        self.l1.set(key, entry, min(now + self.l1_ttl, now + timeout))
+        return value
+
+    def _wait(self, key):
+        """Ждёт, пока значение посчитает держатель блокировки."""
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = self.l2.get(key)
+            if entry is not None:
+                return entry[0]
+        return _missing
+
+    def delete(self, key):
+        """Удаляет ключ; L1 других процессов доживает до L1_TTL."""
+        self.l1.delete(key)
+        self.l2.delete(key)
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+    def _count(self, stats_key, field):
+        with self.stats_lock:
+            self.stats[(stats_key, field)] += 1
+            due = time.monotonic() - self.stats_flushed >= self.stats_interval
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Переносит накопленные счётчики процесса в L2."""
+        with self.stats_lock:
+            stats, self.stats = self.stats, Counter()
+            self.stats_flushed = time.monotonic()
+        if not stats:
+            return
+        for stats_key in {stats_key for stats_key, _ in stats}:
+            self._register(stats_key)
+        for (stats_key, field), count in stats.items():
+            counter = f'tiered:stats:{stats_key}:{field}'
+            self.l2.add(counter, 0, None)
+            self.l2.incr(counter, count)
+
+    def _register(self, stats_key):
+        """
+        Заносит ключ в реестр L2. add пропускает уже известные ключи,
+        а после очистки L2 ключ зарегистрируется заново.
+        """
+        if self.l2.add(STATS_KNOWN.format(stats_key), 1, None):
+            self.l2.add(STATS_SLOTS, 0, None)
+            slot = self.l2.incr(STATS_SLOTS)
+            self.l2.set(STATS_SLOT.format(slot), stats_key, None)
+
+    def stats_keys(self):
+        slots = self.l2.get(STATS_SLOTS, 0)
+        return sorted(set(self.l2.get_many([
+            STATS_SLOT.format(slot) for slot in range(1, slots + 1)
+        ]).values()))
+
+    def get_stats(self):
+        """Суммарные счётчики всех процессов: {ключ: {поле: число}}."""
+        self.flush_stats()
+        keys = self.stats_keys()
+        counters = self.l2.get_many([
+            f'tiered:stats:{stats_key}:{field}'
+            for stats_key in keys for field in STAT_FIELDS
+        ])
+        return {
+            stats_key: {
+                field: counters.get(f'tiered:stats:{stats_key}:{field}', 0)
+                for field in STAT_FIELDS
+            }
+            for stats_key in keys
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TieredCache()
+        return _cache
+
+
+def reset_cache():
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def get_or_set(key, compute, timeout, stats_key=None):
+    return get_cache().get_or_set(key, compute, timeout, stats_key)
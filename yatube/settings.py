@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
+import datetime
 import os
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -33,7 +34,12 @@ ALLOWED_HOSTS = ["*"]
 
 INSTALLED_APPS = [
     'users',
-    'posts',
+    'posts.apps.PostsConfig',
+    'api',
+    'realtime.apps.RealtimeConfig',
+    'taskqueue.apps.TaskQueueConfig',
+    'notifications.apps.NotificationsConfig',
+    'profiling',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -47,11 +53,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'profiling.middleware.SamplingProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
+    'ratelimit.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -60,11 +68,17 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# В продакшене шаблоны компилируются один раз на воркер (cached.Loader) и
+# прогреваются при старте воркера, см. gunicorn.conf.py.
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -73,12 +87,17 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'context_processors.year.year',
             ],
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+ASGI_APPLICATION = 'yatube.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -138,9 +157,75 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
+# Карта сайта собирается командой build_sitemaps и отдаётся nginx.
+SITEMAP_ROOT = os.path.join(STATIC_ROOT, 'sitemaps')
+SITEMAP_URL = '/sitemaps/'
+SITEMAP_PROTOCOL = 'https'
+SITEMAP_CHUNK_SIZE = 50000
+
+# Статические страницы, отрендеренные в HTML для гостей (build_flatpages).
+FLATPAGES_ROOT = os.path.join(STATIC_ROOT, 'flatpages')
+
+# Рейтинг популярных постов: период полураспада активности, окно
+# пересчёта командой rank_posts и вес числа подписчиков автора.
+RANKING_HALF_LIFE_HOURS = 24
+RANKING_WINDOW_DAYS = 14
+RANKING_FOLLOWERS_WEIGHT = 1.0
+
+# Просмотры постов сбрасываются в БД раз в VIEWS_FLUSH_INTERVAL секунд
+# или при VIEWS_FLUSH_MAX_KEYS разных постов в буфере воркера.
+VIEWS_FLUSH_INTERVAL = 10
+VIEWS_FLUSH_MAX_KEYS = 1000
+RANKING_VIEWS_WEIGHT = 0.05
+
+# Число рекомендаций "на кого подписаться" (команда build_suggestions).
+FOLLOW_SUGGESTIONS_LIMIT = 5
+
+# Посты старше ARCHIVE_AFTER_DAYS переносит в архив команда archive_posts.
+ARCHIVE_AFTER_DAYS = 365
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Архивы с данными пользователей (users.export), отдаются только владельцу.
+EXPORTS_ROOT = os.path.join(BASE_DIR, "exports")
+
+# Медиафайлы в S3-совместимом хранилище: включается заданием
+# S3_BUCKET_NAME. Картинки грузятся браузером напрямую по presigned URL,
+# раздаются из бакета или через CDN (MEDIA_CDN_URL).
+S3_BUCKET_NAME = os.environ.get('S3_BUCKET_NAME', '')
+S3_ENDPOINT_URL = os.environ.get(
+    'S3_ENDPOINT_URL', 'https://s3.amazonaws.com'
+)
+S3_REGION = os.environ.get('S3_REGION', 'us-east-1')
+S3_ACCESS_KEY_ID = os.environ.get('S3_ACCESS_KEY_ID', '')
+S3_SECRET_ACCESS_KEY = os.environ.get('S3_SECRET_ACCESS_KEY', '')
+S3_ADDRESSING_STYLE = os.environ.get('S3_ADDRESSING_STYLE', 'path')
+S3_LOCATION = os.environ.get('S3_LOCATION', '')
+S3_PRESIGNED_EXPIRES = 15 * 60
+MEDIA_CDN_URL = os.environ.get('MEDIA_CDN_URL', '')
+UPLOAD_IMAGE_TYPES = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+if S3_BUCKET_NAME:
+    DEFAULT_FILE_STORAGE = 'yatube.storage.S3Storage'
+
+# Загрузки: файлы больше FILE_UPLOAD_MAX_SIZE отбрасываются на лету,
+# картинки уменьшаются до IMAGE_MAX_DIMENSION по большей стороне и
+# перекодируются в IMAGE_OUTPUT_FORMAT (JPEG или WEBP) без EXIF.
+FILE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+FILE_UPLOAD_HANDLERS = [
+    'yatube.uploadhandlers.LimitedUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+IMAGE_MAX_DIMENSION = 2048
+IMAGE_OUTPUT_FORMAT = 'JPEG'
+IMAGE_QUALITY = 85
+
 # Login
 
 LOGIN_URL = "/auth/login/"
@@ -151,10 +236,97 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+DEFAULT_FROM_EMAIL = "noreply@yatube.ru"
+
+# Уведомления копятся в БД и уходят дайджестом по расписанию
+# (python manage.py send_digests из cron).
+NOTIFICATIONS_BATCH_SIZE = 1000
+NOTIFICATIONS_DIGEST_BATCH = 500
+
 SITE_ID = 1
 
+JWT_EXPIRATION_DELTA = datetime.timedelta(days=1)
+
+API_BATCH_MAX_ITEMS = 100
+
+# Брокер событий для лент в реальном времени. CacheBroker доставляет
+# события между процессами через общий кэш из CACHES, LocalBroker - только
+# в пределах одного процесса.
+REALTIME_BROKER = os.environ.get(
+    'REALTIME_BROKER', 'realtime.broker.CacheBroker'
+)
+REALTIME_STREAM_TIMEOUT = 300
+
+# Фоновые задачи (taskqueue). Воркер: python manage.py run_worker.
+# TASKS_EAGER выполняет задачи сразу в запросе - удобно без воркера.
+TASKS_EAGER = False
+TASKS_LOCK_TIMEOUT = 10 * 60
+
+# Ограничение частоты запросов по имени URL: 'число/период' (s, m, h, d)
+# или словарь с rate, methods (по умолчанию только POST) и min_page -
+# тогда лимит действует только на страницы ленты с этого номера.
+# Считается по пользователю, для анонимов - по IP из RATELIMIT_IP_HEADER.
+RATELIMIT_ENABLED = True
+RATELIMIT_BACKEND = os.environ.get(
+    'RATELIMIT_BACKEND', 'ratelimit.backends.CacheBackend'
+)
+RATELIMIT_CACHE = 'default'
+RATELIMIT_IP_HEADER = 'HTTP_X_REAL_IP'
+FEED_PAGE_RATELIMIT = {'rate': '30/m', 'methods': ('GET',), 'min_page': 10}
+RATELIMITS = {
+    'new_post': '10/m',
+    'add_comment': '20/m',
+    'profile_follow': {'rate': '30/m', 'methods': ('GET', 'POST')},
+    'signup': '5/h',
+    'data_export': '5/h',
+    'api_posts': '10/m',
+    'api_comments': '20/m',
+    'api_follow': {'rate': '30/m', 'methods': ('POST', 'DELETE')},
+    'api_follow_bulk': '10/m',
+    'index': FEED_PAGE_RATELIMIT,
+    'group': FEED_PAGE_RATELIMIT,
+    'profile': FEED_PAGE_RATELIMIT,
+    'follow_index': FEED_PAGE_RATELIMIT,
+}
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+# Общий для воркеров кэш (memcached:11211 в docker-compose).
+if os.environ.get('MEMCACHED_LOCATION'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ['MEMCACHED_LOCATION'],
+    }
+
+# Сессии читаются из кэша, в БД - только запись и промахи.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Двухуровневый кэш горячих ключей (yatube.cache, тег tiered_cache):
+# L1 в памяти процесса на L1_TTL секунд перед кэшем ALIAS, устаревшее
+# значение отдаётся ещё STALE_TTL секунд, пока его пересчитывают.
+TIERED_CACHE = {
+    'ALIAS': 'default',
+    'L1_SIZE': 1000,
+    'L1_TTL': 5,
+    'STALE_TTL': 5 * 60,
+    'BETA': 1.0,
+    'LOCK_TIMEOUT': 30,
+    'WAIT_TIMEOUT': 2,
+    'STATS_INTERVAL': 10,
+}
+
+# Сэмплирующий профилировщик запросов (profiling): доля профилируемых
+# запросов, период снятия стека и каталог для collapsed-файлов. Запрос с
+# заголовком X-Profile (manage.py profile_token) профилируется всегда.
+# Хранятся последние PROFILING_MAX_FILES файлов не старше PROFILING_MAX_AGE;
+# лишние удаляются раз в PROFILING_PRUNE_EVERY сохранений и profile_report.
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+PROFILING_INTERVAL = 0.005
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILING_MAX_FILES = 1000
+PROFILING_MAX_AGE = 7 * 24 * 60 * 60
+PROFILING_PRUNE_EVERY = 100
+PROFILING_TOKEN_MAX_AGE = 60 * 60
@@ -0,0 +1,308 @@
+"""
+Хранилище медиафайлов в S3-совместимом объектном хранилище (AWS S3,
+MinIO, Yandex Object Storage и т.п.).
+
+Запросы подписываются AWS Signature V4 вручную поверх urllib, чтобы не
+тянуть boto3 ради пяти HTTP-методов. Раздача файлов идёт напрямую из
+хранилища или через CDN (MEDIA_CDN_URL), загрузка картинок — через
+presigned POST из браузера, минуя gunicorn.
+"""
+import base64
+import datetime
+import hashlib
+import hmac
+import json
+import mimetypes
+import posixpath
+import urllib.error
+import urllib.request
+from urllib.parse import quote, urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+
+ALGORITHM = 'AWS4-HMAC-SHA256'
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+EMPTY_SHA256 = hashlib.sha256(b'').hexdigest()
+
+
+def _hmac(key, message):
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def _quote(value, safe='~'):
+    return quote(str(value), safe=safe)
+
+
+def signing_key(secret_key, date, region, service='s3'):
+    key = _hmac(f'AWS4{secret_key}'.encode(), date)
+    key = _hmac(key, region)
+    key = _hmac(key, service)
+    return _hmac(key, 'aws4_request')
+
+
+def canonical_query(params):
+    return '&'.join(
+        f'{_quote(key)}={_quote(value)}'
+        for key, value in sorted(params.items())
+    )
+
+
+def sign(method, path, query, headers, payload_hash, access_key, secret_key,
+         region, timestamp):
+    """
+    Подпись SigV4. headers должны содержать host; возвращает
+    (signed_headers, signature).
+    """
+    amz_date = timestamp.strftime('%Y%m%dT%H%M%SZ')
+    date = amz_date[:8]
+    headers = {
+        name.lower(): ' '.join(str(value).split())
+        for name, value in headers.items()
+    }
+    signed_headers = ';'.join(sorted(headers))
+    canonical_request = '\n'.join([
+        method,
+        _quote(path, safe='/~'),
+        canonical_query(query),
+        ''.join(
+            f'{name}:{headers[name]}\n' for name in sorted(headers)
+        ),
+        signed_headers,
+        payload_hash,
+    ])
+    scope = f'{date}/{region}/s3/aws4_request'
+    string_to_sign = '\n'.join([
+        ALGORITHM,
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ])
+    signature = hmac.new(
+        signing_key(secret_key, date, region),
+        string_to_sign.encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    return signed_headers, signature
+
+
+class StorageError(Exception):
+    pass
+
+
+def urllib_transport(method, url, headers, body=None, timeout=30):
+    """
+    Выполнить HTTP-запрос, вернуть (status, headers, body). Сетевые
+    ошибки и таймауты превращаются в StorageError.
+    """
+    request = urllib.request.Request(
+        url, data=body, headers=headers, method=method
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, dict(error.headers), error.read()
+    except OSError as error:
+        # URLError, socket.timeout и обрывы соединения.
+        raise StorageError(f'{method} {url}: {error}') from error
+
+
+@deconstructible
+class S3Storage(Storage):
+    supports_presigned_upload = True
+
+    def __init__(self, bucket=None, endpoint_url=None, region=None,
+                 access_key=None, secret_key=None, addressing_style=None,
+                 location=None, cdn_url=None, transport=None):
+        self.bucket = bucket or settings.S3_BUCKET_NAME
+        if not self.bucket:
+            raise ImproperlyConfigured('S3_BUCKET_NAME не задан')
+        self.endpoint_url = (
+            endpoint_url or settings.S3_ENDPOINT_URL
+        ).rstrip('/')
+        self.region = region or settings.S3_REGION
+        self.access_key = access_key or settings.S3_ACCESS_KEY_ID
+        self.secret_key = secret_key or settings.S3_SECRET_ACCESS_KEY
+        self.addressing_style = (
+            addressing_style or settings.S3_ADDRESSING_STYLE
+        )
+        self.location = (
+            settings.S3_LOCATION if location is None else location
+        ).strip('/')
+        self.cdn_url = settings.MEDIA_CDN_URL if cdn_url is None else cdn_url
+        self.transport = transport or urllib_transport
+
+    def _key(self, name):
+        name = name.replace('\\', '/').lstrip('/')
+        if self.location:
+            return posixpath.join(self.location, name)
+        return name
+
+    def _host_and_path(self, key):
+        endpoint = urlsplit(self.endpoint_url)
+        if self.addressing_style == 'virtual':
+            host = f'{self.bucket}.{endpoint.netloc}'
+            path = '/' + key
+        else:
+            host = endpoint.netloc
+            path = f'/{self.bucket}/{key}'
+        return endpoint.scheme, host, path
+
+    def _request(self, method, name, body=None, headers=None):
+        scheme, host, path = self._host_and_path(self._key(name))
+        now = datetime.datetime.utcnow()
+        payload_hash = (
+            hashlib.sha256(body).hexdigest() if body is not None
+            else EMPTY_SHA256
+        )
+        headers = dict(headers or {})
+        headers.update({
+            'host': host,
+            'x-amz-date': now.strftime('%Y%m%dT%H%M%SZ'),
+            'x-amz-content-sha256': payload_hash,
+        })
+        signed_headers, signature = sign(
+            method, path, {}, headers, payload_hash,
+            self.access_key, self.secret_key, self.region, now,
+        )
+        headers['Authorization'] = (
+            f'{ALGORITHM} Credential={self.access_key}/'
+            f'{now.strftime("%Y%m%d")}/{self.region}/s3/aws4_request, '
+            f'SignedHeaders={signed_headers}, Signature={signature}'
+        )
+        url = f'{scheme}://{host}{_quote(path, safe="/~")}'
+        return self.transport(method, url, headers, body)
+
+    def _open(self, name, mode='rb'):
+        status, _, body = self._request('GET', name)
+        if status == 404:
+            raise FileNotFoundError(name)
+        if status != 200:
+            raise StorageError(f'GET {name}: {status}')
+        return ContentFile(body, name=name)
+
+    def _save(self, name, content):
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        body = content.read()
+        if isinstance(body, str):
+            body = body.encode()
+        content_type = (
+            getattr(content, 'content_type', None)
+            or mimetypes.guess_type(name)[0]
+            or 'application/octet-stream'
+        )
+        status, _, _ = self._request(
+            'PUT', name, body, {'content-type': content_type}
+        )
+        if status not in (200, 201):
+            raise StorageError(f'PUT {name}: {status}')
+        return name
+
+    def delete(self, name):
+        status, _, _ = self._request('DELETE', name)
+        if status not in (200, 204, 404):
+            raise StorageError(f'DELETE {name}: {status}')
+
+    def head(self, name):
+        """Заголовки объекта или None, если его нет."""
+        status, headers, _ = self._request('HEAD', name)
+        if status == 404:
+            return None
+        if status != 200:
+            raise StorageError(f'HEAD {name}: {status}')
+        return {key.lower(): value for key, value in headers.items()}
+
+    def exists(self, name):
+        return self.head(name) is not None
+
+    def size(self, name):
+        headers = self.head(name)
+        if headers is None:
+            raise FileNotFoundError(name)
+        return int(headers['content-length'])
+
+    def url(self, name):
+        key = self._key(name)
+        if self.cdn_url:
+            return (
+                f'{self.cdn_url.rstrip("/")}/{_quote(key, safe="/~")}'
+            )
+        scheme, host, path = self._host_and_path(key)
+        return f'{scheme}://{host}{_quote(path, safe="/~")}'
+
+    def presigned_url(self, method, name, expires=None, timestamp=None,
+                      content_type=None):
+        """
+        Ссылка, по которой клиент может выполнить method над объектом без
+        ключей доступа. Для PUT можно зафиксировать Content-Type.
+        """
+        expires = expires or settings.S3_PRESIGNED_EXPIRES
+        timestamp = timestamp or datetime.datetime.utcnow()
+        scheme, host, path = self._host_and_path(self._key(name))
+        headers = {'host': host}
+        if content_type:
+            headers['content-type'] = content_type
+        query = {
+            'X-Amz-Algorithm': ALGORITHM,
+            'X-Amz-Credential': (
+                f'{self.access_key}/{timestamp.strftime("%Y%m%d")}/'
+                f'{self.region}/s3/aws4_request'
+            ),
+            'X-Amz-Date': timestamp.strftime('%Y%m%dT%H%M%SZ'),
+            'X-Amz-Expires': str(expires),
+            'X-Amz-SignedHeaders': ';'.join(sorted(headers)),
+        }
+        _, signature = sign(
+            method, path, query, headers, UNSIGNED_PAYLOAD,
+            self.access_key, self.secret_key, self.region, timestamp,
+        )
+        query['X-Amz-Signature'] = signature
+        return (
+            f'{scheme}://{host}{_quote(path, safe="/~")}?'
+            f'{canonical_query(query)}'
+        )
+
+    def presigned_post(self, name, content_type, max_size, expires=None,
+                       timestamp=None):
+        """
+        URL и поля формы для загрузки объекта POST-запросом из браузера.
+        Политика фиксирует ключ и Content-Type и ограничивает размер
+        файла: хранилище само отклонит файл больше max_size байт.
+        """
+        expires = expires or settings.S3_PRESIGNED_EXPIRES
+        timestamp = timestamp or datetime.datetime.utcnow()
+        scheme, host, path = self._host_and_path('')
+        amz_date = timestamp.strftime('%Y%m%dT%H%M%SZ')
+        fields = {
+            'key': self._key(name),
+            'Content-Type': content_type,
+            'x-amz-algorithm': ALGORITHM,
+            'x-amz-credential': (
+                f'{self.access_key}/{amz_date[:8]}/{self.region}'
+                '/s3/aws4_request'
+            ),
+            'x-amz-date': amz_date,
+        }
+        policy = {
+            'expiration': (
+                timestamp + datetime.timedelta(seconds=expires)
+            ).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'conditions': [{'bucket': self.bucket}] + [
+                {field: value} for field, value in fields.items()
+            ] + [['content-length-range', 1, max_size]],
+        }
+        fields['policy'] = base64.b64encode(
+            json.dumps(policy).encode()
+        ).decode()
+        fields['x-amz-signature'] = hmac.new(
+            signing_key(self.secret_key, amz_date[:8], self.region),
+            fields['policy'].encode(),
+            hashlib.sha256,
+        ).hexdigest()
+        url = f'{scheme}://{host}{_quote(path, safe="/~")}'
+        return url, fields
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class TooLargeUpload(UploadedFile):
+    """
+    Заглушка вместо файла больше FILE_UPLOAD_MAX_SIZE: содержимое
+    отброшено, известны только имя и размер.
+    """
+    too_large = True
+
+    def __init__(self, name, content_type, size):
+        super().__init__(
+            file=None, name=name, content_type=content_type, size=size
+        )
+
+    def open(self, mode=None):
+        raise ValueError('Файл отброшен: превышен размер загрузки.')
+
+
+class LimitedUploadHandler(FileUploadHandler):
+    """
+    Ставится первым в FILE_UPLOAD_HANDLERS. Пока файл укладывается в
+    лимит, куски идут дальше по цепочке (в память или во временный файл).
+    Всё, что сверх лимита, отбрасывается, не доходя до следующих
+    обработчиков, а вместо файла в request.FILES попадает TooLargeUpload,
+    который форма отклоняет до того, как картинку откроет Pillow.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = settings.FILE_UPLOAD_MAX_SIZE
+        self.too_large = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.too_large = (self.content_length or 0) > self.max_size
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.too_large or start + len(raw_data) > self.max_size:
+            self.too_large = True
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not self.too_large:
+            return None
+        return TooLargeUpload(self.file_name, self.content_type, file_size)
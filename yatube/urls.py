@@ -2,21 +2,24 @@ from django.conf import settings
 from django.conf.urls import handler404, handler500
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.contrib.flatpages import views
 from django.urls import include, path
 
+from posts.flatpages import flatpage
+
 urlpatterns = [
-    path('about/', include('django.contrib.flatpages.urls')),
     path(
-        'about-author/', views.flatpage, {'url': '/about-author/'},
-        name='author'
+        'about/<path:url>', flatpage,
+        name='django.contrib.flatpages.views.flatpage'
     ),
     path(
-        'about-spec/', views.flatpage, {'url': '/about-spec/'}, name='spec'
+        'about-author/', flatpage, {'url': '/about-author/'}, name='author'
     ),
+    path('about-spec/', flatpage, {'url': '/about-spec/'}, name='spec'),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('admin/', admin.site.urls),
+    path('api/', include('api.urls')),
+    path('events/', include('realtime.urls')),
     path('', include('posts.urls')),
 ]
 
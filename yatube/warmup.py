@@ -0,0 +1,48 @@
+import logging
+import os
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def project_template_dirs(engine):
+    """
+    Каталоги шаблонов проекта (DIRS и templates/ наших приложений), без
+    шаблонов сторонних пакетов.
+    """
+    for loader in engine.engine.template_loaders:
+        for inner in getattr(loader, 'loaders', [loader]):
+            for directory in inner.get_dirs():
+                directory = str(directory)
+                if directory.startswith(settings.BASE_DIR):
+                    yield directory
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(TEMPLATE_EXTENSIONS):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def warm_templates():
+    """
+    Компилирует все шаблоны проекта, чтобы cached.Loader воркера был
+    заполнен до первого запроса. Возвращает число шаблонов.
+    """
+    engine = engines['django']
+    total = 0
+    for directory in project_template_dirs(engine):
+        for name in template_names(directory):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                logger.exception('Template %s was not compiled', name)
+                continue
+            total += 1
+    return total